@@ -2,6 +2,7 @@
 
 from app.chat_memory import memory
 from app.config import OPENAI_API_KEY
+from app.codex_prompt_engine.engine import prompt_engine
 from openai import OpenAI
 
 client = OpenAI(api_key=OPENAI_API_KEY)
@@ -10,8 +11,8 @@ async def process_user_message(session_id: str, message: str) -> str:
     # Save the user's message to memory
     memory.add_message(session_id, "user", message)
 
-    # Retrieve conversation history
-    history = memory.get_messages(session_id)
+    # Retrieve as much conversation history as fits the model's token budget
+    history = prompt_engine.build_context(memory.get_messages(session_id), model="gpt-3.5-turbo")
 
     # Call OpenAI for response
     response = client.chat.completions.create(
@@ -3,6 +3,7 @@
 from openai import AsyncOpenAI
 from app.config import OPENAI_API_KEY
 from app.chat_memory import memory
+from app.codex_prompt_engine.engine import prompt_engine
 
 # Initialize OpenAI Client
 openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
@@ -18,7 +19,7 @@ class CodexContinueGPT:
         try:
             response = await self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
-                messages=memory.get_messages(session_id),
+                messages=prompt_engine.build_context(memory.get_messages(session_id), model="gpt-3.5-turbo"),
             )
             assistant_reply = response.choices[0].message.content
         except Exception as e:
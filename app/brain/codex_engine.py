@@ -3,6 +3,7 @@
 from app.chat_memory import memory
 from openai import AsyncOpenAI
 from app.config import OPENAI_API_KEY
+from app.codex_prompt_engine.engine import prompt_engine
 
 client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
@@ -14,8 +15,8 @@ class CodexContinueGPT:
         # 1. Save user input to memory
         memory.add_message(session_id, "user", user_input)
 
-        # 2. Retrieve conversation history
-        messages = memory.get_messages(session_id)
+        # 2. Retrieve as much conversation history as fits the model's token budget
+        messages = prompt_engine.build_context(memory.get_messages(session_id), model=self.model)
 
         # 3. Query OpenAI
         response = await client.chat.completions.create(
@@ -6,11 +6,35 @@ from typing import List, Dict
 class CodexTool(ABC):
     """Abstract base for all tools/plugins used by CodexContinueGPT."""
 
+    # Exposed to the model for function calling; name defaults to the class name
+    name: str = ""
+    description: str = ""
+    parameters: Dict = {
+        "type": "object",
+        "properties": {"prompt": {"type": "string", "description": "Input for the tool"}},
+        "required": ["prompt"],
+    }
+
     @abstractmethod
     async def run(self, prompt: str, session_id: str) -> str:
         """Execute the tool logic and return output."""
         pass
 
+    @property
+    def tool_name(self) -> str:
+        return self.name or type(self).__name__
+
+    def spec(self) -> Dict:
+        """OpenAI-style function definition for this tool."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.tool_name,
+                "description": self.description or (type(self).__doc__ or "").strip(),
+                "parameters": self.parameters,
+            },
+        }
+
 class CodexResponse:
     """A structured response returned by the brain kernel."""
 
@@ -1,29 +1,61 @@
 # app/brain/kernel.py
 
-from app.chat_memory import memory
-from app.config import OPENAI_API_KEY
+from app.chat_memory import add_message, add_message_and_get_window
 from app.brain.core.base import CodexTool, CodexResponse
-from openai import AsyncOpenAI
+from app.brain.llm_gateway import LLMGateway, llm_gateway
+from app.brain.tool_executor import ToolExecutor
+from app.codex_prompt_engine.engine import prompt_engine
+from app.config import KERNEL_MAX_TOOL_ROUNDS, CONTEXT_WINDOW_MESSAGES
 from typing import List
 import logging
+import time
 
 logger = logging.getLogger(__name__)
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 class CodexKernel:
-    def __init__(self, tools: List[CodexTool] = []):
+    def __init__(
+        self,
+        tools: List[CodexTool] = [],
+        gateway: LLMGateway = llm_gateway,
+        provider: str = "openai",
+        model: str = "gpt-3.5-turbo",
+        max_rounds: int = KERNEL_MAX_TOOL_ROUNDS,
+    ):
         self.tools = tools
+        self.gateway = gateway
+        self.provider = provider
+        self.model = model
+        self.max_rounds = max_rounds
+        self.executor = ToolExecutor(tools)
 
     async def run(self, message: str, session_id: str) -> CodexResponse:
         logger.info(f"🧠 [CodexKernel] Running for session: {session_id}")
 
-        memory.add_message(session_id, "user", message)
+        history = await add_message_and_get_window(session_id, "user", message, limit=CONTEXT_WINDOW_MESSAGES)
+        messages = prompt_engine.build_context(history, model=self.model)
 
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=memory.get_messages(session_id)
-        )
-        reply = response.choices[0].message.content
+        thoughts = {"rounds": [], "tool_latency_ms": {}}
+        specs = self.executor.specs()
+        for round_number in range(self.max_rounds + 1):
+            # The last round offers no tools, so the model has to answer
+            offer = specs if round_number < self.max_rounds else None
+            reply = await self.gateway.chat_message(messages, tools=offer, provider=self.provider, model=self.model)
+            calls = reply.get("tool_calls")
+            if not calls:
+                break
 
-        memory.add_message(session_id, "assistant", reply)
-        return CodexResponse(reply=reply)
+            # Every call from this turn runs at once; the turn costs as much as its slowest tool
+            started = time.perf_counter()
+            records = await self.executor.run_calls(calls, session_id)
+            messages.append({"role": "assistant", "content": reply.get("content"), "tool_calls": calls})
+            for record in records:
+                messages.append({"role": "tool", "tool_call_id": record["id"], "content": record["output"]})
+                thoughts["tool_latency_ms"].setdefault(record["tool"], []).append(record["latency_ms"])
+            thoughts["rounds"].append({
+                "calls": records,
+                "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+            })
+
+        reply_text = reply.get("content") or ""
+        await add_message(session_id, "assistant", reply_text)
+        return CodexResponse(reply=reply_text, thoughts=thoughts)
@@ -1,25 +1,382 @@
 # app/brain/llm_gateway.py
 
-from openai import AsyncOpenAI
+import asyncio
+import importlib.util
+import json
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, AsyncAzureOpenAI
+
+from app.config import (
+    DEFAULT_MODELS,
+    MODEL_PROVIDER,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MODEL,
+    AZURE_OPENAI_ENDPOINT,
+    AZURE_API_KEY,
+    AZURE_API_VERSION,
+    AZURE_DEPLOYMENT,
+    OLLAMA_API_URL,
+    OLLAMA_MODEL,
+    LLM_HTTP2,
+    LLM_TIMEOUT,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE,
+    LLM_KEEPALIVE_EXPIRY,
+    OPENAI_MAX_CONCURRENCY,
+    AZURE_MAX_CONCURRENCY,
+    OLLAMA_MAX_CONCURRENCY,
+)
+from app.services.adaptive_router import AdaptiveRouter, provider_router
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("openai", "azure", "ollama")
+
 
 class LLMGateway:
-    def __init__(self, openai_key=None, azure_endpoint=None, azure_key=None, ollama_base_url=None):
-        self.openai_client = AsyncOpenAI(api_key=openai_key) if openai_key else None
+    """
+    Single gateway for every LLM provider.
+
+    Each provider gets one long-lived httpx pool (keep-alive, optional HTTP/2)
+    and a semaphore capping concurrent upstream calls. Clients are created
+    lazily on first use, or eagerly by `startup()` from the FastAPI lifespan,
+    and released by `aclose()`.
+    """
+
+    def __init__(
+        self,
+        openai_key=OPENAI_API_KEY,
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        azure_key=AZURE_API_KEY,
+        ollama_base_url=OLLAMA_API_URL,
+        max_connections: int = LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive: int = LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = LLM_KEEPALIVE_EXPIRY,
+        concurrency: Optional[Dict[str, int]] = None,
+        http2: bool = LLM_HTTP2,
+        timeout: float = LLM_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        router: Optional[AdaptiveRouter] = None,
+    ):
+        self.openai_key = openai_key
         self.azure_endpoint = azure_endpoint
         self.azure_key = azure_key
         self.ollama_base_url = ollama_base_url
-
-    async def chat_openai(self, messages):
-        response = await self.openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
         )
+        self.timeout = timeout
+        self.http2 = http2 and self._http2_available()
+        self.transport = transport
+        # Every call is measured; with provider "auto" the router also picks the route
+        self.router = router or provider_router
+
+        caps = {
+            "openai": OPENAI_MAX_CONCURRENCY,
+            "azure": AZURE_MAX_CONCURRENCY,
+            "ollama": OLLAMA_MAX_CONCURRENCY,
+        }
+        caps.update(concurrency or {})
+        self.concurrency = caps
+        self._slots = {provider: asyncio.Semaphore(cap) for provider, cap in caps.items()}
+        self._in_flight = {provider: 0 for provider in caps}
+
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self.openai_client: Optional[AsyncOpenAI] = None
+        self.azure_client: Optional[AsyncAzureOpenAI] = None
+
+    @staticmethod
+    def _http2_available() -> bool:
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("LLM_HTTP2 is enabled but the 'h2' package is missing; using HTTP/1.1")
+            return False
+        return True
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def startup(self):
+        """Open the per-provider connection pools ahead of the first request."""
+        for provider in PROVIDERS:
+            self._http_client(provider)
+        logger.info(f"🔌 [LLMGateway] Pools ready for: {', '.join(PROVIDERS)}")
+
+    async def aclose(self):
+        """Close every pooled connection. Safe to call more than once."""
+        clients, self._http = self._http, {}
+        self.openai_client = None
+        self.azure_client = None
+        for client in clients.values():
+            await client.aclose()
+
+    def _http_client(self, provider: str) -> httpx.AsyncClient:
+        client = self._http.get(provider)
+        if client is None or client.is_closed:
+            kwargs = {}
+            if provider == "ollama":
+                kwargs["base_url"] = self.ollama_base_url
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport,
+                **kwargs,
+            )
+            self._http[provider] = client
+            # SDK wrappers hold a reference to the pool, so rebuild them with it
+            if provider == "openai":
+                self.openai_client = None
+            elif provider == "azure":
+                self.azure_client = None
+        return client
+
+    def _openai(self) -> AsyncOpenAI:
+        http_client = self._http_client("openai")
+        if self.openai_client is None:
+            self.openai_client = AsyncOpenAI(
+                api_key=self.openai_key,
+                base_url=OPENAI_BASE_URL,
+                http_client=http_client,
+            )
+        return self.openai_client
+
+    def _azure(self) -> AsyncAzureOpenAI:
+        http_client = self._http_client("azure")
+        if self.azure_client is None:
+            self.azure_client = AsyncAzureOpenAI(
+                api_key=self.azure_key,
+                azure_endpoint=self.azure_endpoint,
+                api_version=AZURE_API_VERSION,
+                http_client=http_client,
+            )
+        return self.azure_client
+
+    # -- calls ---------------------------------------------------------------
+
+    def resolve(
+        self,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        allowed: Optional[Iterable[str]] = None,
+    ) -> Tuple[str, str]:
+        """Turn a requested provider (or "auto") into a concrete (provider, model) route."""
+        provider = (provider or MODEL_PROVIDER).lower()
+        if provider == "auto":
+            return self.router.choose(allowed)
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unsupported provider: {provider}")
+        return provider, model or DEFAULT_MODELS[provider]
+
+    async def chat(
+        self,
+        messages: List[Dict],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        allowed: Optional[Iterable[str]] = None,
+    ) -> str:
+        provider, model = self.resolve(provider, model, allowed)
+        async with self.router.track(provider, model):
+            if provider == "openai":
+                return await self.chat_openai(messages, model=model, temperature=temperature)
+            elif provider == "azure":
+                return await self.chat_azure(messages, model=model, temperature=temperature)
+            return await self.chat_ollama(messages, model=model, temperature=temperature)
+
+    async def chat_message(
+        self,
+        messages: List[Dict],
+        tools: Optional[List[Dict]] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> Dict:
+        """
+        Full assistant message, including any tool calls, in OpenAI chat format:
+        {"role": "assistant", "content": ..., "tool_calls": [{"id", "type", "function": {"name", "arguments"}}]}.
+        """
+        provider, model = self.resolve(provider, model)
+        kwargs = {"tools": tools} if tools else {}
+        async with self.router.track(provider, model):
+            if provider == "ollama":
+                return await self._ollama_message(messages, model, temperature, tools)
+            client = self._openai() if provider == "openai" else self._azure()
+            await self._acquire(provider)
+            try:
+                response = await client.chat.completions.create(
+                    model=model, messages=messages, temperature=temperature, **kwargs
+                )
+            finally:
+                self._release(provider)
+        return response.choices[0].message.model_dump(exclude_none=True)
+
+    async def _ollama_message(self, messages, model: str, temperature: float, tools: Optional[List[Dict]]) -> Dict:
+        await self._acquire("ollama")
+        try:
+            payload = {"model": model, "messages": messages, "stream": False, "options": {"temperature": temperature}}
+            if tools:
+                payload["tools"] = tools
+            response = await self._http_client("ollama").post("/api/chat", json=payload)
+            response.raise_for_status()
+        finally:
+            self._release("ollama")
+        message = response.json()["message"]
+        # Ollama returns arguments as an object and no call ids; normalize to the OpenAI shape
+        calls = [
+            {
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {
+                    "name": call["function"]["name"],
+                    "arguments": json.dumps(call["function"].get("arguments", {})),
+                },
+            }
+            for i, call in enumerate(message.get("tool_calls") or [])
+        ]
+        result = {"role": "assistant", "content": message.get("content", "")}
+        if calls:
+            result["tool_calls"] = calls
+        return result
+
+    async def _acquire(self, provider: str):
+        await self._slots[provider].acquire()
+        self._in_flight[provider] += 1
+
+    def _release(self, provider: str):
+        self._in_flight[provider] -= 1
+        self._slots[provider].release()
+
+    async def chat_openai(self, messages, model: Optional[str] = None, temperature: float = 0.7) -> str:
+        await self._acquire("openai")
+        try:
+            response = await self._openai().chat.completions.create(
+                model=model or OPENAI_MODEL,
+                messages=messages,
+                temperature=temperature,
+            )
+        finally:
+            self._release("openai")
+        return response.choices[0].message.content
+
+    async def chat_azure(self, messages, model: Optional[str] = None, temperature: float = 0.7) -> str:
+        await self._acquire("azure")
+        try:
+            response = await self._azure().chat.completions.create(
+                model=model or AZURE_DEPLOYMENT,
+                messages=messages,
+                temperature=temperature,
+            )
+        finally:
+            self._release("azure")
         return response.choices[0].message.content
 
-    async def chat_azure(self, messages):
-        # Placeholder for Azure OpenAI API call
-        pass
+    async def chat_ollama(self, messages, model: Optional[str] = None, temperature: float = 0.7) -> str:
+        await self._acquire("ollama")
+        try:
+            response = await self._http_client("ollama").post(
+                "/api/chat",
+                json={
+                    "model": model or OLLAMA_MODEL,
+                    "messages": messages,
+                    "stream": False,
+                    "options": {"temperature": temperature},
+                },
+            )
+            response.raise_for_status()
+        finally:
+            self._release("ollama")
+        return response.json()["message"]["content"]
+
+    # -- streaming -----------------------------------------------------------
+
+    async def stream(
+        self,
+        messages: List[Dict],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        allowed: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[str]:
+        """Yield reply text deltas as the provider produces them."""
+        provider, model = self.resolve(provider, model, allowed)
+        if provider == "openai":
+            chunks = self.stream_openai(messages, model=model, temperature=temperature)
+        elif provider == "azure":
+            chunks = self.stream_azure(messages, model=model, temperature=temperature)
+        else:
+            chunks = self.stream_ollama(messages, model=model, temperature=temperature)
+        # Streams are scored by time-to-first-token, comparable with non-streaming calls.
+        # aclosing: a client that disconnects closes this generator; the provider stream
+        # must release its concurrency slot right then, not whenever it is garbage collected.
+        async with self.router.track(provider, model) as call, aclosing(chunks):
+            async for delta in chunks:
+                call.first_token()
+                yield delta
+
+    async def _stream_completion(self, provider: str, client, **kwargs) -> AsyncIterator[str]:
+        await self._acquire(provider)
+        try:
+            stream = await client.chat.completions.create(stream=True, **kwargs)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            self._release(provider)
+
+    def stream_openai(self, messages, model: Optional[str] = None, temperature: float = 0.7) -> AsyncIterator[str]:
+        # Returns the generator itself, so closing it runs the slot release directly
+        return self._stream_completion(
+            "openai", self._openai(), model=model or OPENAI_MODEL, messages=messages, temperature=temperature
+        )
+
+    def stream_azure(self, messages, model: Optional[str] = None, temperature: float = 0.7) -> AsyncIterator[str]:
+        return self._stream_completion(
+            "azure", self._azure(), model=model or AZURE_DEPLOYMENT, messages=messages, temperature=temperature
+        )
+
+    async def stream_ollama(self, messages, model: Optional[str] = None, temperature: float = 0.7) -> AsyncIterator[str]:
+        # Ollama streams NDJSON: one {"message": {...}, "done": bool} object per line
+        await self._acquire("ollama")
+        try:
+            async with self._http_client("ollama").stream(
+                "POST",
+                "/api/chat",
+                json={
+                    "model": model or OLLAMA_MODEL,
+                    "messages": messages,
+                    "stream": True,
+                    "options": {"temperature": temperature},
+                },
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    content = data.get("message", {}).get("content")
+                    if content:
+                        yield content
+                    if data.get("done"):
+                        break
+        finally:
+            self._release("ollama")
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            provider: {
+                "in_flight": self._in_flight[provider],
+                "max_concurrency": self.concurrency[provider],
+                "pool_open": provider in self._http and not self._http[provider].is_closed,
+            }
+            for provider in self.concurrency
+        }
+
 
-    async def chat_ollama(self, messages):
-        # Placeholder for Ollama API call
-        pass
+# ✅ Shared gateway, opened and closed by the FastAPI lifespan in app/main.py
+llm_gateway = LLMGateway()
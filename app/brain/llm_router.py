@@ -1,13 +1,12 @@
 # app/brain/llm_router.py
 
-from app.config import MODEL_PROVIDER, OPENAI_API_KEY
-from openai import AsyncOpenAI
-import httpx
-import os
+from app.config import MODEL_PROVIDER
+from app.brain.llm_gateway import llm_gateway
 
 class LLMRouter:
     def __init__(self):
         self.provider = MODEL_PROVIDER.lower()
+        self.gateway = llm_gateway
 
     async def chat(self, messages: list):
         if self.provider == "openai":
@@ -18,19 +17,7 @@ class LLMRouter:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
     async def _chat_with_openai(self, messages: list):
-        client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages
-        )
-        return response.choices[0].message.content
+        return await self.gateway.chat_openai(messages, model="gpt-3.5-turbo")
 
     async def _chat_with_ollama(self, messages: list):
-        # �� Ollama expects a string prompt (we'll collapse messages)
-        prompt = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:11434/api/generate",
-                json={"model": "llama3", "prompt": prompt, "stream": False}
-            )
-        return response.json().get("response", "[Error: no response]")
+        return await self.gateway.chat_ollama(messages, model="llama3")
@@ -2,19 +2,232 @@
 
 """
 CodexContinueGPT Planner - Converts objectives into step plans.
+
+A plan is a dependency graph of steps. PlanExecutor runs every step as soon
+as the steps it depends on have finished, so independent work (memory
+retrieval, tool calls) overlaps and only the model call waits for all of it.
 """
 
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+StepFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class PlanStep:
+    def __init__(self, name: str, fn: StepFn, depends_on: Iterable[str] = (), key: Optional[str] = None,
+                 description: str = ""):
+        self.name = name
+        self.fn = fn  # receives {dependency name: result}
+        self.depends_on = list(depends_on)
+        # Steps sharing a key run once per plan run and share the result
+        self.key = key
+        self.description = description or name
+
+
+class Plan:
+    def __init__(self, objective: str = ""):
+        self.objective = objective
+        self.steps: Dict[str, PlanStep] = {}
+
+    def add(self, name: str, fn: StepFn, depends_on: Iterable[str] = (), key: Optional[str] = None,
+            description: str = "") -> "Plan":
+        if name in self.steps:
+            raise ValueError(f"Duplicate step: {name}")
+        self.steps[name] = PlanStep(name, fn, depends_on, key, description)
+        return self
+
+    def order(self) -> List[str]:
+        """Topological order; raises ValueError on unknown dependencies or cycles."""
+        for step in self.steps.values():
+            for dependency in step.depends_on:
+                if dependency not in self.steps:
+                    raise ValueError(f"Step {step.name} depends on unknown step {dependency}")
+        ordered, state = [], {}
+
+        def visit(name: str):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Plan has a cycle through {name}")
+            state[name] = "visiting"
+            for dependency in self.steps[name].depends_on:
+                visit(dependency)
+            state[name] = "done"
+            ordered.append(name)
+
+        for name in self.steps:
+            visit(name)
+        return ordered
+
+
+class StepSkipped(Exception):
+    """A step did not run because something it depends on failed."""
+
+
+class PlanRun:
+    def __init__(self, plan: Plan):
+        self.plan = plan
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.status: Dict[str, str] = {name: "pending" for name in plan.steps}
+        self.wall_ms = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(status == "done" for status in self.status.values())
+
+    def critical_path(self) -> List[str]:
+        """The chain of dependencies that determined when the last step finished."""
+        finished = {name: t for name, t in self.timings.items() if "ended_ms" in t}
+        if not finished:
+            return []
+        path = [max(finished, key=lambda name: finished[name]["ended_ms"])]
+        while True:
+            dependencies = [d for d in self.plan.steps[path[-1]].depends_on if d in finished]
+            if not dependencies:
+                return path[::-1]
+            path.append(max(dependencies, key=lambda name: finished[name]["ended_ms"]))
+
+    def report(self) -> Dict:
+        path = self.critical_path()
+        return {
+            "ok": self.ok,
+            "wall_ms": self.wall_ms,
+            "critical_path": path,
+            "critical_path_ms": round(sum(self.timings[name]["duration_ms"] for name in path), 1),
+            "steps": {
+                name: {"status": self.status[name], **self.timings.get(name, {}),
+                       **({"error": self.errors[name]} if name in self.errors else {})}
+                for name in self.plan.steps
+            },
+        }
+
+
+class PlanExecutor:
+    """
+    Runs a Plan with maximum parallelism.
+
+    Each step starts once all its dependencies are done. When a step fails,
+    every step downstream of it is skipped; independent branches keep going
+    unless `fail_fast` is set, in which case everything still pending is
+    cancelled.
+    """
+
+    def __init__(self, fail_fast: bool = False):
+        self.fail_fast = fail_fast
+
+    async def run(self, plan: Plan) -> PlanRun:
+        plan.order()  # validate before starting anything
+        run = PlanRun(plan)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks: Dict[str, asyncio.Task] = {}
+        shared: Dict[str, asyncio.Future] = {}
+
+        def elapsed_ms() -> float:
+            return round((loop.time() - started) * 1000, 1)
+
+        def cancel_all(except_current: bool = False):
+            # Shared work runs in its own future (shielded from any one waiter), so cancel it directly
+            for future in [*tasks.values(), *shared.values()]:
+                if not (except_current and future is asyncio.current_task()):
+                    future.cancel()
+
+        async def execute(step: PlanStep):
+            inputs = {}
+            for dependency in step.depends_on:
+                try:
+                    inputs[dependency] = await tasks[dependency]
+                except (Exception, asyncio.CancelledError):
+                    run.status[step.name] = "skipped"
+                    raise StepSkipped(dependency)
+            run.status[step.name] = "running"
+            begin = elapsed_ms()
+            try:
+                if step.key is None:
+                    result = await step.fn(inputs)
+                else:
+                    # First step with this key runs it; the others reuse the result
+                    if step.key not in shared:
+                        shared[step.key] = asyncio.ensure_future(step.fn(inputs))
+                    result = await asyncio.shield(shared[step.key])
+            except asyncio.CancelledError:
+                run.status[step.name] = "cancelled"
+                raise
+            except Exception as e:
+                run.status[step.name] = "failed"
+                run.errors[step.name] = f"{type(e).__name__}: {e}"
+                logger.warning(f"⚠️ [PlanExecutor] Step {step.name} failed: {run.errors[step.name]}")
+                if self.fail_fast:
+                    cancel_all(except_current=True)
+                raise
+            finally:
+                end = elapsed_ms()
+                run.timings[step.name] = {"started_ms": begin, "ended_ms": end, "duration_ms": round(end - begin, 1)}
+            run.status[step.name] = "done"
+            run.results[step.name] = result
+            return result
+
+        for name in plan.order():
+            tasks[name] = asyncio.ensure_future(execute(plan.steps[name]))
+        try:
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            # Nothing started by this run outlives it, including when run() itself is cancelled
+            cancel_all()
+            await asyncio.gather(*tasks.values(), *shared.values(), return_exceptions=True)
+        for name, status in run.status.items():
+            if status in ("pending", "running"):
+                run.status[name] = "cancelled"
+        run.wall_ms = elapsed_ms()
+        return run
+
+
 class Planner:
     def __init__(self):
         self.objective = None
+        self.plan: Optional[Plan] = None
 
     def set_objective(self, text: str):
         self.objective = text
 
+    def build(
+        self,
+        retrieve_memory: Optional[Callable[[], Awaitable[Any]]] = None,
+        tools: Optional[Dict[str, Callable[[str], Awaitable[Any]]]] = None,
+        respond: Optional[Callable[[str, Dict[str, Any]], Awaitable[Any]]] = None,
+    ) -> Plan:
+        """
+        Standard agentic plan: memory retrieval and every tool call are independent
+        and run side by side; the model step waits for all of them.
+        """
+        plan = Plan(self.objective or "")
+        gathered = []
+        if retrieve_memory is not None:
+            plan.add("retrieve_memory", lambda _: retrieve_memory(), description="Retrieve relevant memory or context")
+            gathered.append("retrieve_memory")
+        for name, tool in (tools or {}).items():
+            step = f"tool:{name}"
+            plan.add(step, lambda _, tool=tool: tool(plan.objective), description=f"Call tool {name}")
+            gathered.append(step)
+        if respond is not None:
+            plan.add("respond", lambda inputs: respond(plan.objective, inputs), depends_on=gathered,
+                     description="Respond or execute task")
+        self.plan = plan
+        return plan
+
     def get_steps(self):
-        # Temporary stub — replace with actual LLM-driven planning
-        return [
-            "Step 1: Understand the user query",
-            "Step 2: Retrieve relevant memory or context",
-            "Step 3: Respond or execute task"
-        ]
+        if self.plan is None:
+            # Nothing built yet: the generic outline
+            return [
+                "Step 1: Understand the user query",
+                "Step 2: Retrieve relevant memory or context",
+                "Step 3: Respond or execute task"
+            ]
+        return [f"Step {i}: {self.plan.steps[name].description}" for i, name in enumerate(self.plan.order(), 1)]
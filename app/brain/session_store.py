@@ -2,7 +2,22 @@
 
 import os
 import json
-from typing import List, Dict
+import glob
+import shutil
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+from typing import List, Dict, Optional, Tuple
+
+from app.config import (
+    SESSION_STORE_MODE,
+    SESSION_SEGMENT_MAX_BYTES,
+    SESSION_MAX_SEGMENTS,
+    SESSION_FSYNC_EVERY,
+    SESSION_FSYNC_INTERVAL,
+)
 
 class SessionStore:
     def __init__(self, storage_path: str = "app/brain/logs"):
@@ -31,3 +46,458 @@ class SessionStore:
         path = self._get_file_path(session_id)
         if os.path.exists(path):
             os.remove(path)
+
+
+# Index record per message: segment number, byte offset, byte length
+INDEX_RECORD = struct.Struct("<IQI")
+INDEX_FILE = "index.bin"
+
+
+class JsonlSessionStore:
+    """
+    Append-only session storage.
+
+    Each session is a directory of JSONL segments (`seg-000001.jsonl`, ...) plus
+    an index of fixed-size (segment, offset, length) records, one per message.
+    Appends write one line and one index record, so they are O(1); `tail(n)`
+    reads the last n index records and only those byte ranges. Segments roll
+    over at `segment_max_bytes`. Once a session has more than `max_segments`,
+    its sealed segments (all but the one being appended to) are merged into one
+    by a background thread; the bytes are copied without holding the store lock
+    and only the index swap blocks writers. Session directories are sharded by
+    hash (`ab/cd/<session>`) so millions of sessions never share one directory.
+
+    Writes are fsynced in batches (every `fsync_every` appends, and by the
+    background thread every `fsync_interval` seconds, so an idle session's
+    tail is never left unsynced; also on flush/close). On first access after a
+    crash the index and the active segment are reconciled: index records that
+    point past the durable data are dropped, complete lines that were written
+    but not indexed are indexed, and a torn final line is truncated.
+
+    A session must only be written by one process at a time.
+    """
+
+    def __init__(
+        self,
+        storage_path: str = "app/brain/logs",
+        segment_max_bytes: int = SESSION_SEGMENT_MAX_BYTES,
+        max_segments: int = SESSION_MAX_SEGMENTS,
+        fsync_every: int = SESSION_FSYNC_EVERY,
+        fsync_interval: float = SESSION_FSYNC_INTERVAL,
+        max_open: int = 64,
+        background: bool = True,
+    ):
+        self.storage_path = storage_path
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.max_open = max_open
+        os.makedirs(storage_path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._recovered = set()
+        # session_id -> (segment number, segment file, index file), LRU ordered
+        self._open: "OrderedDict[str, Tuple[int, object, object]]" = OrderedDict()
+        self._dirty = set()
+        self._unsynced = 0
+        # Segment counts of open sessions, so appends never list the directory
+        self._segment_counts: Dict[str, int] = {}
+        self._pending_compaction = set()
+        self._compacting = set()
+        # Bumped by save/clear; a compaction that raced one of them is discarded
+        self._generations: Dict[str, int] = {}
+
+        self._stop = threading.Event()
+        self._maintainer: Optional[threading.Thread] = None
+        if background and fsync_interval > 0:
+            self._maintainer = threading.Thread(target=self._maintain_loop, name="session-store-maintainer",
+                                                daemon=True)
+            self._maintainer.start()
+
+    # -- layout --------------------------------------------------------------
+
+    def _session_dir(self, session_id: str) -> str:
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.storage_path, digest[:2], digest[2:4], quote(session_id, safe=""))
+
+    @staticmethod
+    def _segment_path(directory: str, number: int, suffix: str = "") -> str:
+        return os.path.join(directory, f"seg-{number:06d}.jsonl{suffix}")
+
+    @staticmethod
+    def _segment_numbers(directory: str) -> List[int]:
+        paths = glob.glob(os.path.join(directory, "seg-*.jsonl"))
+        return sorted(int(os.path.basename(p)[4:10]) for p in paths)
+
+    def _read_index(self, directory: str, start: int = 0, count: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        path = os.path.join(directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            f.seek(start * INDEX_RECORD.size)
+            data = f.read(-1 if count is None else count * INDEX_RECORD.size)
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        return [INDEX_RECORD.unpack_from(data, i) for i in range(0, usable, INDEX_RECORD.size)]
+
+    def _index_count(self, directory: str) -> int:
+        path = os.path.join(directory, INDEX_FILE)
+        return os.path.getsize(path) // INDEX_RECORD.size if os.path.exists(path) else 0
+
+    # -- crash recovery ------------------------------------------------------
+
+    def _recover(self, session_id: str):
+        if session_id in self._recovered:
+            return
+        self._recovered.add(session_id)
+        directory = self._session_dir(session_id)
+        if not os.path.isdir(directory):
+            return
+
+        index_path = os.path.join(directory, INDEX_FILE)
+        records = self._read_index(directory)
+
+        # Finish or discard an interrupted compaction
+        for pending in glob.glob(os.path.join(directory, "seg-*.jsonl.compact")):
+            number = int(os.path.basename(pending)[4:10])
+            if records and records[0][0] == number:
+                os.replace(pending, self._segment_path(directory, number))
+                # The merged segment supersedes every older one
+                for older in self._segment_numbers(directory):
+                    if older < number:
+                        os.remove(self._segment_path(directory, older))
+            else:
+                os.remove(pending)
+
+        # Drop index records whose data never reached the disk
+        sizes = {n: os.path.getsize(self._segment_path(directory, n)) for n in self._segment_numbers(directory)}
+        while records and records[-1][1] + records[-1][2] > sizes.get(records[-1][0], -1):
+            records.pop()
+
+        # Index complete lines that were written after the last durable index record
+        segments = self._segment_numbers(directory)
+        last_segment, indexed_end = (records[-1][0], records[-1][1] + records[-1][2]) if records else (0, 0)
+        for number in [n for n in segments if n >= last_segment]:
+            path = self._segment_path(directory, number)
+            offset = indexed_end if number == last_segment else 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            position = 0
+            while True:
+                end = data.find(b"\n", position)
+                if end < 0:
+                    break
+                try:
+                    json.loads(data[position:end])
+                except ValueError:
+                    break
+                records.append((number, offset + position, end + 1 - position))
+                position = end + 1
+            if position < len(data):
+                with open(path, "r+b") as f:
+                    f.truncate(offset + position)
+
+        with open(index_path + ".tmp", "wb") as f:
+            f.write(b"".join(INDEX_RECORD.pack(*r) for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_path + ".tmp", index_path)
+
+    # -- handles and fsync batching -----------------------------------------
+
+    def _handles(self, session_id: str, need_bytes: int):
+        directory = self._session_dir(session_id)
+        entry = self._open.get(session_id)
+        if entry is None:
+            os.makedirs(directory, exist_ok=True)
+            segments = self._segment_numbers(directory)
+            number = segments[-1] if segments else 1
+            self._segment_counts[session_id] = max(len(segments), 1)
+            if len(segments) > self.max_segments:
+                # Reopened already over the limit (e.g. written before a restart or under a larger limit)
+                self._pending_compaction.add(session_id)
+            entry = (
+                number,
+                open(self._segment_path(directory, number), "ab"),
+                open(os.path.join(directory, INDEX_FILE), "ab"),
+            )
+            self._open[session_id] = entry
+            while len(self._open) > self.max_open:
+                self._close_session(next(iter(self._open)))
+        self._open.move_to_end(session_id)
+
+        number, segment, index = entry
+        if segment.tell() and segment.tell() + need_bytes > self.segment_max_bytes:
+            # Roll over to a new segment
+            self._sync_session(session_id)
+            segment.close()
+            number += 1
+            segment = open(self._segment_path(directory, number), "ab")
+            entry = (number, segment, index)
+            self._open[session_id] = entry
+            self._segment_counts[session_id] = self._segment_counts.get(session_id, 1) + 1
+            if self._segment_counts[session_id] > self.max_segments:
+                self._pending_compaction.add(session_id)
+        return entry
+
+    def _sync_session(self, session_id: str):
+        entry = self._open.get(session_id)
+        if entry is None or session_id not in self._dirty:
+            return
+        _, segment, index = entry
+        # Data before index: an index record never points at non-durable bytes
+        segment.flush()
+        os.fsync(segment.fileno())
+        index.flush()
+        os.fsync(index.fileno())
+        self._dirty.discard(session_id)
+
+    def _close_session(self, session_id: str):
+        self._sync_session(session_id)
+        self._segment_counts.pop(session_id, None)
+        entry = self._open.pop(session_id, None)
+        if entry:
+            entry[1].close()
+            entry[2].close()
+
+    def _maybe_sync(self):
+        # Only the count-based batch syncs inline; time-based syncs are the background thread's job
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.flush()
+
+    def flush(self):
+        """Fsync every session written since the last flush."""
+        with self._lock:
+            for session_id in list(self._dirty):
+                self._sync_session(session_id)
+            self._unsynced = 0
+
+    def maintain(self):
+        """Fsync idle sessions' tails and run pending compactions (the background thread calls this)."""
+        if self._dirty:
+            self.flush()
+        with self._lock:
+            pending, self._pending_compaction = self._pending_compaction, set()
+        for session_id in pending:
+            self.compact(session_id)
+
+    def _maintain_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.maintain()
+            except OSError:
+                # Retried on the next tick; appends keep working meanwhile
+                pass
+
+    def close(self):
+        self._stop.set()
+        if self._maintainer is not None and self._maintainer is not threading.current_thread():
+            self._maintainer.join()
+        with self._lock:
+            for session_id in list(self._open):
+                self._close_session(session_id)
+
+    # -- public API (compatible with SessionStore) --------------------------
+
+    def append(self, session_id: str, message: Dict):
+        self.append_many(session_id, [message])
+
+    def append_many(self, session_id: str, messages: List[Dict]):
+        with self._lock:
+            self._recover(session_id)
+            for message in messages:
+                line = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+                number, segment, index = self._handles(session_id, len(line))
+                offset = segment.tell()
+                segment.write(line)
+                index.write(INDEX_RECORD.pack(number, offset, len(line)))
+                self._dirty.add(session_id)
+                self._maybe_sync()
+
+    def save(self, session_id: str, messages: List[Dict]):
+        """Replace the session's contents (written as a single compacted segment)."""
+        with self._lock:
+            self._recover(session_id)
+            self._generations[session_id] = self._generations.get(session_id, 0) + 1
+            self._rewrite(session_id, messages)
+
+    def load(self, session_id: str) -> List[Dict]:
+        with self._lock:
+            self._recover(session_id)
+            self._flush_buffers(session_id)
+            directory = self._session_dir(session_id)
+            records = self._read_index(directory)
+            return self._read_records(directory, records)
+
+    def tail(self, session_id: str, n: int) -> List[Dict]:
+        """Last n messages, read through the index without parsing the rest of the session."""
+        with self._lock:
+            self._recover(session_id)
+            self._flush_buffers(session_id)
+            directory = self._session_dir(session_id)
+            total = self._index_count(directory)
+            records = self._read_index(directory, start=max(total - n, 0)) if n > 0 else []
+            return self._read_records(directory, records)
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            self._recover(session_id)
+            self._flush_buffers(session_id)
+            return self._index_count(self._session_dir(session_id))
+
+    def list_sessions(self) -> List[str]:
+        sessions = []
+        for shard in glob.glob(os.path.join(self.storage_path, "??", "??", "*")):
+            if os.path.isdir(shard):
+                sessions.append(unquote(os.path.basename(shard)))
+        return sessions
+
+    def clear(self, session_id: str):
+        with self._lock:
+            entry = self._open.pop(session_id, None)
+            if entry:
+                entry[1].close()
+                entry[2].close()
+            self._dirty.discard(session_id)
+            self._segment_counts.pop(session_id, None)
+            self._pending_compaction.discard(session_id)
+            self._generations[session_id] = self._generations.get(session_id, 0) + 1
+            shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+
+    def compact(self, session_id: str) -> bool:
+        """
+        Merge the session's sealed segments into one; returns False if there was
+        nothing to merge or the merge lost a race with save/clear.
+
+        The merged segment takes the number of the newest sealed segment, so
+        segment numbers keep following write order and the active segment is
+        untouched. Appends continue while the bytes are copied.
+        """
+        with self._lock:
+            if session_id in self._compacting:
+                return False
+            self._recover(session_id)
+            directory = self._session_dir(session_id)
+            segments = self._segment_numbers(directory)
+            entry = self._open.get(session_id)
+            active = entry[0] if entry else (segments[-1] if segments else None)
+            sealed = [n for n in segments if n != active]
+            if len(sealed) < 2:
+                return False
+            # Sealed data and its index records must be durable before they are copied
+            self._sync_session(session_id)
+            sealed_set = set(sealed)
+            records = [r for r in self._read_index(directory) if r[0] in sealed_set]
+            generation = self._generations.get(session_id, 0)
+            self._compacting.add(session_id)
+
+        target = sealed[-1]
+        pending = self._segment_path(directory, target, ".compact")
+        switched = False
+        try:
+            merged, offset = [], 0
+            with open(pending, "wb") as out:
+                handles = {}
+                try:
+                    for number, start, length in records:
+                        f = handles.get(number)
+                        if f is None:
+                            f = handles[number] = open(self._segment_path(directory, number), "rb")
+                        f.seek(start)
+                        out.write(f.read(length))
+                        merged.append((target, offset, length))
+                        offset += length
+                finally:
+                    for f in handles.values():
+                        f.close()
+                out.flush()
+                os.fsync(out.fileno())
+
+            with self._lock:
+                self._sync_session(session_id)
+                current = self._read_index(directory)
+                if self._generations.get(session_id, 0) != generation or current[:len(records)] != records:
+                    os.remove(pending)
+                    return False
+                # The open index handle points at the file being replaced
+                self._close_session(session_id)
+                index_path = os.path.join(directory, INDEX_FILE)
+                with open(index_path + ".tmp", "wb") as f:
+                    f.write(b"".join(INDEX_RECORD.pack(*r) for r in merged + current[len(records):]))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(index_path + ".tmp", index_path)
+                switched = True
+                os.replace(pending, self._segment_path(directory, target))
+                for number in sealed[:-1]:
+                    os.remove(self._segment_path(directory, number))
+                return True
+        except OSError:
+            # Typically save/clear removed the session under us. Once the index is
+            # switched, recovery finishes the rename on next access instead.
+            if not switched and os.path.exists(pending):
+                os.remove(pending)
+            return False
+        finally:
+            with self._lock:
+                self._compacting.discard(session_id)
+
+    # -- internals -----------------------------------------------------------
+
+    def _flush_buffers(self, session_id: str):
+        entry = self._open.get(session_id)
+        if entry:
+            entry[1].flush()
+            entry[2].flush()
+
+    def _read_records(self, directory: str, records: List[Tuple[int, int, int]]) -> List[Dict]:
+        messages = []
+        handles = {}
+        try:
+            for number, offset, length in records:
+                f = handles.get(number)
+                if f is None:
+                    f = handles[number] = open(self._segment_path(directory, number), "rb")
+                f.seek(offset)
+                messages.append(json.loads(f.read(length)))
+        finally:
+            for f in handles.values():
+                f.close()
+        return messages
+
+    def _rewrite(self, session_id: str, messages: List[Dict]):
+        self._close_session(session_id)
+        directory = self._session_dir(session_id)
+        os.makedirs(directory, exist_ok=True)
+        old_segments = self._segment_numbers(directory)
+        number = (old_segments[-1] if old_segments else 0) + 1
+
+        # Write the merged segment under a temporary name, then switch the index atomically
+        records, offset = [], 0
+        pending = self._segment_path(directory, number, ".compact")
+        with open(pending, "wb") as f:
+            for message in messages:
+                line = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(line)
+                records.append((number, offset, len(line)))
+                offset += len(line)
+            f.flush()
+            os.fsync(f.fileno())
+        index_path = os.path.join(directory, INDEX_FILE)
+        with open(index_path + ".tmp", "wb") as f:
+            f.write(b"".join(INDEX_RECORD.pack(*r) for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_path + ".tmp", index_path)
+        os.replace(pending, self._segment_path(directory, number))
+        for old in old_segments:
+            os.remove(self._segment_path(directory, old))
+
+
+def create_session_store(storage_path: str = "app/brain/logs", mode: str = SESSION_STORE_MODE):
+    """Session store for the configured SESSION_STORE_MODE ("jsonl" or "json")."""
+    if mode == "jsonl":
+        return JsonlSessionStore(storage_path)
+    return SessionStore(storage_path)
@@ -0,0 +1,65 @@
+# app/brain/tool_executor.py
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+from app.brain.core.base import CodexTool
+from app.config import KERNEL_TOOL_TIMEOUT, KERNEL_TOOL_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# ✅ Process-wide cap on tool calls in flight, shared by every kernel
+tool_slots = asyncio.Semaphore(KERNEL_TOOL_CONCURRENCY)
+
+
+class ToolExecutor:
+    """
+    Runs the tool calls requested in one model turn concurrently.
+
+    Each call gets its own timeout and takes a slot from the shared
+    semaphore. A failing, slow or unknown tool never fails the turn: its
+    error becomes that call's output, so the model can react to it in the
+    next turn.
+    """
+
+    def __init__(
+        self,
+        tools: List[CodexTool],
+        timeout: float = KERNEL_TOOL_TIMEOUT,
+        slots: Optional[asyncio.Semaphore] = None,
+    ):
+        self.tools: Dict[str, CodexTool] = {tool.tool_name: tool for tool in tools}
+        self.timeout = timeout
+        self.slots = slots or tool_slots
+
+    def specs(self) -> List[Dict]:
+        return [tool.spec() for tool in self.tools.values()]
+
+    async def run_calls(self, calls: List[Dict], session_id: str) -> List[Dict]:
+        """One record per call, in order: {id, tool, ok, output, latency_ms}."""
+        return await asyncio.gather(*(self._run_one(call, session_id) for call in calls))
+
+    async def _run_one(self, call: Dict, session_id: str) -> Dict:
+        name = call["function"]["name"]
+        record = {"id": call.get("id"), "tool": name, "ok": False}
+        started = time.perf_counter()
+        try:
+            tool = self.tools.get(name)
+            if tool is None:
+                raise LookupError(f"unknown tool '{name}'")
+            arguments = json.loads(call["function"].get("arguments") or "{}")
+            prompt = arguments.get("prompt") if set(arguments) <= {"prompt"} else json.dumps(arguments)
+            async with self.slots:
+                output = await asyncio.wait_for(tool.run(prompt or "", session_id), self.timeout)
+            record.update(ok=True, output=str(output))
+        except asyncio.TimeoutError:
+            record["output"] = f"Error: tool '{name}' timed out after {self.timeout}s"
+        except Exception as e:
+            record["output"] = f"Error: {type(e).__name__}: {e}"
+        if not record["ok"]:
+            logger.warning(f"⚠️ [ToolExecutor] {record['output']}")
+        record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return record
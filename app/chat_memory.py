@@ -9,3 +9,8 @@ async def add_message(session_id: str, role: str, content: str):
 async def get_short_memory(session_id: str, limit: int = 5):
     memory = MemoryManager(session_id)
     return await memory.get_messages(mode="short", limit=limit)
+
+async def add_message_and_get_window(session_id: str, role: str, content: str, limit: int = 5):
+    """Save a message and fetch the short memory window in one Redis round trip."""
+    memory = MemoryManager(session_id)
+    return await memory.append_and_window(role, content, window=limit)
@@ -1,16 +1,38 @@
 # app/codex_prompt_engine/engine.py
 
 from app.codex_prompt_engine.prompt_templates import BASE_SYSTEM_PROMPT
+from app.codex_prompt_engine.tokenizer import count_tokens, message_tokens, budget_for, MESSAGE_OVERHEAD
 
 class CodexPromptEngine:
     def __init__(self, system_prompt: str = BASE_SYSTEM_PROMPT):
         self.system_prompt = system_prompt
 
-    def build_prompt(self, history: list[dict], user_input: str) -> list[dict]:
+    def build_prompt(self, history: list[dict], user_input: str, model: str = None, budget: int = None) -> list[dict]:
         """
         Combine system prompt, chat history, and new input into a prompt for the LLM.
+        History is trimmed oldest-first to fit the model's token budget.
         """
-        messages = [{"role": "system", "content": self.system_prompt}]
-        messages.extend(history)
-        messages.append({"role": "user", "content": user_input})
-        return messages
+        return self.build_context(history + [{"role": "user", "content": user_input}], model=model, budget=budget)
+
+    def build_context(self, history: list[dict], model: str = None, budget: int = None) -> list[dict]:
+        """
+        Fill the token budget newest-first from `history`, whose last message is the
+        current turn and is always kept. Token counts are read from each message's
+        cached "tokens" field, so this costs O(messages kept).
+        """
+        budget = budget or budget_for(model)
+        system = {"role": "system", "content": self.system_prompt}
+        used = count_tokens(self.system_prompt) + MESSAGE_OVERHEAD
+        kept = []
+        for i, message in enumerate(reversed(history)):
+            cost = message_tokens(message)
+            if i > 0 and used + cost > budget:
+                break
+            kept.append(message)
+            used += cost
+        kept.reverse()
+        # Providers only accept role/content; drop timestamps and token counts
+        return [system] + [{"role": m["role"], "content": m["content"]} for m in kept]
+
+# ✅ Shared prompt engine
+prompt_engine = CodexPromptEngine()
@@ -5,3 +5,10 @@ BASE_SYSTEM_PROMPT = (
     "Your responses should be helpful, short, and aligned with best practices. "
     "Use markdown where appropriate. NEVER guess, always clarify unclear queries."
 )
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a developer and CodexContinueGPT. "
+    "Merge the previous summary with the new turns into one concise summary. Keep decisions, "
+    "code identifiers, file names, errors, open questions and user preferences. "
+    "Reply with the summary only."
+)
@@ -0,0 +1,56 @@
+# app/codex_prompt_engine/tokenizer.py
+
+"""
+Token counting for prompt budgeting. Uses tiktoken when it is installed and
+its encoding can be loaded, otherwise a ~4 characters per token estimate.
+"""
+
+from typing import Dict
+
+from app.config import (
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_REPLY_RESERVE,
+    MODEL_CONTEXT_WINDOWS,
+)
+
+MESSAGE_OVERHEAD = 4  # role/separator tokens the chat format adds per message
+DEFAULT_CONTEXT_WINDOW = 8192
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict) -> int:
+    """Token cost of one chat message, cached on the message under "tokens"."""
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = count_tokens(str(message.get("content", "")))
+        message["tokens"] = tokens
+    return tokens + MESSAGE_OVERHEAD
+
+
+def budget_for(model: str = None) -> int:
+    """Prompt token budget for a model, leaving CONTEXT_REPLY_RESERVE for the reply."""
+    if CONTEXT_TOKEN_BUDGET:
+        return CONTEXT_TOKEN_BUDGET
+    window = MODEL_CONTEXT_WINDOWS.get(model or "", DEFAULT_CONTEXT_WINDOW)
+    return max(window - CONTEXT_REPLY_RESERVE, 256)
@@ -12,3 +12,175 @@ MODEL_PROVIDER = os.getenv("MODEL_PROVIDER")
 # Model Routing
 MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "openai")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+
+# Provider endpoints
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+AZURE_API_KEY = os.getenv("AZURE_API_KEY", OPENAI_API_KEY or "")
+AZURE_API_VERSION = os.getenv("AZURE_API_VERSION", "2024-02-01")
+AZURE_DEPLOYMENT = os.getenv("AZURE_DEPLOYMENT", "gpt-35-turbo")
+OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
+
+# LLM gateway connection pools (one long-lived pool per provider)
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() == "true"
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+
+# Per-provider concurrency caps
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+AZURE_MAX_CONCURRENCY = int(os.getenv("AZURE_MAX_CONCURRENCY", "32"))
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+
+# Hedged requests (opt-in): fire a backup provider when the primary is slow
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() == "true"
+LLM_HEDGE_BACKUP_PROVIDER = os.getenv("LLM_HEDGE_BACKUP_PROVIDER", "ollama")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.25"))
+LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "10"))
+
+# Adaptive routing (MODEL_PROVIDER=auto): candidate "provider:model" routes and score weights
+LLM_ROUTES = os.getenv("LLM_ROUTES", "openai:gpt-3.5-turbo,ollama:llama3")
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+ROUTER_LATENCY_WEIGHT = float(os.getenv("ROUTER_LATENCY_WEIGHT", "1.0"))
+ROUTER_ERROR_WEIGHT = float(os.getenv("ROUTER_ERROR_WEIGHT", "10.0"))
+ROUTER_INFLIGHT_WEIGHT = float(os.getenv("ROUTER_INFLIGHT_WEIGHT", "0.25"))
+ROUTER_EXPLORE_RATE = float(os.getenv("ROUTER_EXPLORE_RATE", "0.05"))
+DEFAULT_MODELS = {"openai": OPENAI_MODEL, "azure": AZURE_DEPLOYMENT, "ollama": OLLAMA_MODEL}
+
+# Exact-match response cache: in-process LRU/TTL first tier, Redis second tier
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_REDIS = os.getenv("RESPONSE_CACHE_REDIS", "true").lower() == "true"
+
+# Semantic response cache (local hashed embeddings + cosine similarity); opt-in, since
+# lexical similarity cannot tell every meaning-changing edit apart
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_SCOPE = os.getenv("SEMANTIC_CACHE_SCOPE", "session")  # "session" or "global" (shared by all users)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_CAPACITY = int(os.getenv("SEMANTIC_CACHE_CAPACITY", "4096"))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_OPT_OUT_TTL = int(os.getenv("SEMANTIC_CACHE_OPT_OUT_TTL", "86400"))  # idle opt-outs are forgotten after this
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+
+# Write-behind persistence of chat messages to SQLite
+MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "true").lower() == "true"
+MEMORY_WRITE_QUEUE_SIZE = int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "10000"))
+MEMORY_WRITE_BATCH_SIZE = int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "500"))
+MEMORY_WRITE_FLUSH_INTERVAL = float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "0.2"))
+
+# GET /memory keyset pages: default size for mode=full and the hard cap for any page
+MEMORY_PAGE_SIZE = int(os.getenv("MEMORY_PAGE_SIZE", "100"))
+MEMORY_PAGE_MAX = int(os.getenv("MEMORY_PAGE_MAX", "500"))
+
+# Shared Redis pool (one per process, opened/closed by the FastAPI lifespan)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+# SQLite message store: one writer connection, a pool of read-only connections
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "app/db/memory.db")
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "5"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "10"))
+SQLITE_POOL_TIMEOUT = float(os.getenv("SQLITE_POOL_TIMEOUT", "30"))
+# Pragmas applied to every connection (WAL lets readers run alongside the single writer)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+
+# Redis session lists: bounded length and idle expiry
+REDIS_HISTORY_MAXLEN = int(os.getenv("REDIS_HISTORY_MAXLEN", "200"))
+REDIS_SESSION_TTL = int(os.getenv("REDIS_SESSION_TTL", str(7 * 24 * 3600)))
+
+# Prompt context: per-model token budgets (prompt side, after reserving room for the reply)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))  # 0 = use the per-model table
+CONTEXT_REPLY_RESERVE = int(os.getenv("CONTEXT_REPLY_RESERVE", "1024"))
+CONTEXT_WINDOW_MESSAGES = int(os.getenv("CONTEXT_WINDOW_MESSAGES", "50"))
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-35-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4o": 128000,
+    "llama3": 8192,
+    "codellama": 16384,
+    "mistral": 8192,
+}
+
+# Rolling summarization of long sessions (runs in the background, off the request path)
+SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+SUMMARY_TRIGGER_TOKENS = int(os.getenv("SUMMARY_TRIGGER_TOKENS", "3000"))
+SUMMARY_KEEP_MESSAGES = int(os.getenv("SUMMARY_KEEP_MESSAGES", "8"))
+SUMMARY_PROVIDER = os.getenv("SUMMARY_PROVIDER", "")  # empty = MODEL_PROVIDER
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "")  # empty = provider's default (cheap) model
+
+# Brain session files: "json" (one file per session) or "jsonl" (append-only segments + index)
+SESSION_STORE_MODE = os.getenv("SESSION_STORE_MODE", "jsonl")
+SESSION_SEGMENT_MAX_BYTES = int(os.getenv("SESSION_SEGMENT_MAX_BYTES", str(4 * 1024 * 1024)))
+SESSION_MAX_SEGMENTS = int(os.getenv("SESSION_MAX_SEGMENTS", "8"))
+SESSION_FSYNC_EVERY = int(os.getenv("SESSION_FSYNC_EVERY", "64"))
+SESSION_FSYNC_INTERVAL = float(os.getenv("SESSION_FSYNC_INTERVAL", "1.0"))
+
+# Execution layer for blocking work called from async code
+EXEC_THREAD_WORKERS = int(os.getenv("EXEC_THREAD_WORKERS", "32"))
+EXEC_PROCESS_WORKERS = int(os.getenv("EXEC_PROCESS_WORKERS", str(os.cpu_count() or 2)))
+EXEC_DEFAULT_TIMEOUT = float(os.getenv("EXEC_DEFAULT_TIMEOUT", "60"))
+
+# Shell tool: wall-clock limit, captured-output cap and concurrent command limit
+SHELL_TIMEOUT = float(os.getenv("SHELL_TIMEOUT", "60"))
+SHELL_MAX_OUTPUT_BYTES = int(os.getenv("SHELL_MAX_OUTPUT_BYTES", str(1024 * 1024)))
+SHELL_MAX_CONCURRENCY = int(os.getenv("SHELL_MAX_CONCURRENCY", "4"))
+SHELL_KILL_GRACE = float(os.getenv("SHELL_KILL_GRACE", "2"))
+
+# Plugin lifecycle: "resident" keeps plugins initialized between calls, "per_call" re-initializes every time
+PLUGIN_LIFECYCLE = os.getenv("PLUGIN_LIFECYCLE", "resident")
+PLUGIN_WARMUP = os.getenv("PLUGIN_WARMUP", "")  # comma-separated plugin names, or "*" for all
+PLUGIN_IDLE_TTL = float(os.getenv("PLUGIN_IDLE_TTL", "1800"))  # 0 = never evict
+PLUGIN_HEALTH_INTERVAL = float(os.getenv("PLUGIN_HEALTH_INTERVAL", "60"))
+
+# Micro-batching for model-backed plugins (those implementing execute_batch)
+PLUGIN_BATCH_MAX_SIZE = int(os.getenv("PLUGIN_BATCH_MAX_SIZE", "32"))
+PLUGIN_BATCH_MAX_WAIT_MS = float(os.getenv("PLUGIN_BATCH_MAX_WAIT_MS", "5"))
+
+# Process isolation for CPU-heavy plugins: "name:workers" pairs, e.g. "huggingface_plugin:2"
+PLUGIN_PROCESS_PLUGINS = os.getenv("PLUGIN_PROCESS_PLUGINS", "")
+PLUGIN_PROCESS_START_METHOD = os.getenv("PLUGIN_PROCESS_START_METHOD", "spawn")
+PLUGIN_PROCESS_TIMEOUT = float(os.getenv("PLUGIN_PROCESS_TIMEOUT", "120"))
+PLUGIN_PROCESS_INIT_TIMEOUT = float(os.getenv("PLUGIN_PROCESS_INIT_TIMEOUT", "600"))
+PLUGIN_SHM_THRESHOLD = int(os.getenv("PLUGIN_SHM_THRESHOLD", str(1024 * 1024)))  # payloads above this go through shared memory
+
+# CodexKernel tool calling: per-call timeout, global concurrent tool calls, model turns per request
+KERNEL_TOOL_TIMEOUT = float(os.getenv("KERNEL_TOOL_TIMEOUT", "30"))
+KERNEL_TOOL_CONCURRENCY = int(os.getenv("KERNEL_TOOL_CONCURRENCY", "8"))
+KERNEL_MAX_TOOL_ROUNDS = int(os.getenv("KERNEL_MAX_TOOL_ROUNDS", "4"))
+
+# Short-term memory vector store (memory-mapped; empty path = in-process only)
+SHORT_TERM_STORE_PATH = os.getenv("SHORT_TERM_STORE_PATH", "app/memory/store/short_term")
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float32")  # or "float16" to halve memory
+SHORT_TERM_MAX_DOCS = int(os.getenv("SHORT_TERM_MAX_DOCS", "10000"))  # oldest writes are trimmed past this; 0 = unbounded
+
+# Embedding service: content-hash cache (in-memory LRU + SQLite file) in front of a batched backend
+# "auto" picks "local" when sentence-transformers is installed, else "openai" when a key is set, else "hash".
+# "hash" is a lexical stand-in for tests and offline demos, not a semantic model.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto")
+EMBEDDING_LOCAL_MODEL = os.getenv("EMBEDDING_LOCAL_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_LOCAL_DIM = int(os.getenv("EMBEDDING_LOCAL_DIM", "384"))  # output size of EMBEDDING_LOCAL_MODEL
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_BASE_URL = os.getenv("EMBEDDING_BASE_URL", OPENAI_BASE_URL)
+EMBEDDING_API_KEY = os.getenv("EMBEDDING_API_KEY", OPENAI_API_KEY or "")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))  # vectors held in memory per process
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "app/memory/store/embeddings.sqlite3")  # empty = memory only
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+# Long-term knowledge store (SQLite on disk, LRU hot tier in memory)
+LONG_TERM_STORE_PATH = os.getenv("LONG_TERM_STORE_PATH", "app/memory/store/long_term.sqlite3")
+LONG_TERM_CACHE_BYTES = int(os.getenv("LONG_TERM_CACHE_BYTES", str(64 * 1024 * 1024)))
+LONG_TERM_COMPACT_INTERVAL = float(os.getenv("LONG_TERM_COMPACT_INTERVAL", "300"))  # seconds; 0 = only on compact()
@@ -0,0 +1,164 @@
+# app/db/benchmark.py
+"""
+SQLite message-store benchmark: default settings vs the tuned engine.
+
+    python -m app.db.benchmark --rows 10000000
+
+For each profile a fresh database is filled with `--rows` messages spread over
+`--sessions` sessions, then it measures:
+  * write: small write-behind style transactions (rows/s)
+  * read:  the history fallback query for random sessions (queries/s)
+  * mixed: the same reads while a second connection keeps committing (queries/s)
+
+"baseline" is stock SQLite (rollback journal, synchronous=FULL, session_id-only
+index); "tuned" uses the pragmas and the (session_id, seq) index from app/db,
+so the numbers always describe the schema init_db ships.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.db.sqlite_conn import PRAGMAS
+from app.db.init_db import ADDED_INDEXES
+
+SCHEMA = """
+CREATE TABLE messages (
+    id INTEGER PRIMARY KEY,
+    session_id VARCHAR,
+    role VARCHAR,
+    content TEXT,
+    timestamp DATETIME,
+    token_count INTEGER,
+    seq INTEGER
+)
+"""
+HISTORY_QUERY = """
+SELECT role, content FROM messages
+WHERE session_id = ?
+ORDER BY seq DESC
+LIMIT ?
+"""
+INSERT = "INSERT INTO messages (session_id, role, content, timestamp, token_count, seq) VALUES (?, ?, ?, ?, ?, ?)"
+
+PROFILES = {
+    "baseline": {"pragmas": {}, "indexes": ["ix_messages_session_id ON messages (session_id)"]},
+    "tuned": {"pragmas": PRAGMAS, "indexes": [f"{name} ON {ddl}" for name, ddl in ADDED_INDEXES.items()]},
+}
+
+START = datetime(2024, 1, 1)
+
+
+def connect(path, pragmas, read_only=False):
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256 if pragmas else 128)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    if read_only:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def rows(start, count, sessions):
+    for i in range(start, start + count):
+        yield (
+            f"session-{i % sessions}",
+            "user" if i % 2 else "assistant",
+            f"message {i} " + "lorem ipsum " * 8,
+            (START + timedelta(seconds=i)).isoformat(" "),
+            24,
+            i,
+        )
+
+
+def fill(conn, total, sessions, chunk=50_000):
+    for start in range(0, total, chunk):
+        with conn:
+            conn.executemany(INSERT, rows(start, min(chunk, total - start), sessions))
+
+
+def bench_writes(conn, offset, sessions, batches, batch_size):
+    started = time.perf_counter()
+    for b in range(batches):
+        with conn:
+            conn.executemany(INSERT, rows(offset + b * batch_size, batch_size, sessions))
+    return batches * batch_size / (time.perf_counter() - started)
+
+
+def bench_reads(conn, sessions, count, limit):
+    started = time.perf_counter()
+    for _ in range(count):
+        conn.execute(HISTORY_QUERY, (f"session-{random.randrange(sessions)}", limit)).fetchall()
+    return count / (time.perf_counter() - started)
+
+
+def run_profile(name, args, directory):
+    profile = PROFILES[name]
+    path = os.path.join(directory, f"{name}.db")
+    writer = connect(path, profile["pragmas"])
+    writer.execute(SCHEMA)
+    for index in profile["indexes"]:
+        writer.execute(f"CREATE INDEX {index}")
+
+    started = time.perf_counter()
+    fill(writer, args.rows, args.sessions)
+    writer.execute("ANALYZE")
+    fill_rate = args.rows / (time.perf_counter() - started)
+
+    reader = connect(path, profile["pragmas"], read_only=bool(profile["pragmas"]))
+    write_rate = bench_writes(writer, args.rows, args.sessions, args.write_batches, args.batch_size)
+    read_rate = bench_reads(reader, args.sessions, args.reads, args.limit)
+
+    stop = threading.Event()
+
+    def background_writes():
+        offset = args.rows + args.write_batches * args.batch_size
+        while not stop.is_set():
+            try:
+                with writer:
+                    writer.executemany(INSERT, rows(offset, args.batch_size, args.sessions))
+            except sqlite3.OperationalError:
+                pass  # "database is locked" under the rollback journal
+            offset += args.batch_size
+
+    thread = threading.Thread(target=background_writes)
+    thread.start()
+    try:
+        mixed_rate = bench_reads(reader, args.sessions, args.reads, args.limit)
+    finally:
+        stop.set()
+        thread.join()
+
+    reader.close()
+    writer.close()
+    return {"fill rows/s": fill_rate, "write rows/s": write_rate, "read q/s": read_rate, "mixed read q/s": mixed_rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--write-batches", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--dir", default=None, help="where to create the databases (default: a temp dir)")
+    parser.add_argument("--profiles", default="baseline,tuned")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        results = {name: run_profile(name, args, directory) for name in args.profiles.split(",")}
+
+    metrics = list(next(iter(results.values())))
+    print(f"{args.rows:,} rows, {args.sessions:,} sessions")
+    print(f"{'':16}" + "".join(f"{name:>14}" for name in results))
+    for metric in metrics:
+        print(f"{metric:16}" + "".join(f"{results[name][metric]:>14,.0f}" for name in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,54 @@
 # app/db/init_db.py
 
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
 from app.db.models import Base
-import os
+from app.db.sqlite_conn import engine
 
-SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "app/db/memory.db")
-DATABASE_URL = f"sqlite+aiosqlite:///{SQLITE_DB_PATH}"
+# Columns added after the first release; existing databases get them via ALTER TABLE
+ADDED_COLUMNS = {
+    "messages": {"token_count": "INTEGER", "seq": "INTEGER"},
+}
 
-engine = create_async_engine(DATABASE_URL, future=True, echo=True)
+# One-off data migrations, keyed by the schema version (PRAGMA user_version) they
+# bring the database to; each runs once, never on every startup.
+# 1: rows written before `seq` existed; sequence ids are millisecond clocks, so
+#    backfilling with the row id keeps old messages ordered before new ones
+BACKFILLS = {
+    1: ["UPDATE messages SET seq = id WHERE seq IS NULL"],
+}
+SCHEMA_VERSION = max(BACKFILLS)
+
+# Indexes added after the first release (create_all only indexes brand-new tables),
+# and the ones they supersede
+ADDED_INDEXES = {
+    "ix_messages_session_seq": "messages (session_id, seq)",
+}
+DROPPED_INDEXES = ["ix_messages_session_id", "ix_messages_session_timestamp"]
+
+def _migrate(conn):
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+    version = conn.execute(text("PRAGMA user_version")).scalar()
+    for target in sorted(v for v in BACKFILLS if v > version):
+        for statement in BACKFILLS[target]:
+            conn.execute(text(statement))
+    if version < SCHEMA_VERSION:
+        conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    for name, ddl in ADDED_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {ddl}"))
+    for name in DROPPED_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    # Refresh planner statistics so the composite index is picked up right away
+    conn.execute(text("PRAGMA optimize"))
 
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_migrate)
 
 if __name__ == "__main__":
     asyncio.run(init_db())
@@ -1,6 +1,6 @@
 # app/db/models.py
 
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -8,9 +8,16 @@ Base = declarative_base()
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # History reads and keyset pages filter by session and walk the sequence id
+        Index("ix_messages_session_seq", "session_id", "seq"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String, index=True)
+    session_id = Column(String)
     role = Column(String)
     content = Column(Text)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    token_count = Column(Integer, nullable=True)
+    # Per-session, monotonically increasing message id shared with the Redis copy
+    seq = Column(Integer, nullable=True)
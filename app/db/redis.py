@@ -1,11 +1,56 @@
-import os
+# app/db/redis.py
+
+import logging
 import redis.asyncio as redis
 
-redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-client = redis.from_url(redis_url, decode_responses=True)
+from app.config import (
+    REDIS_URL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_HEALTH_CHECK_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_client = None
+
+def get_redis() -> redis.Redis:
+    """Return the process-wide async Redis client, creating its pool on first use."""
+    global _pool, _client
+    if _client is None:
+        _pool = redis.ConnectionPool.from_url(
+            REDIS_URL,
+            decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        _client = redis.Redis(connection_pool=_pool)
+    return _client
+
+async def init_redis():
+    """Create the shared pool and check connectivity; Redis being down is not fatal at startup."""
+    client = get_redis()
+    try:
+        await client.ping()
+        logger.info(f"🔌 [Redis] Pool ready (max {REDIS_MAX_CONNECTIONS} connections)")
+    except Exception as e:
+        logger.warning(f"⚠️ [Redis] Not reachable at startup: {e}")
+
+async def close_redis():
+    global _pool, _client
+    client, pool = _client, _pool
+    _client, _pool = None, None
+    if client is not None:
+        await client.aclose()
+    if pool is not None:
+        await pool.disconnect()
 
 async def save_message(session_id: str, message: str):
-    await client.rpush(session_id, message)
+    await get_redis().rpush(session_id, message)
 
 async def get_messages(session_id: str, limit=5):
-    return await client.lrange(session_id, -limit, -1)
+    return await get_redis().lrange(session_id, -limit, -1)
@@ -1,9 +1,23 @@
 import redis
-import os
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+from app.config import (
+    REDIS_URL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_HEALTH_CHECK_INTERVAL,
+)
 
-redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+# Sync client for scripts and tools; shares the async pool's settings (app/db/redis.py)
+redis_pool = redis.ConnectionPool.from_url(
+    REDIS_URL,
+    decode_responses=True,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+)
+redis_client = redis.Redis(connection_pool=redis_pool)
 
 def get_redis():
     return redis_client
@@ -1,16 +1,76 @@
 # app/db/sqlite_conn.py
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from contextlib import asynccontextmanager
-import os
 
-SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "app/db/memory.db")
+from app.config import (
+    SQLITE_DB_PATH,
+    SQLITE_POOL_SIZE,
+    SQLITE_MAX_OVERFLOW,
+    SQLITE_POOL_TIMEOUT,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_STATEMENT_CACHE,
+)
+
 SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{SQLITE_DB_PATH}"
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, future=True, echo=False)
+# Applied on every new connection; journal_mode is persistent but cheap to re-assert
+PRAGMAS = {
+    "journal_mode": SQLITE_JOURNAL_MODE,
+    "synchronous": SQLITE_SYNCHRONOUS,
+    "cache_size": -SQLITE_CACHE_SIZE_KB,  # negative = KiB rather than pages
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "temp_store": "MEMORY",
+}
+
+def apply_pragmas(dbapi_connection, pragmas=PRAGMAS, read_only: bool = False):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+def create_engine(url: str = SQLALCHEMY_DATABASE_URL, read_only: bool = False, **pool) -> AsyncEngine:
+    """Async SQLite engine with tuned pragmas and a per-connection statement cache."""
+    engine = create_async_engine(
+        url,
+        future=True,
+        echo=False,
+        pool_timeout=SQLITE_POOL_TIMEOUT,
+        # sqlite3 keeps this many prepared statements per connection
+        connect_args={"cached_statements": SQLITE_STATEMENT_CACHE},
+        **pool,
+    )
+    event.listen(engine.sync_engine, "connect", lambda conn, _: apply_pragmas(conn, read_only=read_only))
+    return engine
+
+# SQLite allows a single writer, so writes queue on one connection here instead of
+# contending for the file lock; with WAL, readers never wait behind that writer.
+engine = create_engine(pool_size=1, max_overflow=0)
+read_engine = create_engine(read_only=True, pool_size=SQLITE_POOL_SIZE, max_overflow=SQLITE_MAX_OVERFLOW)
+
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
 
 @asynccontextmanager
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+@asynccontextmanager
+async def get_read_db() -> AsyncSession:
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+async def dispose_engine():
+    await read_engine.dispose()
+    await engine.dispose()
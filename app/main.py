@@ -5,14 +5,53 @@ load_dotenv()
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from app.routes.chat import router as chat_router
 from app.routes.memory import router as memory_router
+from app.routes.assistant import router as assistant_router
+from app.routes.cache import router as cache_router
+from app.brain.llm_gateway import llm_gateway
+from app.memory.write_behind import message_writer
+from app.memory.summarizer import session_compactor
+from app.db.redis import init_redis, close_redis
+from app.services.executor import executor
+from app.services.embedding_cache import embedding_service
+from app.plugins.manager import plugin_manager
+from app.db.sqlite_conn import dispose_engine
+from app.db.init_db import init_db
+from app.config import MEMORY_WRITE_BEHIND
 from datetime import datetime
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🔌 Long-lived provider pools live for the whole process
+    await llm_gateway.startup()
+    # 🗄️ One Redis pool and one SQLAlchemy engine shared by every MemoryManager
+    await init_redis()
+    await init_db()
+    # 🧬 Warns when no real embedding model is configured and the lexical stand-in is in use
+    embedding_service.startup()
+    if MEMORY_WRITE_BEHIND:
+        await message_writer.start()
+    # 🧩 Resident plugins warm up in the background; startup does not wait for them
+    await plugin_manager.start()
+    yield
+    await plugin_manager.stop()
+    await embedding_service.stop()
+    # Finish background compactions and drain queued message rows before the pools go away
+    await session_compactor.drain()
+    await message_writer.stop()
+    await dispose_engine()
+    await close_redis()
+    await llm_gateway.aclose()
+    embedding_service.close()
+    executor.shutdown(wait=False)
+
 app = FastAPI(
     title="CodexContinue API",
     description="An AI-powered developer assistant backend.",
     version="0.2.0",
+    lifespan=lifespan,
 )
 
 # ✅ Add CORS Middleware
@@ -27,6 +66,7 @@ app.add_middleware(
 # ✅ Include routers properly
 app.include_router(chat_router)
 app.include_router(memory_router)
+app.include_router(cache_router)
 
 @app.get("/")
 def read_root():
@@ -43,6 +83,28 @@ def health_check():
 def get_version():
     return {"version": app.version}
 
+@app.get("/providers/scores")
+def provider_scores():
+    return {
+        "routes": llm_gateway.router.scores(),
+        "pools": llm_gateway.stats(),
+    }
+
+@app.get("/executor/stats")
+def executor_stats():
+    return executor.stats()
+
+@app.get("/plugins/stats")
+def plugin_stats():
+    return plugin_manager.stats()
+
+@app.get("/embeddings/stats")
+def embedding_stats():
+    return embedding_service.stats()
+
 @app.get("/openapi")
 def get_openapi():
     return app.openapi()
+
+# ✅ Mounted last so the app-level /chat and /health above keep precedence
+app.include_router(assistant_router)
@@ -0,0 +1,111 @@
+# app/memory/benchmark.py
+"""
+Short-term memory benchmark: built-in VectorStore vs the previous chromadb path.
+
+    python -m app.memory.benchmark --docs 100000
+
+Both backends get the same precomputed hashed embeddings, so this measures
+storage and search, not embedding. Reported per backend:
+  * add docs/s:    batched inserts (`--batch` documents per call)
+  * query p50/p95: top-k latency in milliseconds
+  * reopen ms:     time to open the persisted store again (restart cost)
+
+chromadb is optional; it is skipped when the package is not installed.
+VectorStore search is exact (a full scan), chromadb's HNSW index is
+approximate, so query latency grows linearly with --docs for the former only.
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.memory.vector_store import VectorStore
+from app.services.embeddings import hash_embed_many
+
+
+def corpus(count):
+    return [f"document {i} about topic {i % 97} with detail {i % 1013}" for i in range(count)]
+
+
+def timed_queries(search, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def bench_vector_store(ids, docs, vectors, queries, args, directory, dtype):
+    path = f"{directory}/vector_store_{dtype}"
+    store = VectorStore(dim=args.dim, path=path, dtype=dtype)
+    started = time.perf_counter()
+    for start in range(0, len(ids), args.batch):
+        end = start + args.batch
+        store.add_many(ids[start:end], vectors[start:end], docs[start:end])
+    add_rate = len(ids) / (time.perf_counter() - started)
+    p50, p95 = timed_queries(lambda q: store.search(q, args.top_k), queries)
+    store.close()
+    started = time.perf_counter()
+    reopened = VectorStore(dim=args.dim, path=path, dtype=dtype)
+    reopened.search(queries[0], args.top_k)
+    reopen_ms = (time.perf_counter() - started) * 1000
+    return add_rate, p50, p95, reopen_ms
+
+
+def bench_chromadb(ids, docs, vectors, queries, args, directory):
+    import chromadb
+
+    path = f"{directory}/chroma"
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection("short_term")
+    # chromadb caps the batch size it accepts per add
+    batch = min(args.batch, client.get_max_batch_size())
+    started = time.perf_counter()
+    for start in range(0, len(ids), batch):
+        end = start + batch
+        collection.add(ids=ids[start:end], embeddings=vectors[start:end].tolist(), documents=docs[start:end])
+    add_rate = len(ids) / (time.perf_counter() - started)
+    p50, p95 = timed_queries(
+        lambda q: collection.query(query_embeddings=[q.tolist()], n_results=args.top_k), queries
+    )
+    started = time.perf_counter()
+    reopened = chromadb.PersistentClient(path=path).get_collection("short_term")
+    reopened.query(query_embeddings=[queries[0].tolist()], n_results=args.top_k)
+    reopen_ms = (time.perf_counter() - started) * 1000
+    return add_rate, p50, p95, reopen_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    docs = corpus(args.docs)
+    ids = [f"doc-{i}" for i in range(args.docs)]
+    vectors = hash_embed_many(docs, args.dim)
+    queries = hash_embed_many([f"topic {i % 97} detail {i}" for i in range(args.queries)], args.dim)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        results["numpy f32"] = bench_vector_store(ids, docs, vectors, queries, args, directory, "float32")
+        results["numpy f16"] = bench_vector_store(ids, docs, vectors, queries, args, directory, "float16")
+        try:
+            results["chromadb"] = bench_chromadb(ids, docs, vectors, queries, args, directory)
+        except ImportError:
+            print("chromadb not installed; skipping it")
+
+    print(f"{args.docs:,} docs, dim {args.dim}, top-{args.top_k}")
+    print(f"{'':12}{'add docs/s':>12}{'query p50':>12}{'query p95':>12}{'reopen ms':>12}")
+    for name, (add_rate, p50, p95, reopen_ms) in results.items():
+        print(f"{name:12}{add_rate:>12,.0f}{p50:>12.2f}{p95:>12.2f}{reopen_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,179 @@
 # app/memory/manager.py
 
-from typing import List, Dict
-from app.db.sqlite_conn import get_db
+from typing import List, Dict, Optional
+from sqlalchemy import select, text
 from app.db.models import Message
+from app.db.sqlite_conn import get_db, get_read_db
+from app.db.redis import get_redis
+from app.memory.write_behind import message_writer
+from app.config import REDIS_HISTORY_MAXLEN, REDIS_SESSION_TTL
+from app.codex_prompt_engine.tokenizer import count_tokens
 from redis import asyncio as aioredis
 from datetime import datetime
 import json
-import os
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "app/db/memory.db")
+# Append one message, trim the list, refresh TTLs and return the rolling summary
+# (if any) plus the tail window, all in a single atomic round trip.
+# Each message gets a per-session sequence id: the server clock in milliseconds,
+# bumped past the previous id when needed, so it stays monotonic even after the
+# counter key expires. It is set on the decoded message before re-encoding
+# (cjson prints integers up to 14 digits exactly; ms timestamps have 13).
+APPEND_TURN_LUA = """
+local now = redis.call('TIME')
+local seq = math.max(tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000),
+                     tonumber(redis.call('GET', KEYS[3]) or '0') + 1)
+local message = cjson.decode(ARGV[1])
+message['seq'] = seq
+redis.call('RPUSH', KEYS[1], cjson.encode(message))
+seq = string.format('%.0f', seq)
+local maxlen = tonumber(ARGV[2])
+if maxlen > 0 then
+    redis.call('LTRIM', KEYS[1], -maxlen, -1)
+end
+local ttl = tonumber(ARGV[3])
+if ttl > 0 then
+    redis.call('EXPIRE', KEYS[1], ttl)
+    redis.call('EXPIRE', KEYS[2], ttl)
+    redis.call('SET', KEYS[3], seq, 'EX', ttl)
+else
+    redis.call('SET', KEYS[3], seq)
+end
+local window = tonumber(ARGV[4])
+if window > 0 then
+    local summary = redis.call('HGET', KEYS[2], 'message') or ''
+    return {seq, summary, redis.call('LRANGE', KEYS[1], -window, -1)}
+end
+return {seq, '', {}}
+"""
+
+def summary_key(session_id: str) -> str:
+    return f"{session_id}:summary"
+
+def seq_key(session_id: str) -> str:
+    return f"{session_id}:seq"
+
+def _public(message: Dict) -> Dict:
+    return {key: message.get(key) for key in ("seq", "role", "content", "timestamp")}
 
 class MemoryManager:
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, redis: aioredis.Redis = None):
         self.session_id = session_id
-        self.redis = aioredis.from_url(REDIS_URL, decode_responses=True)
+        # Cheap to construct: every instance shares the process-wide Redis pool
+        self.redis = redis or get_redis()
+        self._append_turn = self.redis.register_script(APPEND_TURN_LUA)
 
     async def save_message(self, role: str, content: str):
-        message = {"role": role, "content": content, "timestamp": datetime.utcnow().isoformat()}
-        # Save to Redis list
-        await self.redis.rpush(self.session_id, json.dumps(message))
+        await self.append_and_window(role, content, window=0)
 
-        # Save to SQLite
-        async with get_db() as db:
-            db.add(Message(session_id=self.session_id, role=role, content=content))
-            await db.commit()
+    async def append_and_window(self, role: str, content: str, window: int = 5) -> List[Dict]:
+        """
+        Save a message and return the last `window` messages (including it) in one
+        Redis round trip, preceded by the session's rolling summary when one exists.
+        """
+        now = datetime.utcnow()
+        # Token count is computed once here and travels with the message from then on
+        tokens = count_tokens(content)
+        message = {"role": role, "content": content, "timestamp": now.isoformat(), "tokens": tokens}
+        # Save to Redis list (bounded to REDIS_HISTORY_MAXLEN, expires after REDIS_SESSION_TTL idle)
+        seq, summary, tail = await self._append_turn(
+            keys=[self.session_id, summary_key(self.session_id), seq_key(self.session_id)],
+            args=[json.dumps(message), REDIS_HISTORY_MAXLEN, REDIS_SESSION_TTL, window],
+        )
+
+        # Save to SQLite (queued for a batched write when write-behind is running)
+        await message_writer.enqueue(
+            {"session_id": self.session_id, "role": role, "content": content, "timestamp": now, "token_count": tokens,
+             "seq": int(seq)}
+        )
+        # A rolling summary stands in for the turns already folded out of the list
+        history = [json.loads(summary)] if summary else []
+        return history + [json.loads(m) for m in tail]
 
     async def get_messages(self, mode: str = "short", limit: int = 5) -> List[Dict]:
         try:
             messages = await self.redis.lrange(self.session_id, -limit if mode == "short" else 0, -1)
             return [json.loads(m) for m in messages]
         except Exception:
-            async with get_db() as db:
+            async with get_read_db() as db:
                 query = await db.execute(
-                    f"""
+                    text("""
                     SELECT role, content FROM messages
                     WHERE session_id = :session_id
-                    ORDER BY timestamp DESC
+                    ORDER BY seq DESC
                     LIMIT :limit
-                    """,
+                    """),
                     {"session_id": self.session_id, "limit": limit if mode == "short" else 1000}
                 )
                 rows = query.fetchall()
                 return [{"role": row[0], "content": row[1]} for row in rows[::-1]]
 
+    async def page(self, limit: int = 50, before: Optional[int] = None, since: Optional[int] = None) -> Dict:
+        """
+        Keyset page over the session's message sequence ids.
+
+        With `since`, returns the oldest `limit` messages after that cursor (for
+        polling); otherwise the newest `limit` messages before `before` (or the
+        latest ones). The Redis list is a contiguous tail of the history, so
+        anything at or after its first id is served from it and only older
+        messages are read from SQLite.
+        """
+        try:
+            tail = [json.loads(m) for m in await self.redis.lrange(self.session_id, 0, -1)]
+            tail = [m for m in tail if "seq" in m]  # entries written before sequence ids existed
+        except Exception:
+            tail = []
+        floor = tail[0]["seq"] if tail else None
+
+        if since is not None:
+            newer = [m for m in tail if m["seq"] > since]
+            if floor is None or since < floor:
+                newer = await self._read_rows(after=since, before=floor, limit=limit + 1) + newer
+            messages, has_more = newer[:limit], len(newer) > limit
+        else:
+            older = [m for m in tail if before is None or m["seq"] < before]
+            if len(older) <= limit:
+                upper = floor if before is None or (floor is not None and floor < before) else before
+                rows = await self._read_rows(before=upper, limit=limit + 1 - len(older), newest=True)
+                older = rows + older
+            messages, has_more = older[-limit:], len(older) > limit
+
+        messages = [_public(m) for m in messages]
+        return {
+            "messages": messages,
+            "has_more": has_more,
+            # Pass as `before` to page further back / as `since` to poll for new messages
+            "next_cursor": messages[0]["seq"] if messages and has_more and since is None else None,
+            "latest_cursor": messages[-1]["seq"] if messages else since,
+        }
+
+    async def _read_rows(
+        self, after: Optional[int] = None, before: Optional[int] = None, limit: int = 50, newest: bool = False
+    ) -> List[Dict]:
+        """Messages with after < seq < before from SQLite, oldest first (the newest `limit` if `newest`)."""
+        query = select(Message.seq, Message.role, Message.content, Message.timestamp).where(
+            Message.session_id == self.session_id
+        )
+        if after is not None:
+            query = query.where(Message.seq > after)
+        if before is not None:
+            query = query.where(Message.seq < before)
+        query = query.order_by(Message.seq.desc() if newest else Message.seq).limit(limit)
+        async with get_read_db() as db:
+            rows = (await db.execute(query)).all()
+        if newest:
+            rows = rows[::-1]
+        return [
+            {"seq": row.seq, "role": row.role, "content": row.content,
+             "timestamp": row.timestamp.isoformat() if row.timestamp else None}
+            for row in rows
+        ]
+
     async def reset(self):
-        await self.redis.delete(self.session_id)
+        # Let queued rows land first so they are not resurrected after the delete
+        await message_writer.flush()
+        await self.redis.delete(self.session_id, summary_key(self.session_id), seq_key(self.session_id))
         async with get_db() as db:
-            await db.execute("DELETE FROM messages WHERE session_id = :session_id", {"session_id": self.session_id})
+            await db.execute(text("DELETE FROM messages WHERE session_id = :session_id"), {"session_id": self.session_id})
             await db.commit()
 
 
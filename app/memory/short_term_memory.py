@@ -1,16 +1,61 @@
-import chromadb
-from chromadb.utils import embedding_functions
+# app/memory/short_term_memory.py
+
+from typing import Dict, List, Optional, Sequence
+
+from app.config import SHORT_TERM_STORE_PATH, SHORT_TERM_MAX_DOCS, VECTOR_STORE_DTYPE
+from app.memory.vector_store import VectorStore
+from app.services.embedding_cache import EmbeddingService, embedding_service
 
 class ShortTermMemory:
-    def __init__(self):
-        self.client = chromadb.Client()
-        self.collection = self.client.create_collection("short_term")
+    """
+    Semantic recall over recent documents.
+
+    Vectors come from the shared EmbeddingService, which by default runs a
+    real model: all-MiniLM-L6-v2 in-process (the model chromadb used) when
+    sentence-transformers is installed, else the configured OpenAI-compatible
+    endpoint. The lexical hash backend is only a stand-in for tests and
+    offline demos and logs a warning at startup.
+
+    The store keeps the `max_docs` most recently written documents.
+    """
+
+    def __init__(
+        self,
+        path: str = SHORT_TERM_STORE_PATH,
+        embedder: Optional[EmbeddingService] = None,
+        dtype: str = VECTOR_STORE_DTYPE,
+        max_docs: int = SHORT_TERM_MAX_DOCS,
+    ):
+        # Identical documents and repeated queries are embedded once, then served from the cache
+        self.embedder = embedder or embedding_service
+        self.dim = self.embedder.dim
+        # Safe to construct repeatedly and from several workers: they all map the same files.
+        # Vectors from another embedding backend are not comparable, so such a store starts over.
+        self.store = VectorStore(dim=self.dim, path=path or None, dtype=dtype, model=self.embedder.backend.name,
+                                 max_items=max_docs, reset_on_mismatch=True)
 
     def add_document(self, doc_id: str, content: str):
-        self.collection.add(
-            documents=[content],
-            ids=[doc_id]
-        )
+        self.add_documents([doc_id], [content])
+
+    def add_documents(self, doc_ids: Sequence[str], contents: Sequence[str]):
+        """Embed and insert a batch of documents in one pass."""
+        self.store.add_many(doc_ids, self.embedder.embed_many(contents), contents)
+
+    async def aadd_documents(self, doc_ids: Sequence[str], contents: Sequence[str]):
+        """Like add_documents, but embedding misses are batched with other concurrent callers."""
+        self.store.add_many(doc_ids, await self.embedder.aembed_many(contents), contents)
+
+    def query_memory(self, query: str, top_k: int = 3) -> Dict[str, List[List]]:
+        return self._result(self.store.search(self.embedder.embed(query), top_k))
+
+    async def aquery_memory(self, query: str, top_k: int = 3) -> Dict[str, List[List]]:
+        return self._result(self.store.search(await self.embedder.aembed(query), top_k))
 
-    def query_memory(self, query: str, top_k: int = 3):
-        return self.collection.query(query_texts=[query], n_results=top_k)
+    @staticmethod
+    def _result(hits) -> Dict[str, List[List]]:
+        # Same shape as the chromadb query result this replaced (one query, cosine distances)
+        return {
+            "ids": [[doc_id for doc_id, _, _ in hits]],
+            "documents": [[document for _, _, document in hits]],
+            "distances": [[round(1.0 - score, 6) for _, score, _ in hits]],
+        }
@@ -0,0 +1,193 @@
+# app/memory/summarizer.py
+
+import asyncio
+import json
+import logging
+import secrets
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from app.brain.llm_gateway import LLMGateway, llm_gateway
+from app.codex_prompt_engine.prompt_templates import SUMMARY_SYSTEM_PROMPT
+from app.codex_prompt_engine.tokenizer import count_tokens, message_tokens
+from app.config import (
+    SUMMARY_ENABLED,
+    SUMMARY_TRIGGER_TOKENS,
+    SUMMARY_KEEP_MESSAGES,
+    SUMMARY_PROVIDER,
+    SUMMARY_MODEL,
+    REDIS_SESSION_TTL,
+)
+from app.db.redis import get_redis
+from app.memory.manager import summary_key
+
+logger = logging.getLogger(__name__)
+
+LOCK_TTL = 300  # seconds; a compaction that outlives its lock can no longer apply or release it
+
+# Fold the first N list entries into the summary, but only if this worker still
+# holds the session's compaction lock and the list still starts with exactly
+# the entries that were summarized (a concurrent trim or compaction aborts the
+# swap instead of losing messages).
+APPLY_SUMMARY_LUA = """
+if redis.call('GET', KEYS[3]) ~= ARGV[6] then
+    return 0
+end
+local n = tonumber(ARGV[1])
+if redis.call('LINDEX', KEYS[1], n - 1) ~= ARGV[2] then
+    return 0
+end
+redis.call('LTRIM', KEYS[1], n, -1)
+redis.call('HSET', KEYS[2], 'message', ARGV[3])
+redis.call('HINCRBY', KEYS[2], 'folded_messages', n)
+redis.call('HINCRBY', KEYS[2], 'saved_tokens', ARGV[4])
+local ttl = tonumber(ARGV[5])
+if ttl > 0 then
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+return 1
+"""
+
+# Delete the lock only if it still holds our token (it may have expired and been taken by another worker)
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def lock_key(session_id: str) -> str:
+    return f"{session_id}:summary:lock"
+
+
+class SessionCompactor:
+    """
+    Background compaction of long Redis sessions into a rolling summary.
+
+    When the history seen by a turn passes `trigger_tokens`, everything but the
+    newest `keep_recent` messages is folded (together with the previous summary)
+    into a new summary by a cheap model. The summary is stored next to the
+    session and returned in place of those turns; the raw rows stay in SQLite.
+    Compactions run as background tasks, at most one per session at a time.
+    """
+
+    def __init__(
+        self,
+        gateway: LLMGateway = llm_gateway,
+        redis=None,
+        trigger_tokens: int = SUMMARY_TRIGGER_TOKENS,
+        keep_recent: int = SUMMARY_KEEP_MESSAGES,
+        provider: Optional[str] = SUMMARY_PROVIDER or None,
+        model: Optional[str] = SUMMARY_MODEL or None,
+        enabled: bool = SUMMARY_ENABLED,
+    ):
+        self.gateway = gateway
+        self.redis = redis
+        self.trigger_tokens = trigger_tokens
+        self.keep_recent = keep_recent
+        self.provider = provider
+        self.model = model
+        self.enabled = enabled
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.counters = {"compactions": 0, "skipped": 0, "failed": 0, "saved_tokens": 0}
+
+    def _redis(self):
+        return self.redis or get_redis()
+
+    def needs_compaction(self, history: List[Dict]) -> bool:
+        turns = [m for m in history if not m.get("summary")]
+        return len(turns) > self.keep_recent and sum(message_tokens(m) for m in turns) > self.trigger_tokens
+
+    def maybe_schedule(self, session_id: str, history: List[Dict]) -> bool:
+        """Start a background compaction if the session is over budget and not already compacting."""
+        if not self.enabled or session_id in self._running or not self.needs_compaction(history):
+            return False
+        self._running.add(session_id)
+        task = asyncio.create_task(self._run(session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run(self, session_id: str):
+        try:
+            await self.compact(session_id)
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.warning(f"⚠️ [SessionCompactor] Compaction of {session_id} failed: {e}")
+        finally:
+            self._running.discard(session_id)
+
+    async def compact(self, session_id: str) -> int:
+        """Fold older turns into the summary; returns the number of tokens saved (0 if nothing to do)."""
+        redis = self._redis()
+        lock, token = lock_key(session_id), secrets.token_hex(16)
+        # Cross-worker guard: only one process compacts a session at a time
+        if not await redis.set(lock, token, nx=True, ex=LOCK_TTL):
+            self.counters["skipped"] += 1
+            return 0
+        try:
+            raw = await redis.lrange(session_id, 0, -1)
+            if len(raw) <= self.keep_recent:
+                return 0
+            folded_raw = raw[: len(raw) - self.keep_recent]
+            folded = [json.loads(m) for m in folded_raw]
+            previous = await redis.hget(summary_key(session_id), "message")
+            previous = json.loads(previous) if previous else None
+
+            summary_text = await self.summarize(folded, previous["content"] if previous else "")
+            summary_tokens = count_tokens(summary_text)
+            saved = sum(message_tokens(m) for m in folded) - (summary_tokens - (previous or {}).get("tokens", 0))
+            summary = {
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary_text}",
+                "timestamp": datetime.utcnow().isoformat(),
+                "tokens": summary_tokens,
+                "summary": True,
+            }
+            applied = await redis.register_script(APPLY_SUMMARY_LUA)(
+                keys=[session_id, summary_key(session_id), lock],
+                args=[len(folded_raw), folded_raw[-1], json.dumps(summary), saved, REDIS_SESSION_TTL, token],
+            )
+            if not applied:
+                self.counters["skipped"] += 1
+                return 0
+            self.counters["compactions"] += 1
+            self.counters["saved_tokens"] += saved
+            logger.info(f"🗜️ [SessionCompactor] {session_id}: folded {len(folded)} messages, saved ~{saved} tokens")
+            return saved
+        finally:
+            await redis.register_script(RELEASE_LOCK_LUA)(keys=[lock], args=[token])
+
+    async def summarize(self, messages: List[Dict], previous_summary: str = "") -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"Previous summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}",
+            },
+        ]
+        return await self.gateway.chat(prompt, provider=self.provider, model=self.model, temperature=0.2)
+
+    def stats(self) -> Dict:
+        return {**self.counters, "running": len(self._running)}
+
+    async def session_stats(self, session_id: str) -> Dict:
+        """Folded message count and tokens saved for one session."""
+        info = await self._redis().hgetall(summary_key(session_id))
+        return {
+            "folded_messages": int(info.get("folded_messages", 0)),
+            "saved_tokens": int(info.get("saved_tokens", 0)),
+            "has_summary": "message" in info,
+        }
+
+    async def drain(self):
+        """Wait for in-flight compactions (called on shutdown)."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+# ✅ Shared compactor
+session_compactor = SessionCompactor()
@@ -0,0 +1,349 @@
+# app/memory/vector_store.py
+
+import fcntl
+import json
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import EMBEDDING_DIM
+
+logger = logging.getLogger(__name__)
+
+# float16 has no BLAS path in NumPy, so half-precision matrices are scored in float32 blocks
+SCORE_BLOCK_ROWS = 65536
+
+
+class VectorStore:
+    """
+    Dense vector index: one contiguous (rows x dim) matrix plus a parallel id list.
+
+    Vectors are L2-normalized on insert, so top-k by cosine similarity is one
+    matrix-vector product followed by `argpartition`. Adding an existing id
+    overwrites its row. With `max_items`, the store is trimmed to its most
+    recently written 90% whenever it grows past that bound, so search (an
+    exact scan) stays bounded too.
+
+    With a `path`, the matrix lives in a memory-mapped file. Every process that
+    opens the same path maps the same pages, and reopening after a restart
+    does not copy the vectors. Files in the directory:
+
+      vectors-<epoch>.bin   raw matrix, `capacity` rows (grown by doubling)
+      ids-<epoch>.jsonl     one [id, document] line per write; the last line for an id wins
+      meta.json             {"dim", "dtype", "model", "epoch", "count", "capacity", "ids_bytes"},
+                            rewritten atomically after the data it describes is flushed
+
+    Trimming, and compacting an id log full of overwrites, write the next
+    epoch's files and then switch meta.json, so other processes never see a
+    matrix change under them; they reload from the new epoch.
+
+    `model` names the embedding backend that produced the vectors. Opening a
+    store written with another model, dim or dtype raises ValueError, or starts
+    the store over when `reset_on_mismatch` is set.
+
+    Writers take an exclusive file lock and pick up other processes' rows
+    before appending. Readers call `refresh()` (done by `search`) to see new rows.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, path: Optional[str] = None, dtype: str = "float32",
+                 capacity: int = 1024, model: str = "", max_items: int = 0, reset_on_mismatch: bool = False):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.path = path
+        self.model = model
+        self.max_items = max_items
+        self.reset_on_mismatch = reset_on_mismatch
+        self.initial_capacity = max(capacity, 1)
+        self.capacity = self.initial_capacity
+        self._reset_state()
+        self._epoch: Optional[str] = None
+        self._meta_version = None
+        if path:
+            os.makedirs(path, exist_ok=True)
+            with self._locked():
+                self._load()
+        else:
+            self.matrix = np.zeros((self.capacity, dim), dtype=self.dtype)
+
+    def _reset_state(self):
+        self.count = 0
+        self.ids: List[str] = []
+        self.documents: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.written: List[int] = []  # per row: position of its latest write, for recency
+        self._writes = 0
+        self._ids_bytes = 0
+
+    # -- files ---------------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _data_files(self, epoch: Optional[str]) -> Tuple[str, str]:
+        # Stores written before epochs existed use the unsuffixed names
+        suffix = f"-{epoch}" if epoch else ""
+        return self._file(f"vectors{suffix}.bin"), self._file(f"ids{suffix}.jsonl")
+
+    @contextmanager
+    def _locked(self):
+        with open(self._file(".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self._file("meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _map(self, capacity: int):
+        path = self._data_files(self._epoch)[0]
+        size = capacity * self.dim * self.dtype.itemsize
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.matrix = np.memmap(path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def _create(self):
+        """Start an empty store in a fresh epoch (its files are new, so mapped old ones stay valid)."""
+        old = self._epoch
+        self._reset_state()
+        self._epoch = uuid.uuid4().hex
+        self._map(self.initial_capacity)
+        open(self._data_files(self._epoch)[1], "wb").close()
+        self._write_meta()
+        self._remove_epoch(old)
+
+    def _remove_epoch(self, epoch: Optional[str]):
+        if epoch == self._epoch:
+            return
+        for name in self._data_files(epoch):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+
+    def _load(self):
+        meta = self._read_meta()
+        if meta is None:
+            self._create()
+            return
+        found = (meta.get("model", ""), meta["dtype"], meta["dim"])
+        if found != (self.model, self.dtype.name, self.dim):
+            message = (f"{self.path} holds {found[0] or 'unlabelled'} {found[1]} x {found[2]} vectors, "
+                       f"not {self.model or 'unlabelled'} {self.dtype.name} x {self.dim}")
+            if not self.reset_on_mismatch:
+                raise ValueError(message)
+            logger.warning(f"⚠️ [VectorStore] {message}; starting the store over")
+            self._epoch = meta.get("epoch")
+            self._create()
+            return
+        if meta.get("epoch") != self._epoch or meta["ids_bytes"] < self._ids_bytes:
+            # First load, or another process trimmed or reset the store: read its new epoch from the start
+            self._reset_state()
+            self._epoch = meta.get("epoch")
+            self._map(meta["capacity"])
+        elif meta["capacity"] != self.capacity or not hasattr(self, "matrix"):
+            self._map(meta["capacity"])
+        # Only the id lines written since the last load are read
+        with open(self._data_files(self._epoch)[1], "rb") as f:
+            f.seek(self._ids_bytes)
+            data = f.read(meta["ids_bytes"] - self._ids_bytes)
+        for line in data.splitlines():
+            doc_id, document = json.loads(line)
+            row = self.rows.get(doc_id)
+            if row is None:
+                row = self.rows[doc_id] = len(self.ids)
+                self.ids.append(doc_id)
+                self.documents.append(document)
+                self.written.append(self._writes)
+            else:
+                self.documents[row] = document
+                self.written[row] = self._writes
+            self._writes += 1
+        self._ids_bytes = meta["ids_bytes"]
+        self.count = meta["count"]
+        self._meta_version = self._stat_meta()
+
+    def _stat_meta(self):
+        # meta.json is replaced, never edited, so a new inode means a new version
+        stat = os.stat(self._file("meta.json"))
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _write_meta(self):
+        meta = {"dim": self.dim, "dtype": self.dtype.name, "model": self.model, "epoch": self._epoch,
+                "count": self.count, "capacity": self.capacity, "ids_bytes": self._ids_bytes}
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file("meta.json"))
+        self._meta_version = self._stat_meta()
+
+    def _refresh(self):
+        try:
+            version = self._stat_meta()
+        except FileNotFoundError:
+            return
+        if version != self._meta_version:
+            self._load()
+
+    def refresh(self):
+        """Pick up rows added by other processes sharing the same path."""
+        if not self.path:
+            return
+        try:
+            version = self._stat_meta()
+        except FileNotFoundError:
+            return
+        if version != self._meta_version:
+            # Loads take the lock so a concurrent trim cannot remove the epoch being read
+            with self._locked():
+                self._refresh()
+
+    # -- writes --------------------------------------------------------------
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        if self.path:
+            self.matrix.flush()
+            self._map(capacity)
+        else:
+            grown = np.zeros((capacity, self.dim), dtype=self.dtype)
+            grown[: self.count] = self.matrix[: self.count]
+            self.matrix, self.capacity = grown, capacity
+
+    def add_many(self, ids: Sequence[str], vectors: np.ndarray, documents: Optional[Sequence[str]] = None):
+        """Insert or overwrite a batch of vectors in one pass."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        if self.path:
+            with self._locked():
+                self._refresh()
+                self._add(ids, vectors, documents)
+                self._maybe_compact()
+        else:
+            self._add(ids, vectors, documents)
+            self._maybe_compact()
+
+    def _add(self, ids, vectors, documents):
+        # Last occurrence wins within the batch, like repeated single adds
+        latest = {doc_id: i for i, doc_id in enumerate(ids)}
+        new_ids = [doc_id for doc_id in latest if doc_id not in self.rows]
+        self._grow(self.count + len(new_ids))
+        for doc_id in new_ids:
+            self.rows[doc_id] = self.count
+            self.ids.append(doc_id)
+            self.documents.append(None)
+            self.written.append(0)
+            self.count += 1
+        order = list(latest.values())
+        target = np.fromiter((self.rows[ids[i]] for i in order), dtype=np.int64, count=len(order))
+        self.matrix[target] = vectors[order].astype(self.dtype)
+        for i in order:
+            row = self.rows[ids[i]]
+            self.documents[row] = documents[i]
+            self.written[row] = self._writes
+            self._writes += 1
+
+        if self.path:
+            lines = "".join(json.dumps([ids[i], documents[i]]) + "\n" for i in order).encode("utf-8")
+            self.matrix.flush()
+            with open(self._data_files(self._epoch)[1], "r+b") as f:
+                # Drop anything a crashed writer appended without committing it to meta.json
+                f.seek(self._ids_bytes)
+                f.truncate()
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._ids_bytes += len(lines)
+            self._write_meta()
+
+    def _maybe_compact(self):
+        if self.max_items and self.count > self.max_items:
+            self._compact(self.max_items - self.max_items // 10)
+        elif self.path and self._writes > 2 * self.count + 1024:
+            # Mostly overwrites: rewrite the id log so reloads do not replay them
+            self._compact(self.count)
+
+    def _compact(self, keep: int):
+        """Keep the `keep` most recently written rows, in write order, in a new epoch."""
+        kept = np.argsort(np.asarray(self.written[: self.count]), kind="stable")[self.count - keep:]
+        capacity = self.initial_capacity
+        while capacity < keep:
+            capacity *= 2
+        ids = [self.ids[i] for i in kept]
+        documents = [self.documents[i] for i in kept]
+        if self.path:
+            old, self._epoch = self._epoch, uuid.uuid4().hex
+            vectors_file, ids_file = self._data_files(self._epoch)
+            with open(vectors_file, "wb") as f:
+                f.truncate(capacity * self.dim * self.dtype.itemsize)
+            matrix = np.memmap(vectors_file, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+            matrix[:keep] = self.matrix[kept]
+            matrix.flush()
+            lines = "".join(json.dumps([doc_id, document]) + "\n" for doc_id, document in zip(ids, documents))
+            with open(ids_file, "wb") as f:
+                f.write(lines.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._ids_bytes = len(lines.encode("utf-8"))
+        else:
+            old = None
+            matrix = np.zeros((capacity, self.dim), dtype=self.dtype)
+            matrix[:keep] = self.matrix[kept]
+        self.matrix, self.capacity, self.count = matrix, capacity, keep
+        self.ids, self.documents, self.written = ids, documents, list(range(keep))
+        self.rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        self._writes = keep
+        if self.path:
+            self._write_meta()
+            self._remove_epoch(old)
+
+    # -- reads ---------------------------------------------------------------
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        live = self.matrix[: self.count]
+        if self.dtype == np.float32:
+            return live @ query
+        scores = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, SCORE_BLOCK_ROWS):
+            block = live[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def search(self, vector: np.ndarray, top_k: int = 3) -> List[Tuple[str, float, Optional[str]]]:
+        """[(id, cosine similarity, document)], best first."""
+        self.refresh()
+        k = min(top_k, self.count)
+        if k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self._scores(query)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.ids[i], float(scores[i]), self.documents[i]) for i in best]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        if self.path and isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
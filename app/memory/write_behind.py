@@ -0,0 +1,143 @@
+# app/memory/write_behind.py
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.config import (
+    MEMORY_WRITE_QUEUE_SIZE,
+    MEMORY_WRITE_BATCH_SIZE,
+    MEMORY_WRITE_FLUSH_INTERVAL,
+)
+from app.db.models import Message
+from app.db.sqlite_conn import get_db
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+async def write_messages(rows: List[Dict]):
+    """Insert a batch of message rows in a single transaction."""
+    async with get_db() as db:
+        await db.execute(insert(Message), rows)
+        await db.commit()
+
+
+class MessageWriter:
+    """
+    Write-behind queue for SQLite message rows.
+
+    `enqueue` returns as soon as the row is queued; a background task drains
+    the queue in multi-row transactions whenever `batch_size` rows are waiting
+    or `flush_interval` seconds have passed since the first queued row.
+    `stop()` drains everything, so lifespan shutdown is durable. When the
+    writer is not running, rows are written synchronously.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[Dict]], Awaitable[None]] = write_messages,
+        max_queue: int = MEMORY_WRITE_QUEUE_SIZE,
+        batch_size: int = MEMORY_WRITE_BATCH_SIZE,
+        flush_interval: float = MEMORY_WRITE_FLUSH_INTERVAL,
+        retries: int = 3,
+    ):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"written": 0, "batches": 0, "failed": 0, "last_batch_size": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"🗄️ [MessageWriter] Write-behind started (batch={self.batch_size}, interval={self.flush_interval}s)")
+
+    async def enqueue(self, row: Dict):
+        if not self.running:
+            await self.sink([row])
+            return
+        # A full queue applies backpressure instead of dropping messages
+        await self.queue.put(row)
+
+    async def flush(self):
+        """Wait until every queued row has been written."""
+        if self.running:
+            await self.queue.join()
+
+    async def stop(self):
+        if not self.running:
+            return
+        await self.queue.put(_STOP)
+        await self._task
+        self._task = None
+        logger.info(f"🗄️ [MessageWriter] Stopped after writing {self.counters['written']} rows")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is _STOP:
+                self.queue.task_done()
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    self.queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def _write(self, batch: List[Dict]):
+        for attempt in range(1, self.retries + 1):
+            try:
+                await self.sink(batch)
+                self.counters["written"] += len(batch)
+                self.counters["batches"] += 1
+                self.counters["last_batch_size"] = len(batch)
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ [MessageWriter] Batch of {len(batch)} failed (attempt {attempt}): {e}")
+                await asyncio.sleep(0.1 * attempt)
+        self.counters["failed"] += len(batch)
+        logger.error(f"❌ [MessageWriter] Dropped {len(batch)} rows after {self.retries} attempts")
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "running": self.running,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.max_queue,
+        }
+
+
+# ✅ Shared writer, started and drained by the FastAPI lifespan when MEMORY_WRITE_BEHIND is on
+message_writer = MessageWriter()
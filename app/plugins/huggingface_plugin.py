@@ -1,22 +1,43 @@
-
 # app/plugins/huggingface_plugin.py
 
 from transformers import pipeline
-from interface import PluginInterface
+from app.plugins.interface import PluginInterface
+from app.services.executor import runs_in, THREAD
 
 class HuggingFacePlugin(PluginInterface):
     def __init__(self):
         self.model = None
 
+    # Model loading and inference block; torch releases the GIL, so threads are enough
+    @runs_in(THREAD, timeout=300)
     def initialize(self):
         # Load a sentiment-analysis model
         self.model = pipeline('sentiment-analysis')
         print("Hugging Face model loaded.")
 
+    @runs_in(THREAD)
     def execute(self, data):
         # Perform sentiment analysis
         return self.model(data)
 
+    @runs_in(THREAD)
+    def execute_batch(self, batch):
+        # One forward pass for every queued call; each call may carry a text or a list of texts
+        texts, sizes = [], []
+        for data in batch:
+            items = data if isinstance(data, list) else [data]
+            texts.extend(items)
+            sizes.append(len(items))
+        results = self.model(texts, batch_size=len(texts))
+        scattered, start = [], 0
+        for size in sizes:
+            scattered.append(results[start:start + size])
+            start += size
+        return scattered
+
+    def health_check(self) -> bool:
+        return self.model is not None
+
     def shutdown(self):
         # Clean up resources
         self.model = None
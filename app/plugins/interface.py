@@ -1,4 +1,3 @@
-
 # app/plugins/interface.py
 
 from abc import ABC, abstractmethod
@@ -8,7 +7,7 @@ class PluginInterface(ABC):
     def initialize(self):
         """Initialize the plugin."""
         pass
-pass
+
     @abstractmethod
     def execute(self, data):
         """Execute the plugin's main functionality."""
@@ -18,3 +17,7 @@ pass
     def shutdown(self):
         """Clean up resources before shutting down the plugin."""
         pass
+
+    def health_check(self) -> bool:
+        """Report whether an initialized plugin can still serve calls."""
+        return True
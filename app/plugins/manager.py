@@ -1,13 +1,85 @@
+# app/plugins/manager.py
 
 import os
-from typing import Dict
+import time
+import asyncio
+import inspect
+import logging
+import resource
+from typing import Dict, Iterable, Optional
 from importlib import import_module
-from interface import PluginInterface
+from app.plugins.interface import PluginInterface
+from app.services.executor import executor
+from app.services.micro_batcher import MicroBatcher
+from app.plugins.process_host import ProcessPlugin, parse_process_plugins
+from app.config import (
+    PLUGIN_LIFECYCLE,
+    PLUGIN_WARMUP,
+    PLUGIN_IDLE_TTL,
+    PLUGIN_HEALTH_INTERVAL,
+    PLUGIN_BATCH_MAX_SIZE,
+    PLUGIN_BATCH_MAX_WAIT_MS,
+    PLUGIN_PROCESS_PLUGINS,
+)
+
+logger = logging.getLogger(__name__)
+
+def _rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class _PluginState:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.ready = False
+        self.init_seconds: Optional[float] = None
+        self.rss_bytes: Optional[int] = None
+        self.initializations = 0
+        self.calls = 0
+        self.in_flight = 0  # resident calls between ensure_ready and their result
+        self.errors = 0
+        self.last_used = 0.0
+        self.healthy: Optional[bool] = None
 
 class PluginManager:
-    def __init__(self, plugin_directory: str = 'app/plugins'):
+    """
+    Loads plugins and runs them.
+
+    In "resident" mode a plugin is initialized on first use (or by the startup
+    warm-up), kept in memory between calls, health-checked periodically, and
+    shut down on idle eviction or application exit. "per_call" mode keeps the
+    original initialize/execute/shutdown-per-call behaviour.
+
+    Resident plugins that implement `execute_batch(items) -> results` get a
+    micro-batching front-end: concurrent calls are merged into one batch call
+    (sized by `max_batch_size` / `max_batch_wait_ms` on the plugin, or the
+    PLUGIN_BATCH_* settings).
+
+    Plugins listed in `process_plugins` ({name: workers}) run in their own
+    worker processes (see ProcessPlugin) instead of the API process.
+    """
+
+    def __init__(
+        self,
+        plugin_directory: str = os.path.dirname(os.path.abspath(__file__)),
+        lifecycle: str = PLUGIN_LIFECYCLE,
+        idle_ttl: float = PLUGIN_IDLE_TTL,
+        health_interval: float = PLUGIN_HEALTH_INTERVAL,
+        process_plugins: Optional[Dict[str, int]] = None,
+    ):
         self.plugin_directory = plugin_directory
+        self.lifecycle = lifecycle
+        self.idle_ttl = idle_ttl
+        self.health_interval = health_interval
+        self.process_plugins = parse_process_plugins(PLUGIN_PROCESS_PLUGINS) if process_plugins is None else process_plugins
         self.plugins: Dict[str, PluginInterface] = {}
+        self.state: Dict[str, _PluginState] = {}
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self._tasks = []
         self.load_plugins()
 
     def load_plugins(self):
@@ -15,20 +87,182 @@ class PluginManager:
         for filename in os.listdir(self.plugin_directory):
             if filename.endswith('_plugin.py') and filename != 'interface.py':
                 module_name = filename[:-3]
-                module = import_module(f'app.plugins.{module_name}')
-                plugin_class = getattr(module, module_name.title().replace('_', ''))
-                if issubclass(plugin_class, PluginInterface):
-                    self.plugins[module_name] = plugin_class()
+                try:
+                    module = import_module(f'app.plugins.{module_name}')
+                except ImportError as e:
+                    logger.warning(f"⚠️ [PluginManager] Skipping {module_name}: {e}")
+                    continue
+                for _, plugin_class in inspect.getmembers(module, inspect.isclass):
+                    if issubclass(plugin_class, PluginInterface) and plugin_class.__module__ == module.__name__:
+                        if module_name in self.process_plugins:
+                            plugin = ProcessPlugin(plugin_class, workers=self.process_plugins[module_name])
+                        else:
+                            plugin = plugin_class()
+                        self.register(module_name, plugin)
+
+    def register(self, name: str, plugin: PluginInterface):
+        self.plugins[name] = plugin
+        self.state[name] = _PluginState()
+        if hasattr(plugin, "execute_batch"):
+            self.batchers[name] = MicroBatcher(
+                lambda items, plugin=plugin: executor.call(plugin.execute_batch, items),
+                max_batch_size=getattr(plugin, "max_batch_size", PLUGIN_BATCH_MAX_SIZE),
+                max_wait_ms=getattr(plugin, "max_batch_wait_ms", PLUGIN_BATCH_MAX_WAIT_MS),
+            )
 
-    def execute_plugin(self, name: str, data):
+    def _get(self, name: str) -> PluginInterface:
         plugin = self.plugins.get(name)
-        if plugin:
-            plugin.initialize()
-            result = plugin.execute(data)
-            plugin.shutdown()
-            return result
-        else:
+        if plugin is None:
             raise ValueError(f"Plugin {name} not found")
+        return plugin
+
+    # -- lifecycle -----------------------------------------------------------
+
+    async def ensure_ready(self, name: str) -> PluginInterface:
+        """Initialize a plugin once; concurrent first callers share the initialization."""
+        plugin = self._get(name)
+        state = self.state[name]
+        if state.ready:
+            return plugin
+        async with state.lock:
+            if not state.ready:
+                rss_before, started = _rss_bytes(), time.perf_counter()
+                await executor.call(plugin.initialize)
+                state.init_seconds = time.perf_counter() - started
+                # Approximate: anything else allocating meanwhile is counted too
+                state.rss_bytes = max(_rss_bytes() - rss_before, 0)
+                state.initializations += 1
+                state.ready, state.healthy = True, True
+                state.last_used = time.monotonic()
+                logger.info(
+                    f"🔌 [PluginManager] {name} ready in {state.init_seconds:.2f}s "
+                    f"(+{state.rss_bytes / 1e6:.1f} MB)"
+                )
+        return plugin
+
+    async def release(self, name: str, force: bool = False) -> bool:
+        """
+        Shut a resident plugin down; the next call initializes it again.
+
+        A plugin with calls in flight is left running (returns False) unless
+        `force` is set, as on application exit.
+        """
+        plugin, state = self._get(name), self.state[name]
+        async with state.lock:
+            if state.in_flight and not force:
+                return False
+            if state.ready:
+                state.ready = False
+                try:
+                    await executor.call(plugin.shutdown)
+                except Exception as e:
+                    logger.warning(f"⚠️ [PluginManager] {name} shutdown failed: {e}")
+        return True
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None):
+        # One at a time, so each plugin's memory footprint is measured on its own
+        for name in names if names is not None else list(self.plugins):
+            try:
+                await self.ensure_ready(name)
+            except Exception as e:
+                logger.error(f"❌ [PluginManager] Warm-up of {name} failed: {e}")
+
+    async def check_health(self, name: str) -> bool:
+        plugin, state = self._get(name), self.state[name]
+        try:
+            state.healthy = bool(await executor.call(plugin.health_check))
+        except Exception:
+            state.healthy = False
+        if not state.healthy:
+            if await self.release(name):
+                logger.warning(f"⚠️ [PluginManager] {name} failed its health check; released it")
+            else:
+                logger.warning(f"⚠️ [PluginManager] {name} failed its health check; release deferred, calls in flight")
+        return state.healthy
+
+    async def _maintain(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            now = time.monotonic()
+            for name, state in self.state.items():
+                if not state.ready or state.in_flight:
+                    continue
+                if self.idle_ttl and now - state.last_used > self.idle_ttl:
+                    if await self.release(name):
+                        logger.info(f"💤 [PluginManager] Evicted idle plugin {name}")
+                else:
+                    await self.check_health(name)
+
+    async def start(self, warmup: str = PLUGIN_WARMUP):
+        """Start background warm-up and maintenance (resident mode only)."""
+        if self.lifecycle != "resident":
+            return
+        names = list(self.plugins) if warmup.strip() == "*" else [n.strip() for n in warmup.split(",") if n.strip()]
+        if names:
+            self._tasks.append(asyncio.create_task(self.warm_up([n for n in names if n in self.plugins])))
+        if self.health_interval > 0:
+            self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        for name in list(self.plugins):
+            await self.release(name, force=True)
+
+    # -- calls ---------------------------------------------------------------
+
+    async def execute_plugin(self, name: str, data):
+        plugin = self._get(name)
+        state = self.state[name]
+        state.calls += 1
+        try:
+            if self.lifecycle == "resident":
+                # Counted before ensure_ready so eviction and health checks cannot release it mid-call
+                state.in_flight += 1
+                try:
+                    await self.ensure_ready(name)
+                    state.last_used = time.monotonic()
+                    if name in self.batchers:
+                        return await self.batchers[name].submit(data)
+                    return await executor.call(plugin.execute, data)
+                finally:
+                    state.in_flight -= 1
+                    state.last_used = time.monotonic()
+            # Each step runs in the execution class the plugin declares (thread pool by default)
+            await executor.call(plugin.initialize)
+            try:
+                return await executor.call(plugin.execute, data)
+            finally:
+                await executor.call(plugin.shutdown)
+        except Exception:
+            state.errors += 1
+            raise
 
     def list_plugins(self):
         return list(self.plugins.keys())
+
+    def stats(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        return {
+            name: {
+                "ready": state.ready,
+                "healthy": state.healthy,
+                "init_ms": round(state.init_seconds * 1000, 1) if state.init_seconds is not None else None,
+                "rss_bytes": state.rss_bytes,
+                "initializations": state.initializations,
+                "calls": state.calls,
+                "in_flight": state.in_flight,
+                "errors": state.errors,
+                "idle_seconds": round(now - state.last_used, 1) if state.ready else None,
+                "batching": self.batchers[name].stats() if name in self.batchers else None,
+                "workers": self.plugins[name].worker_stats() if isinstance(self.plugins[name], ProcessPlugin) else None,
+            }
+            for name, state in self.state.items()
+        }
+
+# ✅ Shared plugin manager, started and stopped by the FastAPI lifespan in app/main.py
+plugin_manager = PluginManager()
@@ -0,0 +1,268 @@
+# app/plugins/process_host.py
+
+import asyncio
+import logging
+import multiprocessing
+import pickle
+import time
+from importlib import import_module
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional
+
+from app.plugins.interface import PluginInterface
+from app.services.executor import executor, runs_in, ASYNC
+from app.config import (
+    PLUGIN_PROCESS_START_METHOD,
+    PLUGIN_PROCESS_TIMEOUT,
+    PLUGIN_PROCESS_INIT_TIMEOUT,
+    PLUGIN_SHM_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PluginWorkerError(RuntimeError):
+    """A plugin call failed inside (or lost) its worker process."""
+
+
+def parse_process_plugins(spec: str) -> Dict[str, int]:
+    """"huggingface_plugin:2,parser_plugin" -> {"huggingface_plugin": 2, "parser_plugin": 1}"""
+    plugins = {}
+    for entry in spec.split(","):
+        name, _, workers = entry.strip().partition(":")
+        if name:
+            plugins[name] = int(workers or 1)
+    return plugins
+
+
+# -- payload transfer ---------------------------------------------------------
+
+def _pack(obj, threshold: int = PLUGIN_SHM_THRESHOLD):
+    """Pickle inline, or into a shared-memory block the receiver unlinks after reading."""
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) <= threshold:
+        return ("inline", data)
+    block = SharedMemory(create=True, size=len(data))
+    block.buf[: len(data)] = data
+    # Ownership passes to the receiver; stop this process's tracker from unlinking it at exit
+    resource_tracker.unregister(block._name, "shared_memory")
+    block.close()
+    return ("shm", block.name, len(data))
+
+
+def _unpack(payload):
+    if payload[0] == "inline":
+        return pickle.loads(payload[1])
+    _, name, size = payload
+    block = SharedMemory(name=name)
+    try:
+        return pickle.loads(bytes(block.buf[:size]))
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _worker_main(module_name: str, class_name: str, conn):
+    """Worker process: load the plugin once, then serve calls until told to stop."""
+    try:
+        plugin = getattr(import_module(module_name), class_name)()
+        plugin.initialize()
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", None))
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        method, payload = request
+        try:
+            conn.send(("ok", _pack(getattr(plugin, method)(*_unpack(payload)))))
+        except Exception as e:
+            conn.send(("error", _pack(f"{type(e).__name__}: {e}")))
+    plugin.shutdown()
+
+
+# -- parent side ----------------------------------------------------------------
+
+class _Worker:
+    """One long-lived worker process; its methods block and run on the execution layer's threads."""
+
+    def __init__(self, ctx, module_name: str, class_name: str, init_timeout: float, call_timeout: float):
+        self.ctx = ctx
+        self.module_name = module_name
+        self.class_name = class_name
+        self.init_timeout = init_timeout
+        self.call_timeout = call_timeout
+        self.process = None
+        self.conn = None
+        self.starts = 0
+        self.calls = 0
+        self.init_seconds: Optional[float] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        parent, child = self.ctx.Pipe()
+        started = time.perf_counter()
+        self.process = self.ctx.Process(
+            target=_worker_main, args=(self.module_name, self.class_name, child), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.conn = parent
+        self.starts += 1
+        try:
+            if not parent.poll(self.init_timeout):
+                raise PluginWorkerError(f"{self.class_name} worker did not start within {self.init_timeout}s")
+            status, detail = parent.recv()
+        except (EOFError, OSError):
+            status, detail = "error", f"exit code {self.process.exitcode}"
+        except PluginWorkerError:
+            self.stop()
+            raise
+        if status != "ready":
+            self.stop()
+            raise PluginWorkerError(f"{self.class_name} worker failed to start: {detail}")
+        self.init_seconds = time.perf_counter() - started
+
+    def restart(self):
+        logger.warning(f"🔁 [PluginHost] Restarting {self.class_name} worker")
+        self.stop()
+        self.start()
+
+    def call(self, method: str, args: tuple):
+        if not self.alive:
+            self.restart()
+        self.calls += 1
+        try:
+            self.conn.send((method, _pack(args)))
+            if not self.conn.poll(self.call_timeout):
+                # A hung worker cannot be interrupted; replace it on the next call
+                self.stop()
+                raise PluginWorkerError(f"{self.class_name}.{method} timed out after {self.call_timeout}s")
+            status, payload = self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.stop()
+            raise PluginWorkerError(f"{self.class_name} worker crashed during {method}") from e
+        value = _unpack(payload)
+        if status == "error":
+            raise PluginWorkerError(value)
+        return value
+
+    def stop(self, timeout: float = 5):
+        process, conn, self.process, self.conn = self.process, self.conn, None, None
+        if process is None:
+            return
+        try:
+            if process.is_alive():
+                conn.send(None)
+                process.join(timeout)
+        except (EOFError, OSError):
+            pass
+        if process.is_alive():
+            process.kill()
+            process.join()
+        conn.close()
+
+    def stats(self) -> Dict:
+        return {
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive,
+            "starts": self.starts,
+            "calls": self.calls,
+            "init_ms": round(self.init_seconds * 1000, 1) if self.init_seconds is not None else None,
+        }
+
+
+class ProcessPlugin(PluginInterface):
+    """
+    Runs a plugin class in a pool of long-lived worker processes.
+
+    Each worker imports and initializes the plugin once. Calls go to an idle
+    worker over a pipe; payloads above PLUGIN_SHM_THRESHOLD travel through
+    shared memory instead of the pipe. A worker that crashes or hangs is
+    replaced on its next call. The wrapped plugin's `execute_batch`, if any,
+    is exposed too, so micro-batching in the manager keeps working.
+    """
+
+    def __init__(
+        self,
+        plugin_class: type,
+        workers: int = 1,
+        start_method: str = PLUGIN_PROCESS_START_METHOD,
+        call_timeout: float = PLUGIN_PROCESS_TIMEOUT,
+        init_timeout: float = PLUGIN_PROCESS_INIT_TIMEOUT,
+    ):
+        ctx = multiprocessing.get_context(start_method)
+        self.plugin_class = plugin_class
+        self.call_timeout = call_timeout
+        self.init_timeout = init_timeout
+        self._workers: List[_Worker] = [
+            _Worker(ctx, plugin_class.__module__, plugin_class.__name__, init_timeout, call_timeout)
+            for _ in range(workers)
+        ]
+        self._idle: Optional[asyncio.Queue] = None
+        if hasattr(plugin_class, "execute_batch"):
+            self.execute_batch = self._execute_batch
+        for attribute in ("max_batch_size", "max_batch_wait_ms"):
+            if hasattr(plugin_class, attribute):
+                setattr(self, attribute, getattr(plugin_class, attribute))
+
+    @runs_in(ASYNC, timeout=PLUGIN_PROCESS_INIT_TIMEOUT + 10)
+    async def initialize(self):
+        try:
+            await asyncio.gather(
+                *(executor.run_thread(worker.start, timeout=self.init_timeout + 5) for worker in self._workers)
+            )
+        except Exception:
+            await self.shutdown()
+            raise
+        self._idle = asyncio.Queue()
+        for worker in self._workers:
+            self._idle.put_nowait(worker)
+
+    async def _dispatch(self, method: str, *args):
+        worker = await self._idle.get()
+        try:
+            # The worker enforces call_timeout itself; the thread-side limit covers a restart on top
+            return await executor.run_thread(
+                worker.call, method, args, timeout=self.call_timeout + self.init_timeout
+            )
+        finally:
+            self._idle.put_nowait(worker)
+
+    # Outer limits for the execution layer; the workers enforce the real call timeout
+    @runs_in(ASYNC, timeout=PLUGIN_PROCESS_TIMEOUT + PLUGIN_PROCESS_INIT_TIMEOUT + 10)
+    async def execute(self, data):
+        return await self._dispatch("execute", data)
+
+    @runs_in(ASYNC, timeout=PLUGIN_PROCESS_TIMEOUT + PLUGIN_PROCESS_INIT_TIMEOUT + 10)
+    async def _execute_batch(self, batch):
+        return await self._dispatch("execute_batch", batch)
+
+    async def health_check(self) -> bool:
+        """Restart idle workers that died; healthy while at least one worker is up."""
+        for _ in range(self._idle.qsize() if self._idle else 0):
+            worker = self._idle.get_nowait()
+            try:
+                if not worker.alive:
+                    await executor.run_thread(worker.restart, timeout=self.init_timeout + 5)
+            except Exception as e:
+                logger.error(f"❌ [PluginHost] Could not restart {self.plugin_class.__name__} worker: {e}")
+            finally:
+                self._idle.put_nowait(worker)
+        return any(worker.alive for worker in self._workers)
+
+    async def shutdown(self):
+        await asyncio.gather(*(executor.run_thread(worker.stop) for worker in self._workers))
+        self._idle = None
+
+    def worker_stats(self) -> List[Dict]:
+        return [worker.stats() for worker in self._workers]
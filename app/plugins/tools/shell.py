@@ -1,17 +1,132 @@
 # app/plugins/tools/shell.py
 
-import subprocess
+import asyncio
+import codecs
+import os
+import signal
+from contextlib import suppress
+from typing import AsyncIterator, Tuple
 from app.plugins.base import Tool
+from app.config import SHELL_TIMEOUT, SHELL_MAX_OUTPUT_BYTES, SHELL_MAX_CONCURRENCY, SHELL_KILL_GRACE
+
+CHUNK_SIZE = 4096
 
 class ShellTool(Tool):
+    """
+    Runs shell commands as asyncio subprocesses.
+
+    `stream` yields ("stdout" | "stderr", text) chunks as the command produces
+    them, then ("exit", returncode). A command that outlives `timeout` or
+    prints more than `max_output_bytes` gets a ("timeout" | "truncated", note)
+    event and its whole process group is killed. At most `max_concurrency`
+    commands run at once; further calls wait for a slot.
+    """
+
     name = "shell"
     description = "Run a shell command"
 
+    def __init__(
+        self,
+        timeout: float = SHELL_TIMEOUT,
+        max_output_bytes: int = SHELL_MAX_OUTPUT_BYTES,
+        max_concurrency: int = SHELL_MAX_CONCURRENCY,
+        kill_grace: float = SHELL_KILL_GRACE,
+    ):
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.kill_grace = kill_grace
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.counters = {"runs": 0, "timeouts": 0, "truncated": 0, "running": 0}
+
     async def run(self, input_text: str) -> str:
+        stdout, stderr, notes = [], [], []
         try:
-            result = subprocess.run(input_text, shell=True, capture_output=True, text=True)
-            return result.stdout.strip() or result.stderr.strip()
+            async for kind, text in self.stream(input_text):
+                if kind == "stdout":
+                    stdout.append(text)
+                elif kind == "stderr":
+                    stderr.append(text)
+                elif kind != "exit":
+                    notes.append(f"[{text}]")
         except Exception as e:
             return str(e)
+        output = "".join(stdout).strip() or "".join(stderr).strip()
+        return "\n".join([output] + notes).strip()
+
+    async def stream(self, command: str) -> AsyncIterator[Tuple[str, str]]:
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout
+            # Own session = own process group, so the kill reaches grandchildren too
+            process = await asyncio.create_subprocess_shell(
+                command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+            self.counters["runs"] += 1
+            self.counters["running"] += 1
+            # Bounded so a slow consumer applies back-pressure to the command's pipes
+            chunks: asyncio.Queue = asyncio.Queue(maxsize=64)
+            pumps = [
+                asyncio.create_task(self._pump("stdout", process.stdout, chunks)),
+                asyncio.create_task(self._pump("stderr", process.stderr, chunks)),
+            ]
+            captured, open_pipes = 0, len(pumps)
+            try:
+                while open_pipes:
+                    item = await asyncio.wait_for(chunks.get(), max(deadline - loop.time(), 0))
+                    if item is None:
+                        open_pipes -= 1
+                        continue
+                    kind, data = item
+                    if captured + len(data) > self.max_output_bytes:
+                        head = data[: self.max_output_bytes - captured].decode("utf-8", "ignore")
+                        if head:
+                            yield kind, head
+                        self.counters["truncated"] += 1
+                        yield "truncated", f"output exceeded {self.max_output_bytes} bytes; command killed"
+                        await self._kill(process)
+                        break
+                    captured += len(data)
+                    yield kind, data.decode("utf-8", "replace")
+                await asyncio.wait_for(process.wait(), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                yield "timeout", f"command exceeded {self.timeout}s; killed"
+                await self._kill(process)
+            finally:
+                # Also reached when the consumer stops iterating early
+                await self._kill(process)
+                for pump in pumps:
+                    pump.cancel()
+                self.counters["running"] -= 1
+            yield "exit", str(process.returncode)
+
+    @staticmethod
+    async def _pump(kind: str, pipe: asyncio.StreamReader, chunks: asyncio.Queue):
+        # Re-chunk on character boundaries so multi-byte UTF-8 is never split
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        while True:
+            data = await pipe.read(CHUNK_SIZE)
+            text = decoder.decode(data, final=not data)
+            if text:
+                await chunks.put((kind, text.encode("utf-8")))
+            if not data:
+                break
+        await chunks.put(None)
+
+    async def _kill(self, process: asyncio.subprocess.Process):
+        if process.returncode is not None:
+            return
+        with suppress(ProcessLookupError):
+            os.killpg(process.pid, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), self.kill_grace)
+        except asyncio.TimeoutError:
+            with suppress(ProcessLookupError):
+                os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
 
 tool = ShellTool()
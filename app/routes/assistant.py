@@ -1,6 +1,10 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse, JSONResponse
-import asyncio
+from app.chat_memory import add_message, add_message_and_get_window
+from app.brain.llm_gateway import llm_gateway
+from app.codex_prompt_engine.engine import prompt_engine
+from app.memory.summarizer import session_compactor
+from app.config import CONTEXT_WINDOW_MESSAGES
 
 router = APIRouter()
 
@@ -13,13 +17,36 @@ async def chat_endpoint(payload: dict):
     reply = f"You said: '{message}'. (Simulated AI Response)"
     return {"reply": reply}
 
+def sse_event(text: str) -> str:
+    # Multi-line chunks need one "data:" field per line to survive SSE framing
+    return "".join(f"data: {line}\n" for line in text.split("\n")) + "\n"
+
 @router.post("/chatstream")
 async def chatstream_endpoint(payload: dict):
+    message = payload.get("message", "")
+    session_id = payload.get("session_id", "default")
+
+    # Pick the route first so the history is cut to that model's token budget
+    try:
+        provider, model = llm_gateway.resolve(payload.get("provider"), payload.get("model"), payload.get("providers"))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    window = await add_message_and_get_window(session_id, "user", message, limit=CONTEXT_WINDOW_MESSAGES)
+    history = prompt_engine.build_context(window, model=model)
+
     async def event_generator():
-        message = payload.get("message", "")
-        for word in message.split():
-            yield f"data: {word}\n\n"
-            await asyncio.sleep(0.3)
+        parts = []
+        try:
+            async for delta in llm_gateway.stream(history, provider=provider, model=model):
+                parts.append(delta)
+                yield sse_event(delta)
+        except Exception as e:
+            yield sse_event(f"[ERROR] {str(e)}")
+        else:
+            # Persist the assembled reply once the provider has finished
+            reply = "".join(parts)
+            await add_message(session_id, "assistant", reply)
+            session_compactor.maybe_schedule(session_id, window + [{"role": "assistant", "content": reply}])
         yield "data: [END]\n\n"
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
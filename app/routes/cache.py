@@ -0,0 +1,32 @@
+# app/routes/cache.py
+
+from fastapi import APIRouter, HTTPException
+from app.services.response_cache import response_cache
+from app.services.semantic_cache import semantic_cache
+from app.services.single_flight import single_flight
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+@router.get("/stats")
+def cache_stats():
+    return {
+        "response_cache": response_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "single_flight": single_flight.stats(),
+    }
+
+@router.get("/semantic/audits")
+def semantic_audits(limit: int = 50):
+    """Most recent semantic hits, newest first, for false-hit review."""
+    return {"audits": list(semantic_cache.audits)[::-1][:limit]}
+
+@router.post("/semantic/audits/{audit_id}/false-hit")
+def report_false_hit(audit_id: int):
+    if not semantic_cache.report_false_hit(audit_id):
+        raise HTTPException(status_code=404, detail=f"Audit {audit_id} not found")
+    return {"message": f"Audit {audit_id} recorded as a false hit."}
+
+@router.put("/semantic/sessions/{session_id}")
+def set_semantic_cache(session_id: str, enabled: bool = True):
+    semantic_cache.set_session_enabled(session_id, enabled)
+    return {"session_id": session_id, "semantic_cache": enabled}
@@ -2,35 +2,63 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
-from app.chat_memory import add_message, get_short_memory
+from app.chat_memory import add_message, add_message_and_get_window
 from app.brain.planner import Planner
-from app.services.model_loader import ModelLoader
+from app.brain.llm_gateway import llm_gateway
+from app.services.response_cache import response_cache, cache_key
+from app.services.semantic_cache import semantic_cache
+from app.services.single_flight import single_flight
+from app.memory.summarizer import session_compactor
+from app.codex_prompt_engine.engine import prompt_engine
+from app.config import MODEL_PROVIDER, CONTEXT_WINDOW_MESSAGES, SEMANTIC_CACHE_SCOPE
 from openai import OpenAIError
 
 router = APIRouter()
-loader = ModelLoader()
 
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = "default"
+    providers: Optional[List[str]] = None  # routes allowed when MODEL_PROVIDER=auto
+    no_cache: bool = False  # skip the response cache for this request
 
 @router.post("/chat")
 async def chat_endpoint(payload: ChatRequest):
     try:
-        # Add user message to memory
-        await add_message(payload.session_id, "user", payload.message)
+        # Add user message to memory and get recent history back in one round trip
+        history = await add_message_and_get_window(
+            payload.session_id, "user", payload.message, limit=CONTEXT_WINDOW_MESSAGES
+        )
 
-        # Get short memory
-        memory = await get_short_memory(payload.session_id)
+        # Pick the route first so the history is cut to that model's token budget
+        provider, model = llm_gateway.resolve(allowed=payload.providers)
+        memory = prompt_engine.build_context(history, model=model)
 
-        # Call model
-        reply = await loader.chat(messages=memory)
+        # Serve identical, then paraphrased, requests from cache, else call the model
+        route = ",".join(sorted(payload.providers)) if payload.providers else MODEL_PROVIDER
+        key = cache_key(route, model, 0.7, memory)
+        reply = await response_cache.get(key, bypass=payload.no_cache)
+        scope = payload.session_id if SEMANTIC_CACHE_SCOPE == "session" else ""
+        if reply is None and not payload.no_cache:
+            reply = semantic_cache.lookup(memory, route=route, session_id=payload.session_id, scope=scope)
+        if reply is None:
+            async def fetch():
+                answer = await llm_gateway.chat(messages=memory, provider=provider, model=model)
+                await response_cache.set(key, answer, bypass=payload.no_cache)
+                if not payload.no_cache:
+                    semantic_cache.store(memory, answer, route=route, session_id=payload.session_id, scope=scope)
+                return answer
+
+            # Concurrent identical requests share one upstream call
+            reply = await single_flight.do(key, fetch)
 
         # Add assistant reply to memory
         await add_message(payload.session_id, "assistant", reply)
 
+        # Fold older turns into the rolling summary in the background once the session is long
+        session_compactor.maybe_schedule(payload.session_id, history + [{"role": "assistant", "content": reply}])
+
         return {"reply": reply}
 
     except OpenAIError as e:
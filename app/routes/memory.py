@@ -3,15 +3,34 @@
 from fastapi import APIRouter, HTTPException
 from typing import Optional
 from app.memory.manager import MemoryManager
+from app.memory.write_behind import message_writer
+from app.memory.summarizer import session_compactor
+from app.config import MEMORY_PAGE_SIZE, MEMORY_PAGE_MAX
 
 router = APIRouter()
 
 @router.get("/memory")
-async def fetch_memory(session_id: Optional[str] = "default", mode: Optional[str] = "short"):
+async def fetch_memory(
+    session_id: Optional[str] = "default",
+    mode: Optional[str] = "short",
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
+    since: Optional[int] = None,
+):
+    """
+    Page through a session's history by message sequence id.
+
+    Without cursors this returns the latest messages (5 for mode=short, a full
+    page otherwise). Follow `next_cursor` with `before=` to page back, and poll
+    with `since=<latest_cursor>` to receive only messages added after it.
+    """
+    if before is not None and since is not None:
+        raise HTTPException(status_code=400, detail="Use either 'before' or 'since', not both")
+    limit = max(1, min(limit or (5 if mode == "short" else MEMORY_PAGE_SIZE), MEMORY_PAGE_MAX))
     try:
         memory = MemoryManager(session_id)
-        messages = await memory.get_messages(mode=mode)
-        return {"session_id": session_id, "messages": messages}
+        page = await memory.page(limit=limit, before=before, since=since)
+        return {"session_id": session_id, **page}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch memory: {str(e)}")
 
@@ -23,3 +42,10 @@ async def reset_memory(session_id: Optional[str] = "default"):
         return {"message": f"Memory for session '{session_id}' has been reset."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reset memory: {str(e)}")
+
+@router.get("/memory/stats")
+async def memory_stats(session_id: Optional[str] = None):
+    stats = {"write_behind": message_writer.stats(), "compaction": session_compactor.stats()}
+    if session_id:
+        stats["session"] = await session_compactor.session_stats(session_id)
+    return stats
@@ -0,0 +1,176 @@
+# app/services/adaptive_router.py
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import (
+    DEFAULT_MODELS,
+    LLM_ROUTES,
+    ROUTER_EWMA_ALPHA,
+    ROUTER_LATENCY_WEIGHT,
+    ROUTER_ERROR_WEIGHT,
+    ROUTER_INFLIGHT_WEIGHT,
+    ROUTER_EXPLORE_RATE,
+)
+
+Route = Tuple[str, str]  # (provider, model)
+
+
+def parse_routes(spec: str) -> List[Route]:
+    """Parse "openai:gpt-4o,ollama:llama3,azure" into (provider, model) pairs."""
+    routes = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        provider, _, model = item.partition(":")
+        provider = provider.strip().lower()
+        routes.append((provider, model.strip() or DEFAULT_MODELS.get(provider, "")))
+    return routes
+
+
+class RouteStats:
+    """Live EWMA latency/error rate and in-flight count for one provider/model."""
+
+    def __init__(self, prior_latency: float = 1.0):
+        self.latency = prior_latency
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.last_used: Optional[float] = None
+
+    def observe(self, seconds: float, ok: bool, alpha: float):
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        if ok:
+            self.latency = alpha * seconds + (1 - alpha) * self.latency
+        self.error_rate = alpha * (0.0 if ok else 1.0) + (1 - alpha) * self.error_rate
+        self.last_used = time.time()
+
+
+class TrackedCall:
+    """Handle for one tracked call; streams mark their first token so the latency sample is time-to-first-token."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latency: Optional[float] = None
+
+    def first_token(self):
+        if self.latency is None:
+            self.latency = time.perf_counter() - self.started
+
+    def elapsed(self) -> float:
+        return self.latency if self.latency is not None else time.perf_counter() - self.started
+
+
+class AdaptiveRouter:
+    """
+    Picks the best provider/model for each request from live measurements.
+
+    Score (lower is better) = latency_weight * EWMA latency
+                            + error_weight * EWMA error rate
+                            + inflight_weight * requests in flight.
+    A small exploration rate keeps probing the other routes so a recovered
+    backend wins its traffic back.
+    """
+
+    def __init__(
+        self,
+        routes: Iterable[Route] = None,
+        alpha: float = ROUTER_EWMA_ALPHA,
+        latency_weight: float = ROUTER_LATENCY_WEIGHT,
+        error_weight: float = ROUTER_ERROR_WEIGHT,
+        inflight_weight: float = ROUTER_INFLIGHT_WEIGHT,
+        explore_rate: float = ROUTER_EXPLORE_RATE,
+    ):
+        self.routes: List[Route] = list(routes) if routes is not None else parse_routes(LLM_ROUTES)
+        self.alpha = alpha
+        self.weights = {
+            "latency": latency_weight,
+            "error": error_weight,
+            "in_flight": inflight_weight,
+        }
+        self.explore_rate = explore_rate
+        self.stats: Dict[Route, RouteStats] = {}
+
+    @staticmethod
+    def key(route: Route) -> str:
+        return ":".join(route)
+
+    def _stats(self, route: Route) -> RouteStats:
+        if route not in self.stats:
+            self.stats[route] = RouteStats()
+        return self.stats[route]
+
+    def score(self, route: Route) -> float:
+        stats = self._stats(route)
+        return (
+            self.weights["latency"] * stats.latency
+            + self.weights["error"] * stats.error_rate
+            + self.weights["in_flight"] * stats.in_flight
+        )
+
+    def candidates(self, allowed: Optional[Iterable[str]] = None) -> List[Route]:
+        """Routes permitted for a request; `allowed` holds provider or provider:model names."""
+        if not allowed:
+            return list(self.routes)
+        allowed = {name.lower() for name in allowed}
+        return [
+            route for route in self.routes
+            if route[0] in allowed or self.key(route).lower() in allowed
+        ]
+
+    def choose(self, allowed: Optional[Iterable[str]] = None) -> Route:
+        candidates = self.candidates(allowed)
+        if not candidates:
+            raise ValueError(f"No configured route matches: {sorted(allowed or [])}")
+        if len(candidates) > 1 and random.random() < self.explore_rate:
+            return random.choice(candidates)
+        return min(candidates, key=self.score)
+
+    @asynccontextmanager
+    async def track(self, provider: str, model: str):
+        """
+        Account one upstream call against its route.
+
+        A call abandoned by its caller (a hedge loser, single-flight teardown, a
+        client disconnecting mid-stream) says nothing about the route and is
+        not observed.
+        """
+        stats = self._stats((provider, model))
+        stats.in_flight += 1
+        call = TrackedCall()
+        ok, observe = False, True
+        try:
+            yield call
+            ok = True
+        except (asyncio.CancelledError, GeneratorExit):
+            observe = False
+            raise
+        finally:
+            stats.in_flight -= 1
+            if observe:
+                stats.observe(call.elapsed(), ok, self.alpha)
+
+    def scores(self) -> Dict[str, Dict]:
+        """Live scores for every configured or observed route."""
+        snapshot = {}
+        for route in dict.fromkeys([*self.routes, *self.stats]):
+            stats = self._stats(route)
+            snapshot[self.key(route)] = {
+                "score": round(self.score(route), 4),
+                "ewma_latency": round(stats.latency, 4),
+                "error_rate": round(stats.error_rate, 4),
+                "in_flight": stats.in_flight,
+                "calls": stats.calls,
+                "errors": stats.errors,
+            }
+        return snapshot
+
+
+# ✅ Shared router used by the gateway when MODEL_PROVIDER=auto
+provider_router = AdaptiveRouter()
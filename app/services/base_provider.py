@@ -1,7 +1,7 @@
 # app/services/base_provider.py
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 
 class BaseLLMProvider(ABC):
     @abstractmethod
@@ -11,3 +11,13 @@ class BaseLLMProvider(ABC):
         Each message is a dict: {"role": "user"|"assistant", "content": str}
         """
         pass
+
+    async def stream(self, messages: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """
+        Yield the assistant's reply incrementally as text deltas.
+        Providers without native streaming yield the full reply once.
+        """
+        yield await self.chat(messages)
+
+# Providers import the shorter name
+BaseProvider = BaseLLMProvider
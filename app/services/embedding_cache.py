@@ -0,0 +1,307 @@
+# app/services/embedding_cache.py
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from app.config import (
+    EMBEDDING_DIM,
+    EMBEDDING_BACKEND,
+    EMBEDDING_LOCAL_MODEL,
+    EMBEDDING_LOCAL_DIM,
+    EMBEDDING_MODEL,
+    EMBEDDING_BASE_URL,
+    EMBEDDING_API_KEY,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+from app.services.embeddings import hash_embed_many
+from app.services.executor import executor
+from app.services.micro_batcher import Histogram, MicroBatcher
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class HashEmbeddingBackend:
+    """Lexical stand-in: feature-hashed vectors, no model or network needed. For tests and offline demos only."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hash:{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return hash_embed_many(texts, self.dim)
+
+
+class LocalEmbeddingBackend:
+    """
+    A sentence-transformers model run in-process, fully offline once downloaded.
+
+    The default, all-MiniLM-L6-v2, is the model chromadb embedded with before
+    the vector store replaced it. The model loads (and, the first time,
+    downloads) on the first embed call; its output size comes from config, so
+    sizing a vector store does not load it.
+    """
+
+    def __init__(self, model: str = EMBEDDING_LOCAL_MODEL, dim: int = EMBEDDING_LOCAL_DIM,
+                 device: Optional[str] = None):
+        self.model = model
+        self.dim = dim
+        self.device = device
+        self.name = f"local:{model}"
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model, device=self.device)
+        return self._model
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._load().encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+        if vectors.shape[-1] != self.dim:
+            raise ValueError(f"{self.model} produces {vectors.shape[-1]}-dim vectors; set EMBEDDING_LOCAL_DIM to match")
+        return vectors.astype(np.float32)
+
+
+class OpenAIEmbeddingBackend:
+    """Any OpenAI-compatible /embeddings endpoint (OpenAI, Azure proxies, vLLM, Ollama's /v1)."""
+
+    def __init__(self, model: str = EMBEDDING_MODEL, base_url: str = EMBEDDING_BASE_URL,
+                 api_key: Optional[str] = EMBEDDING_API_KEY, dim: int = EMBEDDING_DIM, timeout: float = 60.0):
+        self.model = model
+        self.dim = dim
+        self.name = f"openai:{model}:{dim}"
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.Client(base_url=base_url.rstrip("/"), headers=headers, timeout=timeout)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = self.client.post("/embeddings", json={"model": self.model, "input": list(texts),
+                                                         "dimensions": self.dim})
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return np.asarray([item["embedding"] for item in data], dtype=np.float32).reshape(len(texts), self.dim)
+
+
+def create_backend(kind: str = EMBEDDING_BACKEND):
+    if kind == "auto":
+        if importlib.util.find_spec("sentence_transformers") is not None:
+            kind = "local"
+        elif EMBEDDING_API_KEY:
+            kind = "openai"
+        else:
+            kind = "hash"
+    if kind == "local":
+        return LocalEmbeddingBackend()
+    if kind == "openai":
+        return OpenAIEmbeddingBackend()
+    if kind == "hash":
+        return HashEmbeddingBackend()
+    raise ValueError(f"Unknown embedding backend: {kind}")
+
+
+class EmbeddingService:
+    """
+    Embeds text once per distinct content.
+
+    Vectors are keyed by a hash of the backend name and the text, and looked
+    up in a bounded in-memory LRU, then in an SQLite file shared by every
+    worker and kept across restarts. Only misses reach the backend, deduplicated
+    and in one call per batch:
+
+      * `embed_many(texts)` (sync) sends all of its misses in a single call.
+      * `aembed_many(texts)` (async) also coalesces misses across concurrent
+        callers through a MicroBatcher; identical texts in flight share one slot.
+    """
+
+    def __init__(self, backend=None, cache_size: int = EMBEDDING_CACHE_SIZE, path: Optional[str] = EMBEDDING_CACHE_PATH,
+                 max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE, max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS):
+        self.backend = backend or create_backend()
+        self.cache_size = cache_size
+        self.path = path
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # The LRU lock is held only for dict operations, so the event loop can take it;
+        # SQLite reads and writes serialize on their own lock, always in a worker thread
+        self._lru_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.batcher = MicroBatcher(self._run_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.flights = SingleFlight()
+        self.backend_batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.counters = {"requests": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "backend_calls": 0}
+
+    @property
+    def dim(self) -> int:
+        return self.backend.dim
+
+    def startup(self):
+        """Log the backend in use; warns when only the lexical stand-in is available."""
+        if isinstance(self.backend, HashEmbeddingBackend):
+            logger.warning(
+                "⚠️ [EmbeddingService] Using lexical hash vectors: install sentence-transformers or set "
+                "EMBEDDING_API_KEY for a real embedding model (EMBEDDING_BACKEND=local|openai)"
+            )
+        else:
+            logger.info(f"🧬 [EmbeddingService] Embedding with {self.backend.name}")
+
+    # -- storage -------------------------------------------------------------
+
+    def key(self, text: str) -> bytes:
+        return hashlib.blake2b(f"{self.backend.name}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID")
+        return self._db
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.cache_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: Sequence[bytes], from_disk: bool = True) -> Dict[bytes, np.ndarray]:
+        """Cached vectors for `keys`; disk hits are promoted into the LRU."""
+        found, missing = {}, []
+        with self._lru_lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.counters["memory_hits"] += len(found)
+        if not from_disk or not missing:
+            return found
+        rows = []
+        with self._db_lock:
+            db = self._conn()
+            if db is not None:
+                for start in range(0, len(missing), 500):  # stay under SQLite's variable limit
+                    chunk = missing[start:start + 500]
+                    rows += db.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                                       chunk).fetchall()
+        with self._lru_lock:
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                found[key] = vector
+                self._remember(key, vector)
+            self.counters["disk_hits"] += len(rows)
+        return found
+
+    def _compute(self, texts: List[str], keys: List[bytes]) -> List[np.ndarray]:
+        """One backend call for `texts`; the results are written to both tiers."""
+        matrix = np.asarray(self.backend.embed(texts), dtype=np.float32).reshape(len(texts), self.dim)
+        vectors = [np.ascontiguousarray(row) for row in matrix]
+        with self._lru_lock:
+            self.counters["backend_calls"] += 1
+            self.counters["misses"] += len(texts)
+            self.backend_batch_sizes.observe(len(texts))
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+        with self._db_lock:
+            db = self._conn()
+            if db is not None:
+                db.execute("BEGIN")
+                db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                               [(key, vector.tobytes()) for key, vector in zip(keys, vectors)])
+                db.execute("COMMIT")
+        return vectors
+
+    # -- public API ----------------------------------------------------------
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        keys = [self.key(text) for text in texts]
+        with self._lru_lock:
+            self.counters["requests"] += len(set(keys))
+        found = self._lookup(list(dict.fromkeys(keys)))
+        pending = {key: text for key, text in zip(keys, texts) if key not in found}
+        if pending:
+            found.update(zip(pending, self._compute(list(pending.values()), list(pending))))
+        return self._stack(keys, found)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    async def aembed_many(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        keys = [self.key(text) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        with self._lru_lock:
+            self.counters["requests"] += len(unique)
+        found = self._lookup(unique, from_disk=False)
+        remaining = [key for key in unique if key not in found]
+        if remaining:
+            found.update(await executor.run_thread(self._lookup, remaining))
+        pending = {key: text for key, text in zip(keys, texts) if key not in found}
+        if pending:
+            vectors = await asyncio.gather(*(
+                self.flights.do(key.hex(), lambda key=key, text=text: self.batcher.submit((key, text)))
+                for key, text in pending.items()
+            ))
+            found.update(zip(pending, vectors))
+        return self._stack(keys, found)
+
+    async def aembed(self, text: str) -> np.ndarray:
+        return (await self.aembed_many([text]))[0]
+
+    async def _run_batch(self, items: List) -> List[np.ndarray]:
+        keys, texts = [key for key, _ in items], [text for _, text in items]
+        return await executor.run_thread(self._compute, texts, keys)
+
+    def _stack(self, keys: List[bytes], found: Dict[bytes, np.ndarray]) -> np.ndarray:
+        if not keys:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def stats(self) -> Dict:
+        with self._lru_lock:
+            counters = dict(self.counters)
+            cached = len(self._memory)
+        # Requests and misses both count distinct texts per call; a text that joined another
+        # caller's in-flight computation counts as a hit, since it cost no backend work
+        requests = counters["requests"]
+        return {
+            **counters,
+            "backend": self.backend.name,
+            "hit_rate": round(1 - counters["misses"] / requests, 4) if requests else 0.0,
+            "memory_entries": cached,
+            "memory_capacity": self.cache_size,
+            "backend_batch_size": self.backend_batch_sizes.snapshot(),
+            "coalescing": self.batcher.stats(),
+            "single_flight": self.flights.stats(),
+        }
+
+    async def stop(self):
+        await self.batcher.stop()
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# ✅ Shared embedding cache (one LRU per process, one SQLite file for all workers)
+embedding_service = EmbeddingService()
@@ -0,0 +1,42 @@
+# app/services/embeddings.py
+
+import hashlib
+import re
+from typing import Iterable
+
+import numpy as np
+
+from app.config import EMBEDDING_DIM
+
+_WORD = re.compile(r"\w+")
+
+
+def _features(text: str):
+    words = _WORD.findall(text.lower())
+    yield from words
+    yield from (f"{a} {b}" for a, b in zip(words, words[1:]))
+    # Character trigrams make the vector tolerant to inflections and typos
+    for word in words:
+        for i in range(len(word) - 2):
+            yield f"#{word[i:i + 3]}"
+
+
+def hash_embed(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Offline embedding: signed feature hashing of words, word bigrams and
+    character trigrams into a unit-length float32 vector. No model download,
+    deterministic across processes.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[h % dim] += 1.0 if h >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def hash_embed_many(texts: Iterable[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.stack([hash_embed(text, dim) for text in texts])
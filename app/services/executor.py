@@ -0,0 +1,171 @@
+# app/services/executor.py
+
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.config import EXEC_THREAD_WORKERS, EXEC_PROCESS_WORKERS, EXEC_DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Execution classes a callable can declare with @runs_in
+ASYNC = "async"      # coroutine, awaited on the event loop
+THREAD = "thread"    # blocking I/O, or native code that releases the GIL
+PROCESS = "process"  # pure-Python CPU work; callable and arguments must be picklable
+KINDS = (ASYNC, THREAD, PROCESS)
+
+
+def runs_in(kind: str, timeout: Optional[float] = None):
+    """
+    Declare how a function, method or tool/plugin class must be executed.
+
+        @runs_in(THREAD, timeout=30)
+        def execute(self, data): ...
+
+    `ExecutionLayer.call` reads the declaration; undeclared coroutine functions
+    run on the loop and undeclared plain functions go to the thread pool.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown execution kind: {kind}")
+
+    def mark(obj):
+        obj.__execution__ = (kind, timeout)
+        return obj
+
+    return mark
+
+
+def execution_of(fn: Callable) -> tuple:
+    """(kind, timeout) declared for a callable or for the class of its bound instance."""
+    declared = getattr(fn, "__execution__", None)
+    if declared is None:
+        declared = getattr(type(getattr(fn, "__self__", None)), "__execution__", None)
+    if declared is None:
+        declared = (THREAD, None)
+    if inspect.iscoroutinefunction(fn):
+        # Coroutines always run on the loop; only the timeout carries over
+        declared = (ASYNC, declared[1])
+    return declared
+
+
+class _PoolMetrics:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0  # successful calls only
+        self.failed = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+
+    def snapshot(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            # Submitted calls beyond the worker count are waiting for a free worker
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "avg_ms": round(1000 * self.total_seconds / self.completed, 2) if self.completed else 0.0,
+        }
+
+
+class ExecutionLayer:
+    """
+    Runs blocking work off the event loop.
+
+    A sized thread pool takes blocking I/O and GIL-releasing native calls; a
+    process pool (created on first use) takes CPU-bound pure-Python work.
+    Every call has a timeout. A timed-out thread cannot be interrupted, so the
+    caller is released while the worker finishes in the background (it
+    still counts as in flight until then); a timed-out process call is
+    dropped if it has not started yet.
+    """
+
+    def __init__(
+        self,
+        thread_workers: int = EXEC_THREAD_WORKERS,
+        process_workers: int = EXEC_PROCESS_WORKERS,
+        default_timeout: float = EXEC_DEFAULT_TIMEOUT,
+    ):
+        self.default_timeout = default_timeout
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._pools: Dict[str, Executor] = {}
+        self.metrics = {THREAD: _PoolMetrics(thread_workers), PROCESS: _PoolMetrics(process_workers)}
+
+    def _pool(self, kind: str) -> Executor:
+        pool = self._pools.get(kind)
+        if pool is None:
+            if kind == THREAD:
+                pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="codex-exec")
+            else:
+                pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            self._pools[kind] = pool
+        return pool
+
+    async def run_thread(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        return await self._submit(THREAD, fn, args, kwargs, timeout)
+
+    async def run_process(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        return await self._submit(PROCESS, fn, args, kwargs, timeout)
+
+    async def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run `fn` according to its declared execution class (see `runs_in`)."""
+        kind, declared_timeout = execution_of(fn)
+        timeout = timeout or declared_timeout
+        if kind == ASYNC:
+            return await asyncio.wait_for(fn(*args, **kwargs), timeout or self.default_timeout)
+        return await self._submit(kind, fn, args, kwargs, timeout)
+
+    async def _submit(self, kind: str, fn: Callable, args, kwargs, timeout: Optional[float]) -> Any:
+        metrics = self.metrics[kind]
+        loop = asyncio.get_running_loop()
+        work = self._pool(kind).submit(functools.partial(fn, *args, **kwargs))
+        metrics.in_flight += 1
+        metrics.peak_in_flight = max(metrics.peak_in_flight, metrics.in_flight)
+        # A timed-out worker keeps its slot until it really finishes, so in_flight reflects saturation
+        work.add_done_callback(lambda _: self._release(loop, metrics))
+        future = asyncio.wrap_future(work, loop=loop)
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(future, timeout or self.default_timeout)
+        except asyncio.TimeoutError:
+            metrics.timed_out += 1
+            logger.warning(f"⏱️ [ExecutionLayer] {getattr(fn, '__qualname__', fn)} timed out in the {kind} pool")
+            raise
+        except Exception:
+            metrics.failed += 1
+            raise
+        # avg_ms is the mean latency of successful calls
+        metrics.completed += 1
+        metrics.total_seconds += time.perf_counter() - started
+        return result
+
+    @staticmethod
+    def _release(loop: asyncio.AbstractEventLoop, metrics: _PoolMetrics):
+        def release():
+            metrics.in_flight -= 1
+
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            release()  # the loop is already closed
+
+    def stats(self) -> Dict[str, Dict]:
+        return {kind: metrics.snapshot() for kind, metrics in self.metrics.items()}
+
+    def shutdown(self, wait: bool = True):
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# ✅ Shared execution layer, shut down by the FastAPI lifespan in app/main.py
+executor = ExecutionLayer()
@@ -0,0 +1,121 @@
+# app/services/hedging.py
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, TypeVar
+
+from app.config import (
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_DELAY,
+    LLM_HEDGE_MAX_DELAY,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """Rolling latency window for one primary provider; decides when to hedge."""
+
+    def __init__(
+        self,
+        percentile: float = LLM_HEDGE_PERCENTILE,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay: float = LLM_HEDGE_MIN_DELAY,
+        max_delay: float = LLM_HEDGE_MAX_DELAY,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def delay(self) -> float:
+        """Seconds to wait on the primary before firing the backup."""
+        if not self.samples or len(self.samples) < self.min_samples:
+            # Not enough history yet: only hedge genuinely stuck calls
+            return self.max_delay
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return min(self.max_delay, max(self.min_delay, ordered[index]))
+
+
+class Hedger:
+    """
+    Runs a primary call and, if it has not answered within the policy delay,
+    races a backup call against it. The first successful answer wins and the
+    other call is cancelled; a primary cancelled that way still contributes
+    its elapsed time to the latency window, as a lower bound.
+    """
+
+    def __init__(self):
+        self.policies: Dict[str, HedgePolicy] = {}
+        self.counters = {"calls": 0, "hedged": 0, "backup_wins": 0}
+
+    def policy(self, provider: str) -> HedgePolicy:
+        if provider not in self.policies:
+            self.policies[provider] = HedgePolicy()
+        return self.policies[provider]
+
+    async def run(
+        self,
+        primary: str,
+        primary_call: Callable[[], Awaitable[T]],
+        backup: str,
+        backup_call: Callable[[], Awaitable[T]],
+    ) -> T:
+        policy = self.policy(primary)
+        self.counters["calls"] += 1
+        started = time.perf_counter()
+
+        primary_task = asyncio.ensure_future(primary_call())
+        tasks = {primary_task: primary}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=policy.delay())
+            if done and primary_task.exception() is None:
+                policy.record(time.perf_counter() - started)
+                return primary_task.result()
+
+            # Primary is slow (or already failed): start the backup and race them
+            self.counters["hedged"] += 1
+            logger.info(f"🪂 [Hedger] {primary} slow after {time.perf_counter() - started:.2f}s, hedging to {backup}")
+            tasks[asyncio.ensure_future(backup_call())] = backup
+            pending = {task for task in tasks if not task.done()}
+            error = primary_task.exception() if primary_task.done() else None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is primary_task:
+                            policy.record(time.perf_counter() - started)
+                        else:
+                            self.counters["backup_wins"] += 1
+                            if not primary_task.done():
+                                # Censored sample: the cancelled primary would have taken at least this long.
+                                # Dropping it would leave only fast calls in the window and pull the delay down.
+                                policy.record(time.perf_counter() - started)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "delays": {provider: round(policy.delay(), 3) for provider, policy in self.policies.items()},
+        }
+
+
+# ✅ Shared hedger so latency history is pooled across routers
+hedger = Hedger()
@@ -1,50 +1,40 @@
 # app/services/llm_router.py
 
 import os
-from openai import AsyncOpenAI
 from typing import List, Dict
+from app.brain.llm_gateway import llm_gateway
+from app.config import LLM_HEDGING, LLM_HEDGE_BACKUP_PROVIDER
+from app.services.hedging import hedger
 
 MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "openai")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "")
-AZURE_API_KEY = os.getenv("AZURE_API_KEY", "")
-OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434")
 
 class LLMRouter:
-    def __init__(self):
+    def __init__(self, hedge: bool = LLM_HEDGING, backup_provider: str = LLM_HEDGE_BACKUP_PROVIDER):
         self.provider = MODEL_PROVIDER.lower()
-        self.client = self._init_client()
-
-    def _init_client(self):
-        if self.provider == "openai":
-            return AsyncOpenAI(api_key=OPENAI_API_KEY)
-        elif self.provider == "azure":
-            return AsyncOpenAI(
-                api_key=AZURE_API_KEY,
-                base_url=AZURE_OPENAI_ENDPOINT,
-            )
-        else:
-            return None  # Ollama handled manually via HTTP
+        # Connections are owned by the shared gateway, not by the router
+        self.gateway = llm_gateway
+        self.hedge = hedge and backup_provider.lower() != self.provider
+        self.backup_provider = backup_provider.lower()
 
     async def generate(self, messages: List[Dict]) -> str:
-        if self.provider in ("openai", "azure"):
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-            )
-            return response.choices[0].message.content
-
-        elif self.provider == "ollama":
-            import httpx
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(
-                    f"{OLLAMA_API_URL}/api/chat",
-                    json={"model": "mistral", "messages": messages},
-                )
-                return resp.json()["message"]["content"]
-
-        else:
+        if self.provider not in ("openai", "azure", "ollama", "auto"):
             return "❌ Invalid model provider configured."
 
+        if self.hedge:
+            return await hedger.run(
+                self.provider,
+                lambda: self._generate(self.provider, messages),
+                self.backup_provider,
+                lambda: self._generate(self.backup_provider, messages),
+            )
+        return await self._generate(self.provider, messages)
+
+    async def _generate(self, provider: str, messages: List[Dict]) -> str:
+        if provider == "auto":
+            return await self.gateway.chat(messages, provider="auto")
+        if provider in ("openai", "azure"):
+            return await self.gateway.chat(messages, provider=provider, model="gpt-3.5-turbo")
+        return await self.gateway.chat_ollama(messages, model="mistral")
+
 # Singleton instance for shared use
 llm_router = LLMRouter()
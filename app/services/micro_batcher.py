@@ -0,0 +1,137 @@
+# app/services/micro_batcher.py
+
+import asyncio
+import bisect
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.config import PLUGIN_BATCH_MAX_SIZE, PLUGIN_BATCH_MAX_WAIT_MS
+
+WAIT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Fixed-bucket counts; a value lands in the first bucket it does not exceed."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.samples = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.samples += 1
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+            "mean": round(self.total / self.samples, 3) if self.samples else 0.0,
+            "samples": self.samples,
+        }
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item calls into batches.
+
+    The first queued item opens a batch; it closes when `max_batch_size` items
+    are waiting or `max_wait_ms` has passed, and `run_batch(items)` is awaited
+    once for the whole batch. Items that arrive while a batch runs form the
+    next one, so batches grow with load. `run_batch` must return one result
+    per item, in order; if it raises, every caller in that batch gets the error.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = PLUGIN_BATCH_MAX_SIZE,
+        max_wait_ms: float = PLUGIN_BATCH_MAX_WAIT_MS,
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._running: List = []
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.counters = {"items": 0, "batches": 0, "failed_batches": 0}
+
+    async def submit(self, item: Any) -> Any:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up (cancelled) are dropped before the batch runs
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                continue
+            now = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.queue_wait_ms.observe((now - enqueued) * 1000)
+            self.batch_sizes.observe(len(batch))
+            self.counters["batches"] += 1
+            self.counters["items"] += len(batch)
+
+            self._running = batch
+            try:
+                results = await self.run_batch([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                self.counters["failed_batches"] += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self):
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+        # Nothing will resolve these any more
+        pending = list(self._running)
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            future.cancel()
+        self._running = []
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
@@ -1,37 +1,27 @@
-import os
 import httpx
+from contextlib import aclosing
+from typing import AsyncIterator
+from app.brain.llm_gateway import LLMGateway, llm_gateway
+from app.services.response_cache import cache_key
+from app.services.single_flight import single_flight
 
 class ModelLoader:
-    def __init__(self):
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        self.api_endpoint = os.getenv('API_ENDPOINT', 'https://api.openai.com/v1/chat/completions')
+    def __init__(self, gateway: LLMGateway = llm_gateway):
+        # Calls go through the shared gateway so every turn reuses its pooled connections
+        self.gateway = gateway
 
-    async def chat(self, messages: list[dict], model="gpt-3.5-turbo", service="openai") -> str:
-        async with httpx.AsyncClient() as client:
-            try:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
+    async def chat(self, messages: list[dict], model=None, service="openai") -> str:
+        try:
+            return await single_flight.do(
+                cache_key(service, model, 0.7, messages),
+                lambda: self.gateway.chat(messages, provider=service, model=model, temperature=0.7),
+            )
+        except httpx.HTTPStatusError as exc:
+            return f"HTTP error: {exc.response.status_code} - {exc.response.text}"
+        except Exception as exc:
+            return f"Unexpected error: {str(exc)}"
 
-                payload = {
-                    "model": model,
-                    "messages": messages,
-                    "temperature": 0.7
-                }
-
-                # Optional routing logic
-                if service == "azure":
-                    self.api_endpoint = os.getenv('AZURE_API_ENDPOINT', self.api_endpoint)
-                elif service == "ollama":
-                    self.api_endpoint = os.getenv('OLLAMA_API_ENDPOINT', self.api_endpoint)
-
-                response = await client.post(self.api_endpoint, headers=headers, json=payload)
-                response.raise_for_status()
-                response_data = response.json()
-                return response_data["choices"][0]["message"]["content"]
-
-            except httpx.HTTPStatusError as exc:
-                return f"HTTP error: {exc.response.status_code} - {exc.response.text}"
-            except Exception as exc:
-                return f"Unexpected error: {str(exc)}"
+    async def stream(self, messages: list[dict], model=None, service="openai") -> AsyncIterator[str]:
+        async with aclosing(self.gateway.stream(messages, provider=service, model=model, temperature=0.7)) as deltas:
+            async for delta in deltas:
+                yield delta
@@ -1,41 +1,45 @@
 # app/services/model_router.py
 
-from app.config import MODEL_PROVIDER, OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT
-from openai import AsyncOpenAI
-import httpx
+from contextlib import aclosing
+from typing import AsyncIterator
+from app.config import MODEL_PROVIDER, LLM_HEDGING, LLM_HEDGE_BACKUP_PROVIDER
+from app.brain.llm_gateway import llm_gateway
+from app.services.hedging import hedger
+from app.services.response_cache import cache_key
+from app.services.single_flight import single_flight
 
 class ModelRouter:
-    def __init__(self):
+    def __init__(self, hedge: bool = LLM_HEDGING, backup_provider: str = LLM_HEDGE_BACKUP_PROVIDER):
         self.provider = MODEL_PROVIDER.lower()
-        self.client = self._get_client()
+        self.gateway = llm_gateway
+        self.hedge = hedge and backup_provider.lower() != self.provider
+        self.backup_provider = backup_provider.lower()
 
-    def _get_client(self):
-        if self.provider == "openai":
-            return AsyncOpenAI(api_key=OPENAI_API_KEY)
-        elif self.provider == "azure":
-            return AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=AZURE_OPENAI_ENDPOINT)
-        return None
-
-    async def ask(self, messages: list, model="gpt-3.5-turbo") -> str:
+    async def ask(self, messages: list, model=None) -> str:
         try:
-            if self.provider in ["openai", "azure"]:
-                response = await self.client.chat.completions.create(
-                    model=model,
-                    messages=messages
+            if self.provider in ["openai", "azure", "ollama", "auto"]:
+                # Identical concurrent asks share one (possibly hedged) upstream call
+                return await single_flight.do(
+                    cache_key(self.provider, model, 0.7, messages),
+                    lambda: self._ask(messages, model),
                 )
-                return response.choices[0].message.content
-
-            elif self.provider == "ollama":
-                async with httpx.AsyncClient() as client:
-                    r = await client.post("http://localhost:11434/api/chat", json={
-                        "model": model,
-                        "messages": messages,
-                        "stream": False
-                    })
-                    r.raise_for_status()
-                    return r.json()["message"]["content"]
 
             return "❌ Unsupported model provider."
 
         except Exception as e:
             return f"🔥 ModelRouter error: {str(e)}"
+
+    async def _ask(self, messages: list, model=None) -> str:
+        if self.hedge:
+            return await hedger.run(
+                self.provider,
+                lambda: self.gateway.chat(messages, provider=self.provider, model=model),
+                self.backup_provider,
+                lambda: self.gateway.chat(messages, provider=self.backup_provider),
+            )
+        return await self.gateway.chat(messages, provider=self.provider, model=model)
+
+    async def ask_stream(self, messages: list, model=None) -> AsyncIterator[str]:
+        async with aclosing(self.gateway.stream(messages, provider=self.provider, model=model)) as deltas:
+            async for delta in deltas:
+                yield delta
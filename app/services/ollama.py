@@ -1,12 +1,7 @@
 # app/services/ollama.py
 
-import httpx
+from app.brain.llm_gateway import llm_gateway
 
 class OllamaClient:
     async def chat(self, messages: list[dict]) -> str:
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:11434/api/chat", json={
-                "model": "llama3",
-                "messages": messages
-            })
-            return response.json()["message"]["content"]
+        return await llm_gateway.chat_ollama(messages, model="llama3")
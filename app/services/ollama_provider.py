@@ -1,21 +1,19 @@
 # app/services/ollama_provider.py
 
-import httpx
+from typing import AsyncIterator
+from app.brain.llm_gateway import LLMGateway, llm_gateway
 from app.services.base_provider import BaseProvider
 
 class OllamaProvider(BaseProvider):
-    def __init__(self, base_url="http://localhost:11434"):
-        self.base_url = base_url
+    def __init__(self, gateway: LLMGateway = llm_gateway):
+        self.gateway = gateway
 
     async def chat(self, messages: list, model: str = "mistral"):
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(f"{self.base_url}/api/chat", json={
-                    "model": model,
-                    "messages": messages
-                })
-                response.raise_for_status()
-                result = response.json()
-                return result['message']['content']
+            return await self.gateway.chat_ollama(messages, model=model)
         except Exception as e:
             return f"Ollama Error: {str(e)}"
+
+    async def stream(self, messages: list, model: str = "mistral") -> AsyncIterator[str]:
+        async for delta in self.gateway.stream_ollama(messages, model=model):
+            yield delta
@@ -1,19 +1,21 @@
 # app/services/openai_provider.py
 
-from openai import AsyncOpenAI
-from app.config import OPENAI_API_KEY
+from contextlib import aclosing
+from typing import AsyncIterator
+from app.brain.llm_gateway import LLMGateway, llm_gateway
 from app.services.base_provider import BaseProvider
 
 class OpenAIProvider(BaseProvider):
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self, gateway: LLMGateway = llm_gateway):
+        self.gateway = gateway
 
     async def chat(self, messages: list, model: str = "gpt-3.5-turbo"):
         try:
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=messages
-            )
-            return response.choices[0].message.content
+            return await self.gateway.chat_openai(messages, model=model)
         except Exception as e:
             return f"OpenAI Error: {str(e)}"
+
+    async def stream(self, messages: list, model: str = "gpt-3.5-turbo") -> AsyncIterator[str]:
+        async with aclosing(self.gateway.stream_openai(messages, model=model)) as deltas:
+            async for delta in deltas:
+                yield delta
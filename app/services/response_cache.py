@@ -0,0 +1,160 @@
+# app/services/response_cache.py
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_REDIS,
+)
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "llmcache:"
+
+
+def cache_key(provider: str, model: Optional[str], temperature: float, messages: List[Dict]) -> str:
+    """Canonical hash of a completion request; ignores timestamps and other message metadata."""
+    normalized = [
+        {"role": m.get("role"), "content": str(m.get("content", "")).strip()}
+        for m in messages
+    ]
+    payload = json.dumps(
+        {
+            "provider": (provider or "").lower(),
+            "model": model or "",
+            "temperature": round(float(temperature), 3),
+            "messages": normalized,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier exact-match cache for LLM replies.
+
+    Tier 1 is a bounded in-process LRU (entry count and total bytes) with a
+    per-entry TTL. Tier 2 is the shared Redis, so other workers' answers are
+    reused too. Redis failures degrade to a local-only cache.
+    """
+
+    def __init__(
+        self,
+        ttl: int = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        redis=None,
+        enabled: bool = RESPONSE_CACHE_ENABLED,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.redis = redis  # a client, or a zero-arg factory such as get_redis
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._bytes = 0
+        self.counters = {
+            "hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    def _redis(self):
+        return self.redis() if callable(self.redis) else self.redis
+
+    def _drop(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _put_local(self, key: str, value: str, expires_at: float):
+        if key in self._entries:
+            self._drop(key)
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.counters["evictions"] += 1
+
+    def get_local(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.counters["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def get(self, key: str, bypass: bool = False) -> Optional[str]:
+        if bypass or not self.enabled:
+            self.counters["bypassed"] += 1
+            return None
+
+        value = self.get_local(key)
+        if value is not None:
+            self.counters["hits"] += 1
+            return value
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                value = await redis.get(REDIS_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"⚠️ [ResponseCache] Redis lookup failed: {e}")
+                value = None
+            if value is not None:
+                self.counters["redis_hits"] += 1
+                self._put_local(key, value, time.monotonic() + self.ttl)
+                return value
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, bypass: bool = False):
+        if bypass or not self.enabled:
+            return
+        self._put_local(key, value, time.monotonic() + self.ttl)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.set(REDIS_PREFIX + key, value, ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"⚠️ [ResponseCache] Redis store failed: {e}")
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.counters["hits"] + self.counters["redis_hits"] + self.counters["misses"]
+        hits = self.counters["hits"] + self.counters["redis_hits"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ✅ Shared response cache
+response_cache = ResponseCache(redis=get_redis if RESPONSE_CACHE_REDIS else None)
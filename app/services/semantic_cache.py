@@ -0,0 +1,263 @@
+# app/services/semantic_cache.py
+
+import itertools
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+from app.config import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_CAPACITY,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_OPT_OUT_TTL,
+    EMBEDDING_DIM,
+)
+from app.services.embeddings import hash_embed
+
+# How much the preceding turn pulls the query vector; keeps "and the second one?"
+# from matching across unrelated conversations.
+CONTEXT_WEIGHT = 0.35
+CONTEXT_CHARS = 300
+
+# Lexical embeddings barely move when a number or a negation changes ("port 8080"
+# vs "port 9090", "with SSL" vs "without SSL"), so these tokens must match exactly.
+_NUMBER = re.compile(r"\d+(?:[.,:]\d+)*")
+_WORD = re.compile(r"[a-z']+")
+NEGATIONS = frozenset({
+    "not", "no", "never", "none", "nothing", "nor", "neither", "without", "cannot", "cant",
+    "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "wont", "shouldnt", "couldnt", "wouldnt",
+})
+
+
+def guard_tokens(text: str) -> FrozenSet[str]:
+    """Numbers and negation words in `text`; a cached answer is only reused when these are identical."""
+    lowered = text.lower()
+    negations = set()
+    for word in _WORD.findall(lowered):
+        if word.endswith("n't") or word.replace("'", "") in NEGATIONS:
+            negations.add(word.replace("'", ""))
+    return frozenset(_NUMBER.findall(lowered)) | frozenset(negations)
+
+
+class SemanticCache:
+    """
+    Paraphrase-tolerant reply cache.
+
+    Each entry is the embedding of the final user turn blended with a short
+    fingerprint of the turn before it. Lookups score every live entry with a
+    single matrix-vector product and return the best answer above the
+    similarity threshold. A candidate only counts if the numbers and negation
+    words in both prompts are identical (`guard_tokens`). Entries are
+    partitioned by route and by `scope` (the session, unless configured as
+    global), so one user's cached answers are never served to another.
+    Partitions are identified by a hash of (route, scope) stored per slot, so
+    no per-session state outlives the entries themselves. Capacity is fixed;
+    the least recently used entry is evicted when full. Session opt-outs
+    expire after `opt_out_ttl` seconds without use. Recent hits are kept for
+    false-hit audits.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        capacity: int = SEMANTIC_CACHE_CAPACITY,
+        ttl: int = SEMANTIC_CACHE_TTL,
+        dim: int = EMBEDDING_DIM,
+        embed: Callable[[str, int], np.ndarray] = hash_embed,
+        enabled: bool = SEMANTIC_CACHE_ENABLED,
+        audit_size: int = 256,
+        opt_out_ttl: int = SEMANTIC_CACHE_OPT_OUT_TTL,
+    ):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.dim = dim
+        self.embed = embed
+        self.enabled = enabled
+        self.opt_out_ttl = opt_out_ttl
+
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires = np.zeros(capacity, dtype=np.float64)  # 0 marks an empty slot
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.partition_ids = np.zeros(capacity, dtype=np.int64)
+        self.partitions: List[Optional[tuple]] = [None] * capacity  # exact key, guards against hash collisions
+        self.entry_ids = np.zeros(capacity, dtype=np.int64)
+        self.prompts: List[Optional[str]] = [None] * capacity
+        self.answers: List[Optional[str]] = [None] * capacity
+        self.guards: List[FrozenSet[str]] = [frozenset()] * capacity
+
+        self._entry_seq = itertools.count(1)
+        self._audit_seq = itertools.count(1)
+        self.audits: Deque[Dict] = deque(maxlen=audit_size)
+        self.opted_out: "OrderedDict[str, float]" = OrderedDict()  # session -> expiry, oldest first
+        self.counters = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "skipped": 0,
+            "stores": 0,
+            "evictions": 0,
+            "false_hits": 0,
+            "guard_rejections": 0,
+        }
+
+    # -- sessions ------------------------------------------------------------
+
+    def set_session_enabled(self, session_id: str, enabled: bool):
+        self.opted_out.pop(session_id, None)
+        if not enabled:
+            self.opted_out[session_id] = time.time() + self.opt_out_ttl
+        self._expire_opt_outs()
+
+    def _expire_opt_outs(self):
+        now = time.time()
+        while self.opted_out and next(iter(self.opted_out.values())) <= now:
+            self.opted_out.popitem(last=False)
+
+    def _usable(self, session_id: Optional[str]) -> bool:
+        if not self.enabled:
+            return False
+        if session_id in self.opted_out:
+            self._expire_opt_outs()
+            if session_id in self.opted_out:
+                # Still in use: keep the opt-out alive
+                self.opted_out[session_id] = time.time() + self.opt_out_ttl
+                self.opted_out.move_to_end(session_id)
+                return False
+        return True
+
+    # -- vectors -------------------------------------------------------------
+
+    @staticmethod
+    def split_turns(messages: List[Dict]):
+        """Return (final user turn, preceding turn) or (None, None)."""
+        if not messages or messages[-1].get("role") != "user":
+            return None, None
+        query = str(messages[-1].get("content", "")).strip()
+        context = str(messages[-2].get("content", ""))[-CONTEXT_CHARS:] if len(messages) > 1 else ""
+        return query or None, context
+
+    def _vector(self, query: str, context: str) -> np.ndarray:
+        vector = self.embed(query, self.dim)
+        if context:
+            vector = vector + CONTEXT_WEIGHT * self.embed(context, self.dim)
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector = vector / norm
+        return vector.astype(np.float32, copy=False)
+
+    @staticmethod
+    def _partition_id(partition: tuple) -> int:
+        return hash(partition)
+
+    # -- cache API -----------------------------------------------------------
+
+    def lookup(self, messages: List[Dict], route: str = "", session_id: Optional[str] = None,
+               scope: str = "") -> Optional[str]:
+        if not self._usable(session_id):
+            self.counters["skipped"] += 1
+            return None
+        query, context = self.split_turns(messages)
+        if query is None:
+            self.counters["skipped"] += 1
+            return None
+
+        self.counters["lookups"] += 1
+        now = time.time()
+        partition = (route, scope)
+        live = (self.expires > now) & (self.partition_ids == self._partition_id(partition))
+        if not live.any():
+            self.counters["misses"] += 1
+            return None
+
+        scores = self.vectors @ self._vector(query, context)
+        scores[~live] = -1.0
+        candidates = np.flatnonzero(scores >= self.threshold)
+        guard = guard_tokens(query)
+        best = None
+        for slot in candidates[np.argsort(-scores[candidates])]:
+            if self.partitions[slot] != partition:
+                continue
+            if self.guards[slot] == guard:
+                best = int(slot)
+                break
+            self.counters["guard_rejections"] += 1
+        if best is None:
+            self.counters["misses"] += 1
+            return None
+        similarity = float(scores[best])
+
+        self.counters["hits"] += 1
+        self.last_used[best] = now
+        self.audits.append({
+            "audit_id": next(self._audit_seq),
+            "entry_id": int(self.entry_ids[best]),
+            "slot": best,
+            "query": query,
+            "matched_prompt": self.prompts[best],
+            "similarity": round(similarity, 4),
+            "session_id": session_id,
+            "at": now,
+        })
+        return self.answers[best]
+
+    def store(self, messages: List[Dict], answer: str, route: str = "", session_id: Optional[str] = None,
+              scope: str = ""):
+        if not self._usable(session_id):
+            return
+        query, context = self.split_turns(messages)
+        if query is None:
+            return
+
+        now = time.time()
+        free = np.flatnonzero(self.expires <= now)
+        if free.size:
+            slot = int(free[0])
+            if self.expires[slot]:
+                self.counters["evictions"] += 1  # reclaimed an expired entry
+        else:
+            slot = int(np.argmin(self.last_used))
+            self.counters["evictions"] += 1
+
+        self.vectors[slot] = self._vector(query, context)
+        self.expires[slot] = now + self.ttl
+        self.last_used[slot] = now
+        self.partition_ids[slot] = self._partition_id((route, scope))
+        self.partitions[slot] = (route, scope)
+        self.entry_ids[slot] = next(self._entry_seq)
+        self.prompts[slot] = query
+        self.answers[slot] = answer
+        self.guards[slot] = guard_tokens(query)
+        self.counters["stores"] += 1
+
+    def report_false_hit(self, audit_id: int) -> bool:
+        """Mark an audited hit as wrong and drop the entry that produced it."""
+        for audit in self.audits:
+            if audit["audit_id"] == audit_id and not audit.get("false_hit"):
+                audit["false_hit"] = True
+                self.counters["false_hits"] += 1
+                slot = audit["slot"]
+                if self.entry_ids[slot] == audit["entry_id"]:
+                    self.expires[slot] = 0.0
+                return True
+        return False
+
+    def stats(self) -> Dict:
+        hits, lookups = self.counters["hits"], self.counters["lookups"]
+        return {
+            **self.counters,
+            "entries": int((self.expires > time.time()).sum()),
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "false_hit_rate": round(self.counters["false_hits"] / hits, 4) if hits else 0.0,
+            "opted_out_sessions": len(self.opted_out),
+        }
+
+
+# ✅ Shared semantic cache
+semantic_cache = SemanticCache()
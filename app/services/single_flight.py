@@ -0,0 +1,56 @@
+# app/services/single_flight.py
+
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls onto one upstream task.
+
+    The first caller for a key starts the task; later callers with the same
+    key await the same result. A waiter that is cancelled only detaches
+    itself; the shared task is cancelled once no waiters remain.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.counters = {"leaders": 0, "joined": 0, "cancelled": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["joined"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self.counters["cancelled"] += 1
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict:
+        return {**self.counters, "in_flight": len(self._flights)}
+
+
+# ✅ Shared single-flight group for upstream LLM calls
+single_flight = SingleFlight()
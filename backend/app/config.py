@@ -8,3 +8,8 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 MODEL_PROVIDER = os.getenv("MODEL_PROVIDER")
+
+# Long-term knowledge store (SQLite on disk, LRU hot tier in memory)
+LONG_TERM_STORE_PATH = os.getenv("LONG_TERM_STORE_PATH", "app/memory/store/long_term.sqlite3")
+LONG_TERM_CACHE_BYTES = int(os.getenv("LONG_TERM_CACHE_BYTES", str(64 * 1024 * 1024)))
+LONG_TERM_COMPACT_INTERVAL = float(os.getenv("LONG_TERM_COMPACT_INTERVAL", "300"))  # seconds; 0 = only on compact()
@@ -1,10 +1,275 @@
-# Placeholder for future cloud-based memory (e.g., Azure AI Search, Pinecone, etc.)
+# backend/app/memory/long_term_memory.py
+
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from app.config import LONG_TERM_STORE_PATH, LONG_TERM_CACHE_BYTES, LONG_TERM_COMPACT_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+SCAN_BATCH = 1000
+BULK_CHUNK = 500  # keys per IN (...) query, under SQLite's bound-variable limit
+ENTRY_OVERHEAD = 160  # approximate bytes per cached entry beyond its characters (str headers, dict node)
+
+
+def _prefix_end(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with `prefix` (None = no upper bound)."""
+    while prefix and ord(prefix[-1]) == 0x10FFFF:
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:  # surrogates cannot be encoded; skip past them
+        following = 0xE000
+    return prefix[:-1] + chr(following)
+
+
 class LongTermMemory:
-    def __init__(self):
-        self.storage = {}
+    """
+    Persistent key-value knowledge store.
+
+    Entries live in an SQLite table clustered by key (WITHOUT ROWID), so point
+    lookups and prefix scans are B-tree range reads and the working set, not
+    the whole knowledge base, stays in RAM. Recently used entries are also held
+    in an LRU bounded by `cache_bytes`.
+
+    Writes go through one connection, serialized by a write lock. Reads use a
+    connection per thread, so under WAL they run concurrently with each other
+    and with a writer; only LRU bookkeeping is shared between the two.
+
+    The database uses incremental auto-vacuum; a background thread returns
+    free pages to the filesystem and truncates the WAL every
+    `compact_interval` seconds (0 disables it, `compact()` runs it by hand).
+    """
+
+    def __init__(self, path: str = LONG_TERM_STORE_PATH, cache_bytes: int = LONG_TERM_CACHE_BYTES,
+                 compact_interval: float = LONG_TERM_COMPACT_INTERVAL):
+        self.path = path or ":memory:"
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached_bytes = 0
+        self._cache_lock = threading.Lock()  # LRU and counters only; never held across SQLite calls
+        self._write_lock = threading.Lock()
+        self._writes = 0  # bumped after every committed write; stale reads are not cached
+        self._local = threading.local()
+        self._readers = []
+        self.counters = {"cache_hits": 0, "cache_misses": 0, "compactions": 0, "pages_freed": 0}
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # auto_vacuum only takes effect if set before the first table is created
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS knowledge (key TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID")
+        self._closed = False
+
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+        if compact_interval > 0:
+            self._compactor = threading.Thread(target=self._compact_loop, args=(compact_interval,),
+                                               name="long-term-compactor", daemon=True)
+            self._compactor.start()
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection (the writer's, under its lock, for an in-memory database)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._local.conn = conn
+            with self._cache_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _read(self, sql: str, args=()) -> list:
+        if self.path == ":memory:":
+            with self._write_lock:
+                return self._db.execute(sql, args).fetchall()
+        return self._reader().execute(sql, args).fetchall()
+
+    # -- hot tier ------------------------------------------------------------
+
+    @staticmethod
+    def _size(key: str, data: str) -> int:
+        return len(key) + len(data) + ENTRY_OVERHEAD
+
+    def _cache_put(self, key: str, data: str):
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cached_bytes -= self._size(key, old)
+        size = self._size(key, data)
+        if size > self.cache_bytes:
+            return
+        self._cache[key] = data
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes:
+            evicted_key, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= self._size(evicted_key, evicted)
+
+    def _cache_drop(self, key: str):
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cached_bytes -= self._size(key, old)
+
+    # -- writes --------------------------------------------------------------
 
     def add_knowledge(self, key: str, data: str):
-        self.storage[key] = data
+        self.add_many([(key, data)])
+
+    def add_many(self, items: Union[Mapping[str, str], Iterable[Tuple[str, str]]]):
+        """Insert or overwrite many entries in one transaction."""
+        items = list(items.items() if isinstance(items, Mapping) else items)
+        if not items:
+            return
+        with self._write_lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO knowledge (key, data) VALUES (?, ?)", items)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            with self._cache_lock:
+                self._writes += 1
+                for key, data in items:
+                    self._cache_put(key, data)
+
+    def delete_knowledge(self, key: str) -> bool:
+        with self._write_lock:
+            deleted = self._db.execute("DELETE FROM knowledge WHERE key = ?", (key,)).rowcount > 0
+            with self._cache_lock:
+                self._writes += 1
+                self._cache_drop(key)
+        return deleted
+
+    def delete_prefix(self, prefix: str) -> int:
+        where, args = self._prefix_clause(prefix)
+        with self._write_lock:
+            deleted = self._db.execute(f"DELETE FROM knowledge WHERE {where}", args).rowcount
+            with self._cache_lock:
+                self._writes += 1
+                for key in [key for key in self._cache if key.startswith(prefix)]:
+                    self._cache_drop(key)
+        return deleted
+
+    # -- reads ---------------------------------------------------------------
+
+    def retrieve_knowledge(self, key: str) -> Optional[str]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """{key: data} for the keys that exist; missing keys are left out."""
+        found, missing = {}, []
+        with self._cache_lock:
+            for key in dict.fromkeys(keys):
+                data = self._cache.get(key)
+                if data is None:
+                    missing.append(key)
+                else:
+                    self._cache.move_to_end(key)
+                    found[key] = data
+            self.counters["cache_hits"] += len(found)
+            self.counters["cache_misses"] += len(missing)
+            writes = self._writes
+        if not missing:
+            return found
+        rows = []
+        for start in range(0, len(missing), BULK_CHUNK):
+            chunk = missing[start:start + BULK_CHUNK]
+            rows += self._read(f"SELECT key, data FROM knowledge WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+        found.update(rows)
+        with self._cache_lock:
+            # A write that committed meanwhile may have replaced what was read; it already updated the cache
+            if self._writes == writes:
+                for key, data in rows:
+                    self._cache_put(key, data)
+        return found
+
+    @staticmethod
+    def _prefix_clause(prefix: str) -> Tuple[str, tuple]:
+        end = _prefix_end(prefix)
+        if end is None:
+            return "key >= ?", (prefix,)
+        return "key >= ? AND key < ?", (prefix, end)
+
+    def scan_prefix(self, prefix: str = "", limit: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """(key, data) pairs whose key starts with `prefix`, in key order.
+
+        Rows are fetched in batches by key position, so a scan over millions of
+        entries holds one batch in memory and does not block writers in between.
+        """
+        where, args = self._prefix_clause(prefix)
+        after, remaining = None, limit
+        while remaining is None or remaining > 0:
+            size = SCAN_BATCH if remaining is None else min(SCAN_BATCH, remaining)
+            if after is None:
+                rows = self._read(f"SELECT key, data FROM knowledge WHERE {where} ORDER BY key LIMIT ?", (*args, size))
+            else:
+                rows = self._read(f"SELECT key, data FROM knowledge WHERE {where} AND key > ? ORDER BY key LIMIT ?",
+                                  (*args, after, size))
+            yield from rows
+            if len(rows) < size:
+                return
+            after = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def __len__(self) -> int:
+        return self._read("SELECT COUNT(*) FROM knowledge")[0][0]
+
+    def __contains__(self, key: str) -> bool:
+        return self.retrieve_knowledge(key) is not None
+
+    # -- maintenance ---------------------------------------------------------
+
+    def compact(self) -> int:
+        """Return free pages to the filesystem and truncate the WAL; the number of pages freed."""
+        with self._write_lock:
+            free = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+            if free:
+                self._db.execute("PRAGMA incremental_vacuum").fetchall()
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            self._db.execute("PRAGMA optimize")
+        with self._cache_lock:
+            self.counters["compactions"] += 1
+            self.counters["pages_freed"] += free
+        return free
+
+    def _compact_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                freed = self.compact()
+                if freed:
+                    logger.info(f"🧹 [LongTermMemory] Compacted {self.path}: {freed} pages freed")
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ [LongTermMemory] Compaction failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._cache_lock:
+            lookups = self.counters["cache_hits"] + self.counters["cache_misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(self.counters["cache_hits"] / lookups, 4) if lookups else 0.0,
+                "cached_entries": len(self._cache),
+                "cached_bytes": self._cached_bytes,
+                "cache_capacity_bytes": self.cache_bytes,
+            }
 
-    def retrieve_knowledge(self, key: str):
-        return self.storage.get(key, None)
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._write_lock:
+            self._closed = True
+            self._db.close()
+        with self._cache_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
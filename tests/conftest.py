@@ -0,0 +1,22 @@
+import pytest
+
+import app.db.redis as redis_db
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the shared async Redis pool (app/db/redis.py) at an in-process fake server."""
+    fakeredis = pytest.importorskip("fakeredis")
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+
+    server = fakeredis.FakeServer()
+    from_url = redis_db.redis.ConnectionPool.from_url.__func__
+
+    def fake_from_url(cls, url, **kwargs):
+        kwargs.pop("health_check_interval", None)  # the fake connection does not answer health-check PINGs
+        return from_url(cls, url, connection_class=FakeAsyncRedisConnection, server=server, **kwargs)
+
+    monkeypatch.setattr(redis_db.redis.ConnectionPool, "from_url", classmethod(fake_from_url))
+    monkeypatch.setattr(redis_db, "_client", None)
+    monkeypatch.setattr(redis_db, "_pool", None)
+    yield server
@@ -0,0 +1,59 @@
+import asyncio
+from app.services.adaptive_router import AdaptiveRouter, parse_routes
+
+
+def test_parse_routes_fills_default_models():
+    assert parse_routes("openai:gpt-4o, ollama") == [("openai", "gpt-4o"), ("ollama", "llama3")]
+
+
+def test_traffic_shifts_away_from_failing_route():
+    router = AdaptiveRouter(routes=[("openai", "gpt-4o"), ("ollama", "llama3")], explore_rate=0)
+
+    async def fail_openai():
+        for _ in range(3):
+            try:
+                async with router.track("openai", "gpt-4o"):
+                    raise RuntimeError("brownout")
+            except RuntimeError:
+                pass
+
+    asyncio.run(fail_openai())
+
+    assert router.choose() == ("ollama", "llama3")
+    assert router.choose(allowed=["openai"]) == ("openai", "gpt-4o")
+    assert router.scores()["openai:gpt-4o"]["errors"] == 3
+
+
+def test_abandoned_calls_are_not_counted_and_streams_score_first_token():
+    router = AdaptiveRouter(routes=[("openai", "gpt-4o")], explore_rate=0, alpha=1.0)
+
+    async def slow_call():
+        async with router.track("openai", "gpt-4o"):
+            await asyncio.sleep(1)
+
+    async def stream():
+        async with router.track("openai", "gpt-4o") as call:
+            for _ in range(3):
+                await asyncio.sleep(0.05)
+                call.first_token()
+                yield "delta"
+
+    async def run():
+        # A hedge loser or single-flight teardown cancels the call
+        task = asyncio.create_task(slow_call())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        # A client that disconnects mid-stream closes the generator
+        chunks = stream()
+        await chunks.__anext__()
+        await chunks.aclose()
+
+        # A complete stream is scored by its first token, not the whole generation
+        return [delta async for delta in stream()]
+
+    assert asyncio.run(run()) == ["delta"] * 3
+    scores = router.scores()["openai:gpt-4o"]
+    assert scores["calls"] == 1 and scores["errors"] == 0 and scores["in_flight"] == 0
+    assert 0.04 <= scores["ewma_latency"] < 0.1
@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routes import chat
+
+client = TestClient(app)
+
+
+def test_chat_fits_history_to_the_resolved_models_budget(monkeypatch):
+    history = [{"role": "user", "content": f"message {i}", "tokens": 500} for i in range(60)]
+    sent = {}
+
+    async def fake_append_and_window(session_id, role, content, limit=5):
+        return list(history)
+
+    async def fake_add_message(session_id, role, content):
+        pass
+
+    async def fake_chat(messages, provider=None, model=None, **kwargs):
+        sent[model] = messages
+        return "ok"
+
+    monkeypatch.setattr(chat, "add_message_and_get_window", fake_append_and_window)
+    monkeypatch.setattr(chat, "add_message", fake_add_message)
+    monkeypatch.setattr(chat.session_compactor, "maybe_schedule", lambda *args: None)
+    monkeypatch.setattr(chat.llm_gateway, "chat", fake_chat)
+
+    for model in ("gpt-4", "gpt-4o"):
+        monkeypatch.setattr(chat.llm_gateway, "resolve", lambda allowed=None, model=model: ("openai", model))
+        response = client.post("/chat", json={"message": "hi", "session_id": "s1", "no_cache": True})
+        assert response.json() == {"reply": "ok"}
+
+    # gpt-4's 8192-token window (less the reply reserve) keeps only the newest turns; gpt-4o keeps them all
+    assert sent["gpt-4"] == chat.prompt_engine.build_context(history, model="gpt-4")
+    assert 1 < len(sent["gpt-4"]) < 20
+    assert len(sent["gpt-4o"]) == 1 + 60
@@ -0,0 +1,66 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routes import assistant
+
+client = TestClient(app)
+
+
+def test_chatstream_relays_deltas_and_persists_reply(monkeypatch):
+    saved = []
+
+    async def fake_add_message(session_id, role, content):
+        saved.append((session_id, role, content))
+
+    async def fake_append_and_window(session_id, role, content, limit=5):
+        saved.append((session_id, role, content))
+        return [{"role": "user", "content": "hi"}]
+
+    async def fake_stream(messages, provider=None, model=None):
+        for delta in ["Hel", "lo\nworld"]:
+            yield delta
+
+    monkeypatch.setattr(assistant, "add_message", fake_add_message)
+    monkeypatch.setattr(assistant, "add_message_and_get_window", fake_append_and_window)
+    monkeypatch.setattr(assistant.llm_gateway, "stream", fake_stream)
+
+    response = client.post("/chatstream", json={"message": "hi", "session_id": "s1"})
+
+    assert response.status_code == 200
+    assert response.text == "data: Hel\n\ndata: lo\ndata: world\n\ndata: [END]\n\n"
+    assert saved == [("s1", "user", "hi"), ("s1", "assistant", "Hello\nworld")]
+
+
+def test_chatstream_fits_history_to_the_resolved_models_budget(monkeypatch):
+    history = [{"role": "user", "content": f"message {i}", "tokens": 500} for i in range(60)]
+    sent = {}
+
+    async def fake_add_message(session_id, role, content):
+        pass
+
+    async def fake_append_and_window(session_id, role, content, limit=5):
+        return list(history)
+
+    async def fake_stream(messages, provider=None, model=None):
+        sent[model] = (provider, messages)
+        yield "ok"
+
+    monkeypatch.setattr(assistant, "add_message", fake_add_message)
+    monkeypatch.setattr(assistant, "add_message_and_get_window", fake_append_and_window)
+    monkeypatch.setattr(assistant.session_compactor, "maybe_schedule", lambda *args: None)
+    monkeypatch.setattr(assistant.llm_gateway, "stream", fake_stream)
+
+    # No model in the request: the gateway's pick decides the budget
+    for model in ("gpt-4", "gpt-4o"):
+        monkeypatch.setattr(assistant.llm_gateway, "resolve",
+                            lambda provider=None, requested=None, allowed=None, model=model: ("openai", model))
+        response = client.post("/chatstream", json={"message": "hi", "session_id": "s1"})
+        assert response.text.endswith("data: [END]\n\n")
+
+    assert sent["gpt-4"] == ("openai", assistant.prompt_engine.build_context(history, model="gpt-4"))
+    assert 1 < len(sent["gpt-4"][1]) < 20
+    assert len(sent["gpt-4o"][1]) == 1 + 60
+
+
+def test_chatstream_rejects_an_unknown_provider():
+    response = client.post("/chatstream", json={"message": "hi", "provider": "nope"})
+    assert response.status_code == 400 and "nope" in response.json()["detail"]
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingService, HashEmbeddingBackend
+
+
+class CountingBackend(HashEmbeddingBackend):
+    def __init__(self, dim=32, delay=0.0):
+        super().__init__(dim)
+        self.calls = []
+        self.delay = delay
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)  # fixed per-call cost, like a model forward pass or an HTTP round trip
+        return super().embed(texts)
+
+
+def test_identical_texts_are_embedded_once_and_survive_restart(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    backend = CountingBackend()
+    service = EmbeddingService(backend, cache_size=2, path=path)
+
+    first = service.embed_many(["a b c", "d e f", "a b c"])
+    assert backend.calls == [["a b c", "d e f"]]
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_allclose(first, HashEmbeddingBackend(32).embed(["a b c", "d e f", "a b c"]))
+
+    service.embed_many(["g h i"])  # evicts "a b c" from the 2-entry LRU
+    service.embed_many(["a b c"])  # ...so it comes back from disk
+    assert len(backend.calls) == 2
+    stats = service.stats()
+    assert stats["disk_hits"] == 1 and stats["misses"] == 3 and stats["memory_entries"] == 2
+    service.close()
+
+    restarted = EmbeddingService(CountingBackend(), path=path)
+    np.testing.assert_array_equal(restarted.embed("d e f"), first[1])
+    assert restarted.backend.calls == [] and restarted.stats()["hit_rate"] == 1.0
+
+
+def test_concurrent_requests_are_coalesced_into_batches():
+    backend = CountingBackend(delay=0.05)
+    service = EmbeddingService(backend, path=None, max_batch_size=16, max_wait_ms=10)
+
+    async def run():
+        started = time.perf_counter()
+        texts = [f"query {i % 20}" for i in range(40)]  # every text requested twice
+        vectors = await asyncio.gather(*(service.aembed(text) for text in texts))
+        elapsed = time.perf_counter() - started
+        await service.stop()
+        return texts, vectors, elapsed
+
+    texts, vectors, elapsed = asyncio.run(run())
+    np.testing.assert_allclose(np.stack(vectors), HashEmbeddingBackend(32).embed(texts))
+    assert sorted(len(call) for call in backend.calls) == [4, 16]
+    assert sum(len(call) for call in backend.calls) == 20
+    assert elapsed < 0.5
+    stats = service.stats()
+    assert stats["single_flight"]["joined"] == 20
+    assert stats["backend_batch_size"]["samples"] == 2
+
+
+def test_cached_lookups_on_the_loop_do_not_wait_for_sqlite(tmp_path):
+    service = EmbeddingService(CountingBackend(), path=str(tmp_path / "embeddings.sqlite3"))
+    service.embed("warm")
+
+    async def run():
+        # A long SQLite write holds the database lock; memory hits must not queue behind it
+        with service._db_lock:
+            started = time.perf_counter()
+            vector = await asyncio.wait_for(service.aembed("warm"), 1)
+            return vector, time.perf_counter() - started
+
+    vector, elapsed = asyncio.run(run())
+    np.testing.assert_array_equal(vector, service.embed("warm"))
+    assert elapsed < 0.1
+    service.close()
+
+
+def test_auto_backend_prefers_a_real_model_and_warns_on_the_stand_in(monkeypatch, caplog):
+    from app.services import embedding_cache
+
+    monkeypatch.setattr(embedding_cache.importlib.util, "find_spec", lambda name: object())
+    assert isinstance(embedding_cache.create_backend("auto"), embedding_cache.LocalEmbeddingBackend)
+
+    monkeypatch.setattr(embedding_cache.importlib.util, "find_spec", lambda name: None)
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_API_KEY", "sk-test")
+    assert isinstance(embedding_cache.create_backend("auto"), embedding_cache.OpenAIEmbeddingBackend)
+
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_API_KEY", "")
+    service = EmbeddingService(embedding_cache.create_backend("auto"), path=None)
+    assert isinstance(service.backend, HashEmbeddingBackend)
+    with caplog.at_level("WARNING"):
+        service.startup()
+    assert "lexical hash vectors" in caplog.text
+
+
+def test_hit_rate_counts_each_distinct_text_once():
+    service = EmbeddingService(CountingBackend(), path=None)
+    service.embed_many(["a", "a", "b"])
+    service.embed_many(["a", "a"])
+    stats = service.stats()
+    assert (stats["requests"], stats["misses"], stats["memory_hits"]) == (3, 2, 1)
+    assert stats["hit_rate"] == 0.3333
+
+
+def test_local_backend_is_not_loaded_to_size_a_store(tmp_path):
+    from app.memory.short_term_memory import ShortTermMemory
+    from app.services.embedding_cache import LocalEmbeddingBackend
+
+    backend = LocalEmbeddingBackend(model="sentence-transformers/all-MiniLM-L6-v2")
+    memory = ShortTermMemory(path=str(tmp_path / "short_term"), embedder=EmbeddingService(backend, path=None))
+    assert memory.store.dim == 384 and memory.store.model == "local:sentence-transformers/all-MiniLM-L6-v2"
+    assert backend._model is None  # no import, download or load until the first embed
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.executor import ExecutionLayer, runs_in, execution_of, ASYNC, THREAD, PROCESS
+
+
+@runs_in(PROCESS, timeout=5)
+def square(x):
+    return x * x
+
+
+def test_blocking_calls_do_not_stall_the_loop():
+    layer = ExecutionLayer(thread_workers=4)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(layer.run_thread(time.sleep, 0.2) for _ in range(4)))
+        task.cancel()
+        return ticks, results
+
+    ticks, results = asyncio.run(run())
+    assert ticks >= 10
+    assert results == [None] * 4
+    assert layer.stats()["thread"]["completed"] == 4
+    layer.shutdown()
+
+
+def test_timeouts_and_declared_execution_class():
+    layer = ExecutionLayer(thread_workers=2, process_workers=1)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await layer.run_thread(time.sleep, 0.5, timeout=0.05)
+        with pytest.raises(ZeroDivisionError):
+            await layer.run_thread(divmod, 1, 0)
+        await layer.run_thread(divmod, 7, 2)
+        return await layer.call(square, 7)
+
+    assert asyncio.run(run()) == 49
+    thread = layer.stats()["thread"]
+    assert (thread["completed"], thread["failed"], thread["timed_out"]) == (1, 1, 1)
+    assert layer.stats()["process"]["completed"] == 1
+    layer.shutdown()
+
+    async def coroutine():
+        pass
+
+    assert execution_of(square) == (PROCESS, 5)
+    assert execution_of(coroutine) == (ASYNC, None)
+    assert execution_of(len) == (THREAD, None)
+
+
+def test_timed_out_threads_count_as_in_flight_until_they_finish():
+    layer = ExecutionLayer(thread_workers=1)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await layer.run_thread(time.sleep, 0.3, timeout=0.05)
+        during = layer.stats()["thread"]["in_flight"]
+        await asyncio.sleep(0.4)
+        return during, layer.stats()["thread"]["in_flight"]
+
+    assert asyncio.run(run()) == (1, 0)
+    layer.shutdown()
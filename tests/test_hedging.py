@@ -0,0 +1,69 @@
+import asyncio
+from app.services.hedging import Hedger, HedgePolicy
+
+
+def _hedger(delay):
+    hedger = Hedger()
+    hedger.policies["openai"] = HedgePolicy(min_samples=0, min_delay=delay, max_delay=delay)
+    return hedger
+
+
+def test_backup_wins_and_slow_primary_is_cancelled():
+    hedger = _hedger(0.01)
+    cancelled = []
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(1)
+            return "primary"
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fast_backup():
+        return "backup"
+
+    result = asyncio.run(hedger.run("openai", slow_primary, "ollama", fast_backup))
+
+    assert result == "backup"
+    assert cancelled == [True]
+    assert hedger.counters == {"calls": 1, "hedged": 1, "backup_wins": 1}
+
+
+def test_fast_primary_never_fires_backup():
+    hedger = _hedger(0.5)
+    fired = []
+
+    async def primary():
+        return "primary"
+
+    async def backup():
+        fired.append(True)
+        return "backup"
+
+    assert asyncio.run(hedger.run("openai", primary, "ollama", backup)) == "primary"
+    assert fired == []
+    assert len(hedger.policy("openai").samples) == 1
+
+
+def test_delay_stays_in_the_tail_when_slow_primaries_lose_to_the_backup():
+    hedger = Hedger()
+    policy = hedger.policies["openai"] = HedgePolicy(percentile=95, min_samples=20, min_delay=0.0, max_delay=0.1)
+
+    async def run():
+        for i in range(60):
+            # One call in ten is stuck far past the hedge delay; the rest are fast
+            async def primary(seconds=0.5 if i % 10 == 9 else 0.002):
+                await asyncio.sleep(seconds)
+                return "primary"
+
+            async def backup():
+                await asyncio.sleep(0.01)
+                return "backup"
+
+            await hedger.run("openai", primary, "ollama", backup)
+
+    asyncio.run(run())
+    # Without the censored samples the window holds only fast calls and every request ends up hedged
+    assert policy.delay() >= 0.1
+    assert hedger.counters["hedged"] == hedger.counters["backup_wins"] == 6
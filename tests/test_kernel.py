@@ -0,0 +1,73 @@
+import asyncio
+import json
+import time
+
+from app.brain.core.base import CodexTool
+from app.brain.kernel import CodexKernel
+from app.db.redis import get_redis
+from app.memory import manager as manager_module
+
+
+class SleepTool(CodexTool):
+    """Sleeps for the given number of seconds."""
+
+    def __init__(self, name):
+        self.name = name
+
+    async def run(self, prompt: str, session_id: str) -> str:
+        await asyncio.sleep(float(prompt))
+        return f"{self.name} slept {prompt} for {session_id}"
+
+
+class FakeGateway:
+    """Asks for two tool calls in the first turn, then answers."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def chat_message(self, messages, tools=None, provider=None, model=None, temperature=0.7):
+        self.requests.append({"messages": [dict(m) for m in messages], "tools": tools})
+        if len(self.requests) == 1:
+            return {"role": "assistant", "content": None, "tool_calls": [
+                {"id": f"call_{name}", "type": "function",
+                 "function": {"name": name, "arguments": json.dumps({"prompt": "0.3"})}}
+                for name in ("a", "b")
+            ]}
+        return {"role": "assistant", "content": "both done"}
+
+
+def test_tool_calls_run_concurrently_and_results_go_back_to_the_model(fake_redis, monkeypatch):
+    async def enqueue(row):
+        pass
+
+    monkeypatch.setattr(manager_module.message_writer, "enqueue", enqueue)
+    gateway = FakeGateway()
+    kernel = CodexKernel(tools=[SleepTool("a"), SleepTool("b")], gateway=gateway, max_rounds=3)
+
+    async def run():
+        started = time.perf_counter()
+        response = await kernel.run("use both tools", "s1")
+        elapsed = time.perf_counter() - started
+        redis = get_redis()
+        stored = [json.loads(m) for m in await redis.lrange("s1", 0, -1)]
+        await redis.aclose()
+        return response, elapsed, stored
+
+    response, elapsed, stored = asyncio.run(run())
+
+    # Two 0.3s tools in one turn cost about 0.3s, not 0.6s
+    assert elapsed < 0.55
+    assert response.thoughts["rounds"][0]["wall_ms"] < 550
+    assert response.reply == "both done"
+
+    first, second = gateway.requests
+    assert first["messages"][-1]["content"] == "use both tools"
+    assert [spec["function"]["name"] for spec in first["tools"]] == ["a", "b"]
+    # The follow-up turn carries the assistant's tool calls and one result per call
+    assistant, *results = second["messages"][-3:]
+    assert [call["id"] for call in assistant["tool_calls"]] == ["call_a", "call_b"]
+    assert results == [
+        {"role": "tool", "tool_call_id": "call_a", "content": "a slept 0.3 for s1"},
+        {"role": "tool", "tool_call_id": "call_b", "content": "b slept 0.3 for s1"},
+    ]
+    assert [(m["role"], m["content"]) for m in stored] == [("user", "use both tools"), ("assistant", "both done")]
@@ -0,0 +1,81 @@
+import asyncio
+import httpx
+from app.brain.llm_gateway import LLMGateway
+
+
+def _ollama_transport(state):
+    async def handler(request: httpx.Request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "pong"}})
+    return httpx.MockTransport(handler)
+
+
+def test_ollama_reuses_pool_and_respects_concurrency_cap():
+    state = {"active": 0, "peak": 0}
+    gateway = LLMGateway(concurrency={"ollama": 2}, transport=_ollama_transport(state))
+
+    async def run():
+        await gateway.startup()
+        pool = gateway._http_client("ollama")
+        replies = await asyncio.gather(*[
+            gateway.chat([{"role": "user", "content": "ping"}], provider="ollama") for _ in range(6)
+        ])
+        assert gateway._http_client("ollama") is pool
+        await gateway.aclose()
+        return replies
+
+    assert asyncio.run(run()) == ["pong"] * 6
+    assert state["peak"] <= 2
+    assert gateway.stats()["ollama"]["in_flight"] == 0
+
+
+def test_ollama_stream_yields_ndjson_deltas():
+    body = "\n".join([
+        '{"message": {"content": "Hel"}, "done": false}',
+        '{"message": {"content": "lo"}, "done": false}',
+        '{"message": {"content": ""}, "done": true}',
+    ])
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text=body))
+    gateway = LLMGateway(transport=transport)
+
+    async def run():
+        deltas = [delta async for delta in gateway.stream([{"role": "user", "content": "hi"}], provider="ollama")]
+        await gateway.aclose()
+        return deltas
+
+    assert asyncio.run(run()) == ["Hel", "lo"]
+
+
+def test_closing_a_stream_early_releases_the_provider_slot():
+    body = "\n".join(f'{{"message": {{"content": "d{i}"}}, "done": false}}' for i in range(5))
+    gateway = LLMGateway(concurrency={"ollama": 1, "openai": 1},
+                         transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body)))
+
+    class Chunk:
+        def __init__(self, text):
+            self.choices = [type("Choice", (), {"delta": type("Delta", (), {"content": text})()})()]
+
+    class FakeCompletions:
+        async def create(self, stream=True, **kwargs):
+            async def chunks():
+                for i in range(5):
+                    yield Chunk(f"d{i}")
+            return chunks()
+
+    gateway._openai = lambda: type("Client", (), {"chat": type("Chat", (), {"completions": FakeCompletions()})()})()
+
+    async def run():
+        in_flight = {}
+        for provider in ("ollama", "openai"):
+            # A client that disconnects after the first delta closes the outer generator
+            deltas = gateway.stream([{"role": "user", "content": "hi"}], provider=provider)
+            assert await deltas.__anext__() == "d0"
+            await deltas.aclose()
+            in_flight[provider] = gateway.stats()[provider]["in_flight"]
+        await gateway.aclose()
+        return in_flight
+
+    assert asyncio.run(run()) == {"ollama": 0, "openai": 0}
@@ -0,0 +1,73 @@
+import os
+import threading
+from pathlib import Path
+
+from app.memory.long_term_memory import LongTermMemory
+
+
+def test_entries_persist_and_the_hot_tier_stays_bounded(tmp_path):
+    path = str(tmp_path / "long_term.sqlite3")
+    memory = LongTermMemory(path=path, cache_bytes=4000, compact_interval=0)
+    memory.add_knowledge("repo:readme", "CodexContinueGPT")
+    memory.add_many({f"doc:{i:05d}": "x" * 50 for i in range(1000)})
+    memory.add_knowledge("repo:readme", "CodexContinueGPT v2")  # overwrite
+
+    assert memory.retrieve_knowledge("repo:readme") == "CodexContinueGPT v2"
+    assert memory.retrieve_knowledge("missing") is None
+    assert memory.stats()["cached_bytes"] <= 4000
+    assert len(memory.get_many([f"doc:{i:05d}" for i in range(0, 1000, 7)] + ["missing"])) == 143
+    memory.close()
+
+    restarted = LongTermMemory(path=path, cache_bytes=4000, compact_interval=0)
+    assert len(restarted) == 1001
+    assert restarted.retrieve_knowledge("doc:00999") == "x" * 50
+    restarted.close()
+
+
+def test_prefix_scan_delete_and_compaction(tmp_path):
+    path = str(tmp_path / "long_term.sqlite3")
+    memory = LongTermMemory(path=path, compact_interval=0)
+    memory.add_many([(f"file:src/{i:04d}.py", "y" * 2000) for i in range(2500)])
+    memory.add_many([("file:srcs", "z"), ("file:tests/a.py", "t"), ("fild", "before"), ("filf", "after")])
+
+    keys = [key for key, _ in memory.scan_prefix("file:src/")]
+    assert keys == [f"file:src/{i:04d}.py" for i in range(2500)]  # spans several scan batches
+    assert [key for key, _ in memory.scan_prefix("file:", limit=3)] == keys[:3]
+    assert [key for key, _ in memory.scan_prefix("file:t")] == ["file:tests/a.py"]
+
+    assert memory.delete_prefix("file:src/") == 2500
+    assert memory.retrieve_knowledge("file:src/0001.py") is None
+    assert len(memory) == 4
+
+    before = os.path.getsize(path)
+    memory.compact()
+    assert memory.stats()["pages_freed"] > 0
+    assert os.path.getsize(path) < before
+    memory.close()
+
+
+def test_reads_do_not_wait_for_writers(tmp_path):
+    memory = LongTermMemory(path=str(tmp_path / "long_term.sqlite3"), cache_bytes=0, compact_interval=0)
+    memory.add_many({f"doc:{i}": f"v{i}" for i in range(10)})
+    results = {}
+
+    def read():
+        results["get_many"] = memory.get_many(["doc:1", "doc:2"])
+        results["scan"] = [key for key, _ in memory.scan_prefix("doc:", limit=3)]
+
+    # A writer holding the write lock (e.g. a long bulk insert) must not stall readers
+    with memory._write_lock:
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(timeout=2)
+        assert not reader.is_alive()
+    assert results == {"get_many": {"doc:1": "v1", "doc:2": "v2"}, "scan": ["doc:0", "doc:1", "doc:2"]}
+    memory.close()
+
+
+def test_backend_copy_matches_the_app_module():
+    root = Path(__file__).resolve().parents[1]
+    app_copy = (root / "app/memory/long_term_memory.py").read_text().splitlines()
+    backend_copy = (root / "backend/app/memory/long_term_memory.py").read_text().splitlines()
+    # Only the path header differs; port changes to both files
+    assert app_copy[1:] == backend_copy[1:]
@@ -0,0 +1,151 @@
+import asyncio
+import json
+
+from app.db.redis import get_redis
+from app.memory import manager as manager_module
+from app.memory.manager import MemoryManager, summary_key
+
+
+def _capture_rows(monkeypatch):
+    rows = []
+
+    async def enqueue(row):
+        rows.append(row)
+
+    monkeypatch.setattr(manager_module.message_writer, "enqueue", enqueue)
+    return rows
+
+
+def test_append_assigns_increasing_seq_trims_and_returns_the_window(fake_redis, monkeypatch):
+    rows = _capture_rows(monkeypatch)
+    monkeypatch.setattr(manager_module, "REDIS_HISTORY_MAXLEN", 5)
+
+    async def run():
+        redis = get_redis()
+        memory = MemoryManager("s1", redis=redis)
+        windows = [await memory.append_and_window("user", f"message {i} ✓ \"quoted\"", window=3) for i in range(8)]
+        await redis.hset(summary_key("s1"), mapping={"message": json.dumps({"role": "system", "content": "summary"})})
+        with_summary = await memory.append_and_window("assistant", "last", window=2)
+        stored = [json.loads(m) for m in await redis.lrange("s1", 0, -1)]
+        ttl = await redis.ttl("s1")
+        await redis.aclose()
+        return windows, with_summary, stored, ttl
+
+    windows, with_summary, stored, ttl = asyncio.run(run())
+    seqs = [row["seq"] for row in rows]
+    # Several appends land in the same millisecond; ids still strictly increase
+    assert seqs == sorted(set(seqs)) and len(seqs) == 9
+
+    # The window holds the newest messages, each carrying the seq SQLite got
+    assert [m["content"] for m in windows[-1]] == [f"message {i} ✓ \"quoted\"" for i in (5, 6, 7)]
+    assert [m["seq"] for m in windows[-1]] == seqs[5:8]
+    assert all(isinstance(m["seq"], int) and m["tokens"] > 0 for m in windows[-1])
+
+    # The list is trimmed to REDIS_HISTORY_MAXLEN and the summary precedes the window
+    assert [m["seq"] for m in stored] == seqs[-5:]
+    assert [m["content"] for m in with_summary] == ["summary", "message 7 ✓ \"quoted\"", "last"]
+    assert ttl > 0
+
+
+def _sqlite(tmp_path, monkeypatch):
+    """A migrated SQLite database in tmp_path, used for the manager's SQLite reads."""
+    from contextlib import asynccontextmanager
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from app.db.init_db import _migrate
+    from app.db.models import Base
+    from app.db.sqlite_conn import create_engine
+
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'messages.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def get_read_db():
+        async with sessions() as session:
+            yield session
+
+    monkeypatch.setattr(manager_module, "get_read_db", get_read_db)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_migrate)
+
+    return engine, setup
+
+
+def test_pages_cross_from_redis_into_sqlite_and_poll_with_since(fake_redis, tmp_path, monkeypatch):
+    from sqlalchemy import insert
+    from app.db.models import Message
+
+    engine, setup = _sqlite(tmp_path, monkeypatch)
+    messages = [{"role": "user", "content": f"m{seq}", "timestamp": None, "seq": seq} for seq in range(1, 11)]
+
+    async def run():
+        await setup()
+        # Every message is in SQLite; Redis holds the newest four (seq 7..10)
+        async with engine.begin() as conn:
+            await conn.execute(insert(Message), [{"session_id": "s1", "role": m["role"], "content": m["content"],
+                                                  "seq": m["seq"]} for m in messages])
+        redis = get_redis()
+        await redis.rpush("s1", *(json.dumps(m) for m in messages[6:]))
+        memory = MemoryManager("s1", redis=redis)
+
+        pages, cursor = [], None
+        while True:
+            page = await memory.page(limit=3, before=cursor)
+            pages.append(page)
+            if not page["has_more"]:
+                break
+            cursor = page["next_cursor"]
+
+        polls, since = [], 3
+        while True:
+            page = await memory.page(limit=3, since=since)
+            polls.append(page)
+            if not page["messages"]:
+                break
+            since = page["latest_cursor"]
+        await redis.aclose()
+        await engine.dispose()
+        return pages, polls
+
+    pages, polls = asyncio.run(run())
+    seqs = lambda page: [m["seq"] for m in page["messages"]]
+
+    # Walking back: 8-10 from Redis, 5-7 straddles the Redis floor, the rest is SQLite
+    assert [seqs(p) for p in pages] == [[8, 9, 10], [5, 6, 7], [2, 3, 4], [1]]
+    assert [p["next_cursor"] for p in pages] == [8, 5, 2, None]
+    assert pages[1]["messages"][0] == {"seq": 5, "role": "user", "content": "m5", "timestamp": pages[1]["messages"][0]["timestamp"]}
+
+    # Polling forward from seq 3: SQLite first, then across into Redis, then nothing new
+    assert [seqs(p) for p in polls] == [[4, 5, 6], [7, 8, 9], [10], []]
+    assert [p["has_more"] for p in polls] == [True, True, False, False]
+    assert polls[-1]["latest_cursor"] == 10
+
+
+def test_seq_backfill_runs_once(tmp_path, monkeypatch):
+    from sqlalchemy import text
+    from app.db.init_db import _migrate
+
+    engine, setup = _sqlite(tmp_path, monkeypatch)
+
+    async def run():
+        async with engine.begin() as conn:
+            # A database from before `seq` existed
+            await conn.execute(text("CREATE TABLE messages (id INTEGER PRIMARY KEY, session_id VARCHAR, role VARCHAR, "
+                                    "content TEXT, timestamp DATETIME)"))
+            await conn.execute(text("INSERT INTO messages (session_id, role, content) VALUES ('s', 'user', 'old')"))
+        await setup()
+        async with engine.begin() as conn:
+            backfilled = (await conn.execute(text("SELECT seq FROM messages"))).scalars().all()
+            await conn.execute(text("INSERT INTO messages (session_id, role, content) VALUES ('s', 'user', 'new')"))
+            await conn.run_sync(_migrate)  # next startup: the backfill does not scan the table again
+            after = (await conn.execute(text("SELECT seq FROM messages ORDER BY id"))).scalars().all()
+            version = (await conn.execute(text("PRAGMA user_version"))).scalar()
+        await engine.dispose()
+        return backfilled, after, version
+
+    backfilled, after, version = asyncio.run(run())
+    assert backfilled == [1]
+    assert after == [1, None]
+    assert version == 1
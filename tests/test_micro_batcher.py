@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from app.services.micro_batcher import MicroBatcher
+
+
+def test_concurrent_calls_share_batches():
+    calls = []
+
+    async def run_batch(items):
+        calls.append(len(items))
+        await asyncio.sleep(0.05)  # fixed per-forward-pass cost
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch_size=16, max_wait_ms=10)
+
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(40)))
+        elapsed = time.perf_counter() - started
+        await batcher.stop()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+    assert results == [i * 2 for i in range(40)]
+    assert calls == [16, 16, 8]
+    assert elapsed < 0.5  # 40 single-item passes would take 2s
+    stats = batcher.stats()
+    assert stats["batches"] == 3 and stats["batch_size"]["buckets"] == {"<=8": 1, "<=16": 2}
+    assert stats["queue_wait_ms"]["samples"] == 40
+
+
+def test_batch_errors_reach_every_caller():
+    async def run_batch(items):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=5)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(run()))
+    assert batcher.stats()["failed_batches"] == 1
@@ -0,0 +1,95 @@
+import asyncio
+
+from app.brain.planner import Plan, PlanExecutor, Planner
+
+
+def sleeper(seconds, value=None, fail=False):
+    async def step(inputs):
+        await asyncio.sleep(seconds)
+        if fail:
+            raise RuntimeError("step failed")
+        return value if value is not None else inputs
+    return step
+
+
+def test_independent_steps_overlap_and_critical_path_is_reported():
+    calls = []
+
+    async def memory():
+        await asyncio.sleep(0.1)
+        return ["earlier turn"]
+
+    async def search(query):
+        calls.append(query)
+        await asyncio.sleep(0.2)
+        return f"results for {query}"
+
+    async def respond(objective, inputs):
+        await asyncio.sleep(0.05)
+        return sorted(inputs)
+
+    planner = Planner()
+    planner.set_objective("find docs")
+    plan = planner.build(retrieve_memory=memory, tools={"search": search, "calc": sleeper(0.1, "42")}, respond=respond)
+    run = asyncio.run(PlanExecutor().run(plan))
+
+    assert run.ok
+    assert run.results["respond"] == ["retrieve_memory", "tool:calc", "tool:search"]
+    assert calls == ["find docs"]
+    report = run.report()
+    assert report["wall_ms"] < 330  # 0.2 + 0.05 with overlap, not 0.45 in sequence
+    assert report["critical_path"] == ["tool:search", "respond"]
+    assert planner.get_steps()[-1].endswith("Respond or execute task")
+
+
+def test_failure_skips_only_downstream_steps():
+    plan = (
+        Plan()
+        .add("fetch", sleeper(0.01, fail=True))
+        .add("parse", sleeper(0.01), depends_on=["fetch"])
+        .add("answer", sleeper(0.01), depends_on=["parse"])
+        .add("side", sleeper(0.02, "ok"))
+    )
+    run = asyncio.run(PlanExecutor().run(plan))
+    assert run.status == {"fetch": "failed", "parse": "skipped", "answer": "skipped", "side": "done"}
+    assert "step failed" in run.errors["fetch"]
+
+
+def test_shared_keys_run_once_per_run():
+    count = 0
+
+    async def expensive(inputs):
+        nonlocal count
+        count += 1
+        await asyncio.sleep(0.01)
+        return "same"
+
+    plan = Plan().add("a", expensive, key="k").add("b", expensive, key="k")
+    run = asyncio.run(PlanExecutor().run(plan))
+    assert run.results == {"a": "same", "b": "same"} and count == 1
+
+
+def test_fail_fast_stops_keyed_work_and_nothing_outlives_the_run():
+    finished = []
+
+    async def broken(objective):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("tool failed")
+
+    async def slow(objective):
+        await asyncio.sleep(0.3)
+        finished.append("slow")
+
+    async def run():
+        planner = Planner()
+        planner.set_objective("x")
+        keyed = Plan().add("broken", lambda _: broken("x")).add("slow", lambda _: slow("x"), key="slow")
+        results = [await PlanExecutor(fail_fast=True).run(plan)
+                   for plan in (planner.build(tools={"broken": broken, "slow": slow}), keyed)]
+        await asyncio.sleep(0.4)  # long enough for any leaked sibling to complete
+        return results
+
+    built, keyed = asyncio.run(run())
+    assert built.status == {"tool:broken": "failed", "tool:slow": "cancelled"}
+    assert keyed.status == {"broken": "failed", "slow": "cancelled"}
+    assert built.wall_ms < 100 and finished == []
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from app.plugins.interface import PluginInterface
+from app.plugins.manager import PluginManager
+
+
+class SlowInitPlugin(PluginInterface):
+    def __init__(self):
+        self.inits = 0
+        self.shutdowns = 0
+        self.ready = False
+
+    def initialize(self):
+        time.sleep(0.2)
+        self.inits += 1
+        self.ready = True
+
+    def execute(self, data):
+        return data.upper()
+
+    def health_check(self):
+        return self.ready
+
+    def shutdown(self):
+        self.shutdowns += 1
+        self.ready = False
+
+
+def manager(tmp_path, **kwargs):
+    plugins = PluginManager(plugin_directory=str(tmp_path), **kwargs)
+    plugin = SlowInitPlugin()
+    plugins.register("slow", plugin)
+    return plugins, plugin
+
+
+def test_resident_plugins_initialize_once(tmp_path):
+    plugins, plugin = manager(tmp_path, lifecycle="resident", health_interval=0)
+
+    async def run():
+        first = await asyncio.gather(*(plugins.execute_plugin("slow", "a") for _ in range(5)))
+        started = time.perf_counter()
+        second = await plugins.execute_plugin("slow", "b")
+        warm = time.perf_counter() - started
+        await plugins.stop()
+        return first, second, warm
+
+    first, second, warm = asyncio.run(run())
+    assert first == ["A"] * 5 and second == "B"
+    assert warm < 0.1
+    assert plugin.inits == 1 and plugin.shutdowns == 1
+    stats = plugins.stats()["slow"]
+    assert stats["init_ms"] >= 200 and stats["calls"] == 6 and not stats["ready"]
+
+
+def test_idle_and_unhealthy_plugins_are_released(tmp_path):
+    plugins, plugin = manager(tmp_path, lifecycle="resident", idle_ttl=0.05, health_interval=0.1)
+
+    async def run():
+        await plugins.start(warmup="*")
+        await asyncio.sleep(0.5)  # warm-up, then idle eviction
+        evicted = not plugins.stats()["slow"]["ready"]
+        await plugins.ensure_ready("slow")
+        plugin.ready = False
+        healthy = await plugins.check_health("slow")
+        await plugins.stop()
+        return evicted, healthy
+
+    evicted, healthy = asyncio.run(run())
+    assert evicted and not healthy
+    assert plugin.inits == 2
+
+
+class SlowCallPlugin(SlowInitPlugin):
+    def initialize(self):
+        self.inits += 1
+        self.ready = True
+
+    def execute(self, data):
+        time.sleep(0.4)
+        if not self.ready:
+            raise RuntimeError("shut down mid-call")
+        return data.upper()
+
+
+def test_plugins_with_calls_in_flight_are_not_released(tmp_path):
+    plugins = PluginManager(plugin_directory=str(tmp_path), lifecycle="resident", idle_ttl=0.01, health_interval=0.05)
+    plugin = SlowCallPlugin()
+    plugins.register("slow", plugin)
+
+    async def run():
+        await plugins.start(warmup="")
+        call = asyncio.create_task(plugins.execute_plugin("slow", "a"))
+        await asyncio.sleep(0.1)
+        in_flight = plugins.stats()["slow"]["in_flight"]
+        plugin.ready = False  # fails its health check, but the call still owns the plugin
+        healthy = await plugins.check_health("slow")
+        plugin.ready = True
+        result = await call
+        await asyncio.sleep(0.2)  # idle once the call is done, so eviction goes ahead
+        evicted = not plugins.stats()["slow"]["ready"]
+        await plugins.stop()
+        return in_flight, healthy, result, evicted
+
+    in_flight, healthy, result, evicted = asyncio.run(run())
+    assert in_flight == 1 and not healthy
+    assert result == "A"
+    assert evicted and plugin.shutdowns == 1
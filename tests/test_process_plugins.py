@@ -0,0 +1,46 @@
+import asyncio
+import os
+
+import pytest
+
+from app.plugins.interface import PluginInterface
+from app.plugins.manager import PluginManager
+from app.plugins.process_host import ProcessPlugin, PluginWorkerError
+
+
+class EchoPlugin(PluginInterface):
+    def initialize(self):
+        pass
+
+    def execute(self, data):
+        if data == "crash":
+            os._exit(1)
+        if isinstance(data, bytes):
+            return len(data), os.getpid()
+        return data, os.getpid()
+
+    def shutdown(self):
+        pass
+
+
+def test_plugin_runs_in_worker_processes(tmp_path):
+    plugins = PluginManager(plugin_directory=str(tmp_path), health_interval=0)
+    proxy = ProcessPlugin(EchoPlugin, workers=2)
+    plugins.register("echo", proxy)
+
+    async def run():
+        results = await asyncio.gather(*(plugins.execute_plugin("echo", i) for i in range(6)))
+        big = await plugins.execute_plugin("echo", b"x" * (4 * 1024 * 1024))  # shared-memory path
+        with pytest.raises(PluginWorkerError):
+            await plugins.execute_plugin("echo", "crash")
+        after_crash = await asyncio.gather(*(plugins.execute_plugin("echo", "ok") for _ in range(4)))
+        stats = plugins.stats()["echo"]["workers"]
+        await plugins.stop()
+        return results, big, after_crash, stats
+
+    results, big, after_crash, stats = asyncio.run(run())
+    assert [value for value, _ in results] == list(range(6))
+    assert all(pid != os.getpid() for _, pid in results)
+    assert big[0] == 4 * 1024 * 1024
+    assert [value for value, _ in after_crash] == ["ok"] * 4
+    assert sum(worker["starts"] for worker in stats) == 3  # two workers plus one restart
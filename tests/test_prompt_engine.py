@@ -0,0 +1,22 @@
+from app.codex_prompt_engine.engine import CodexPromptEngine
+
+
+def test_build_context_fills_budget_newest_first():
+    engine = CodexPromptEngine(system_prompt="sys")
+    history = [{"role": "user", "content": f"message {i}", "tokens": 10} for i in range(20)]
+
+    # system (1 + 4 overhead) + 3 messages * (10 + 4) = 47 tokens
+    prompt = engine.build_context(history, budget=50)
+
+    assert [m["content"] for m in prompt] == ["sys", "message 17", "message 18", "message 19"]
+    assert all(set(m) == {"role", "content"} for m in prompt)
+
+
+def test_current_turn_is_kept_and_token_counts_are_cached():
+    engine = CodexPromptEngine(system_prompt="sys")
+    history = [{"role": "user", "content": "x" * 400}]
+
+    prompt = engine.build_context(history, budget=10)
+
+    assert prompt[-1]["content"] == "x" * 400
+    assert history[0]["tokens"] > 0
@@ -0,0 +1,27 @@
+import asyncio
+
+from app.db import redis as redis_db
+
+
+def test_pool_is_created_once_reused_and_closed(fake_redis):
+    async def run():
+        client = redis_db.get_redis()
+        assert redis_db.get_redis() is client
+        pool = client.connection_pool
+
+        await redis_db.init_redis()
+        await asyncio.gather(*(redis_db.save_message("s", str(i)) for i in range(20)))
+        assert await redis_db.get_messages("s", limit=3) == ["17", "18", "19"]
+        # Sequential calls keep reusing one connection; the burst opened at most the pool's cap
+        assert redis_db.get_redis().connection_pool is pool
+        opened = len(pool._available_connections) + len(pool._in_use_connections)
+        assert 1 <= opened <= pool.max_connections
+        assert any(connection.is_connected for connection in pool._available_connections)
+
+        await redis_db.close_redis()
+        assert redis_db._client is None and redis_db._pool is None
+        assert not any(connection.is_connected for connection in pool._available_connections)
+        assert redis_db.get_redis() is not client  # a fresh pool after shutdown
+        await redis_db.close_redis()
+
+    asyncio.run(run())
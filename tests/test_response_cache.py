@@ -0,0 +1,41 @@
+import asyncio
+from app.services.response_cache import ResponseCache, cache_key
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def test_cache_key_ignores_message_metadata():
+    a = [{"role": "user", "content": "hi ", "timestamp": "2024-01-01"}]
+    b = [{"role": "user", "content": "hi"}]
+    assert cache_key("openai", None, 0.7, a) == cache_key("openai", None, 0.7, b)
+    assert cache_key("openai", None, 0.7, a) != cache_key("openai", None, 0.2, a)
+
+
+def test_lru_eviction_redis_tier_and_bypass():
+    redis = FakeRedis()
+    cache = ResponseCache(max_entries=2, redis=redis)
+
+    async def run():
+        await cache.set("a", "A")
+        await cache.set("b", "B")
+        await cache.set("c", "C")  # evicts "a" locally, Redis still has it
+        assert cache.get_local("a") is None
+        assert await cache.get("a") == "A"
+        assert await cache.get("a", bypass=True) is None
+        assert await cache.get("missing") is None
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert stats["evictions"] >= 1
+    assert stats["redis_hits"] == 1
+    assert stats["bypassed"] == 1
+    assert stats["misses"] == 1
@@ -0,0 +1,85 @@
+from app.services.semantic_cache import SemanticCache
+
+
+def _turn(text):
+    return [{"role": "user", "content": text}]
+
+
+def test_paraphrase_hits_and_unrelated_misses():
+    cache = SemanticCache(threshold=0.6, capacity=8, enabled=True)
+    cache.store(_turn("How do I reverse a list in Python?"), "Use reversed() or list[::-1].")
+
+    assert cache.lookup(_turn("how do i reverse a python list")) == "Use reversed() or list[::-1]."
+    assert cache.lookup(_turn("What is the capital of France?")) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_opt_out_false_hit_and_eviction():
+    cache = SemanticCache(threshold=0.6, capacity=2, enabled=True)
+    cache.store(_turn("explain python decorators"), "A")
+    cache.set_session_enabled("private", False)
+    assert cache.lookup(_turn("explain python decorators"), session_id="private") is None
+
+    assert cache.lookup(_turn("explain python decorators")) == "A"
+    audit_id = cache.audits[-1]["audit_id"]
+    assert cache.report_false_hit(audit_id)
+    assert cache.lookup(_turn("explain python decorators")) is None
+
+    for i in range(3):
+        cache.store(_turn(f"question number {i}"), str(i))
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_meaning_changing_near_misses_do_not_hit():
+    cache = SemanticCache(capacity=8, enabled=True)  # default threshold
+    compose = "Write a docker compose file that runs the backend and redis and exposes the api on port {}"
+    proxy = "Write an nginx config that proxies the api and the websocket endpoint to the backend {} SSL"
+    lockfile = "Should I {}commit the generated lockfile to the repository"
+    cache.store(_turn(compose.format(8080)), "A")
+    cache.store(_turn(proxy.format("with")), "B")
+    cache.store(_turn(lockfile.format("")), "C")
+
+    near_misses = [compose.format(9090), proxy.format("without"), lockfile.format("not ")]
+    for stored, near_miss in zip([compose.format(8080), proxy.format("with"), lockfile.format("")], near_misses):
+        # Lexically these clear the similarity threshold...
+        assert float(cache._vector(stored, "") @ cache._vector(near_miss, "")) >= cache.threshold
+    # ...and are rejected only by the exact number/negation check
+    assert [cache.lookup(_turn(text)) for text in near_misses] == [None, None, None]
+    assert cache.stats()["guard_rejections"] == 3
+    assert cache.lookup(_turn(compose.format(8080).lower())) == "A"
+
+
+def test_entries_are_scoped_and_disabled_by_default():
+    assert not SemanticCache().enabled
+    cache = SemanticCache(threshold=0.6, capacity=8, enabled=True)
+    cache.store(_turn("explain python decorators"), "alice's answer", scope="alice")
+    assert cache.lookup(_turn("explain python decorators"), scope="bob") is None
+    assert cache.lookup(_turn("explain python decorators"), scope="alice") == "alice's answer"
+
+
+def test_sessions_leave_no_state_behind(monkeypatch):
+    cache = SemanticCache(threshold=0.6, capacity=4, enabled=True, opt_out_ttl=60)
+    for i in range(100):
+        cache.lookup(_turn("explain python decorators"), scope=f"session-{i}")
+        cache.store(_turn("explain python decorators"), str(i), scope=f"session-{i}")
+    # Only the four live slots remember a partition
+    assert sum(p is not None for p in cache.partitions) == 4
+    assert cache.lookup(_turn("explain python decorators"), scope="session-99") == "99"
+    assert cache.lookup(_turn("explain python decorators"), scope="session-0") is None
+
+    # A colliding hash still cannot serve another scope's answer
+    monkeypatch.setattr(SemanticCache, "_partition_id", staticmethod(lambda partition: 7))
+    cache.store(_turn("explain python decorators"), "alice's answer", scope="alice")
+    assert cache.lookup(_turn("explain python decorators"), scope="bob") is None
+
+    now = [1000.0]
+    monkeypatch.setattr("app.services.semantic_cache.time.time", lambda: now[0])
+    for i in range(50):
+        cache.set_session_enabled(f"private-{i}", False)
+    now[0] += 30
+    assert not cache._usable("private-0")  # use keeps an opt-out alive
+    now[0] += 45
+    cache.set_session_enabled("private-new", False)
+    assert list(cache.opted_out) == ["private-0", "private-new"]
+    assert cache.stats()["opted_out_sessions"] == 2
@@ -0,0 +1,94 @@
+# tests/test_session_store.py
+
+import os
+import time
+
+from app.brain.session_store import JsonlSessionStore, INDEX_FILE
+
+
+def message(i):
+    return {"role": "user", "content": f"message {i}"}
+
+
+def test_append_tail_and_reload(tmp_path):
+    store = JsonlSessionStore(str(tmp_path), segment_max_bytes=200, max_segments=100)
+    for i in range(20):
+        store.append("user/42", message(i))
+
+    assert store.count("user/42") == 20
+    assert store.tail("user/42", 3) == [message(17), message(18), message(19)]
+    assert store.list_sessions() == ["user/42"]
+    store.close()
+
+    reopened = JsonlSessionStore(str(tmp_path))
+    assert reopened.load("user/42") == [message(i) for i in range(20)]
+
+
+def test_compaction_merges_segments(tmp_path):
+    store = JsonlSessionStore(str(tmp_path), segment_max_bytes=100, max_segments=3, background=False)
+    store.append_many("s", [message(i) for i in range(30)])
+
+    # Appends never compact inline; the maintenance pass merges the sealed segments
+    directory = store._session_dir("s")
+    assert len(store._segment_numbers(directory)) > 3
+    store.maintain()
+    segments = store._segment_numbers(directory)
+    assert len(segments) == 2
+    assert store.load("s") == [message(i) for i in range(30)]
+
+    # The merged segment is not the active one, so later appends leave it alone
+    store.append_many("s", [message(30)])
+    assert store._segment_numbers(directory)[:2] == segments
+    assert store.tail("s", 2) == [message(29), message(30)]
+
+    store.save("s", [message(0)])
+    assert store.load("s") == [message(0)]
+    assert len(store._segment_numbers(directory)) == 1
+
+
+def test_recovers_torn_write(tmp_path):
+    store = JsonlSessionStore(str(tmp_path))
+    store.append_many("s", [message(i) for i in range(5)])
+    store.close()
+
+    directory = store._session_dir("s")
+    segment = store._segment_path(directory, 1)
+    # A complete line that never got indexed, followed by a torn one
+    with open(segment, "ab") as f:
+        f.write(b'{"role": "user", "content": "message 5"}\n{"role": "us')
+    with open(os.path.join(directory, INDEX_FILE), "r+b") as f:
+        f.truncate(4 * 16 + 7)
+
+    recovered = JsonlSessionStore(str(tmp_path))
+    assert recovered.load("s") == [message(i) for i in range(6)]
+    recovered.append("s", message(6))
+    assert recovered.tail("s", 2) == [message(5), message(6)]
+
+
+def test_background_thread_syncs_idle_tails(tmp_path):
+    store = JsonlSessionStore(str(tmp_path), fsync_every=1000, fsync_interval=0.05)
+    store.append("s", message(0))
+    assert "s" in store._dirty
+    deadline = time.monotonic() + 2
+    while store._dirty and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not store._dirty
+    store.close()
+    assert not store._maintainer.is_alive()
+
+
+def test_appends_never_sync_on_a_timer_and_reopened_sessions_queue_compaction(tmp_path):
+    store = JsonlSessionStore(str(tmp_path), segment_max_bytes=100, max_segments=100, fsync_every=1000,
+                              fsync_interval=0.01, background=False)
+    store.append_many("s", [message(i) for i in range(30)])
+    time.sleep(0.05)
+    store.append("s", message(30))  # past the interval, but only the maintainer syncs on time
+    assert "s" in store._dirty
+    store.close()
+
+    reopened = JsonlSessionStore(str(tmp_path), segment_max_bytes=100, max_segments=3, background=False)
+    reopened.append("s", message(31))
+    assert "s" in reopened._pending_compaction
+    reopened.maintain()
+    assert len(reopened._segment_numbers(reopened._session_dir("s"))) <= 3
+    assert reopened.load("s") == [message(i) for i in range(32)]
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from app.plugins.tools.shell import ShellTool
+
+
+def collect(tool, command):
+    async def run():
+        return [event async for event in tool.stream(command)]
+
+    return asyncio.run(run())
+
+
+def test_streams_output_incrementally():
+    tool = ShellTool(timeout=5)
+
+    async def run():
+        seen = []
+        async for kind, text in tool.stream("echo first; sleep 0.3; echo second >&2"):
+            seen.append((kind, text.strip(), time.monotonic()))
+        return seen
+
+    events = asyncio.run(run())
+    assert [(kind, text) for kind, text, _ in events] == [("stdout", "first"), ("stderr", "second"), ("exit", "0")]
+    assert events[1][2] - events[0][2] >= 0.2  # first chunk arrived before the command finished
+
+
+def test_timeout_kills_the_process_group():
+    tool = ShellTool(timeout=0.3, kill_grace=0.5)
+    started = time.monotonic()
+    events = collect(tool, "sleep 30 & sleep 30")
+    assert time.monotonic() - started < 3
+    assert events[0][0] == "timeout"
+    assert events[-1][0] == "exit" and events[-1][1] != "0"
+
+
+def test_output_is_capped():
+    tool = ShellTool(timeout=5, max_output_bytes=1000)
+    events = collect(tool, "yes")
+    assert sum(len(text) for kind, text in events if kind == "stdout") <= 1000
+    assert "truncated" in [kind for kind, _ in events]
+    assert "[output exceeded 1000 bytes; command killed]" in asyncio.run(tool.run("yes"))
+
+
+def test_concurrency_is_limited():
+    tool = ShellTool(timeout=5, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*(tool.run("sleep 0.3; echo ok") for _ in range(4)))
+
+    started = time.monotonic()
+    assert asyncio.run(run()) == ["ok"] * 4
+    assert time.monotonic() - started >= 0.6
@@ -0,0 +1,49 @@
+import asyncio
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_duplicates_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "reply"
+
+    async def run():
+        return await asyncio.gather(*[flights.do("k", upstream) for _ in range(5)])
+
+    assert asyncio.run(run()) == ["reply"] * 5
+    assert calls == [1]
+    assert flights.stats() == {"leaders": 1, "joined": 4, "cancelled": 0, "in_flight": 0}
+
+
+def test_shared_call_cancelled_only_when_all_waiters_leave():
+    flights = SingleFlight()
+    state = {}
+
+    async def upstream():
+        try:
+            await asyncio.sleep(0.05)
+            return "reply"
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("k", upstream))
+        second = asyncio.ensure_future(flights.do("k", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "reply"
+        assert "cancelled" not in state
+
+        third = asyncio.ensure_future(flights.do("k", upstream))
+        await asyncio.sleep(0)
+        third.cancel()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert state["cancelled"] is True
+    assert flights.stats()["cancelled"] == 1
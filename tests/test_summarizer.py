@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+from app.db.redis import get_redis
+from app.memory.manager import summary_key
+from app.memory.summarizer import SessionCompactor, lock_key
+
+
+class FakeGateway:
+    def __init__(self, on_call=None, error=None):
+        self.prompts = []
+        self.on_call = on_call
+        self.error = error
+
+    async def chat(self, messages, **kwargs):
+        self.prompts.append(messages)
+        if self.on_call is not None:
+            await self.on_call()
+        if self.error is not None:
+            raise self.error
+        return "they talked about redis"
+
+
+async def _session(redis, count=12):
+    turns = [json.dumps({"role": "user", "content": f"turn {i}", "tokens": 100, "seq": i}) for i in range(count)]
+    await redis.rpush("s1", *turns)
+    return turns
+
+
+def test_compaction_swaps_old_turns_for_a_summary(fake_redis):
+    async def run():
+        redis = get_redis()
+        turns = await _session(redis)
+        compactor = SessionCompactor(gateway=FakeGateway(), redis=redis, keep_recent=4, enabled=True)
+        saved = await compactor.compact("s1")
+        return saved, await redis.lrange("s1", 0, -1), await redis.hgetall(summary_key("s1")), turns, \
+            await redis.exists(lock_key("s1")), await compactor.session_stats("s1")
+
+    saved, remaining, summary, turns, locked, stats = asyncio.run(run())
+    assert remaining == turns[-4:]
+    assert json.loads(summary["message"])["content"].endswith("they talked about redis")
+    assert saved > 0 and stats == {"folded_messages": 8, "saved_tokens": saved, "has_summary": True}
+    assert not locked
+
+
+def test_held_lock_skips_and_is_left_alone(fake_redis):
+    async def run():
+        redis = get_redis()
+        turns = await _session(redis)
+        await redis.set(lock_key("s1"), "other-worker", ex=300)
+        gateway = FakeGateway()
+        compactor = SessionCompactor(gateway=gateway, redis=redis, keep_recent=4, enabled=True)
+        saved = await compactor.compact("s1")
+        return saved, gateway.prompts, await redis.lrange("s1", 0, -1), turns, await redis.get(lock_key("s1")), compactor
+
+    saved, prompts, remaining, turns, lock, compactor = asyncio.run(run())
+    assert saved == 0 and prompts == [] and remaining == turns
+    assert lock == "other-worker"
+    assert compactor.stats()["skipped"] == 1
+
+
+def test_failure_and_lost_lock_leave_the_session_intact(fake_redis):
+    async def run():
+        redis = get_redis()
+        turns = await _session(redis)
+
+        # The model call fails: nothing changes and the lock is released
+        failing = SessionCompactor(gateway=FakeGateway(error=RuntimeError("upstream down")), redis=redis,
+                                   keep_recent=4, trigger_tokens=500, enabled=True)
+        assert failing.maybe_schedule("s1", [json.loads(t) for t in turns])
+        await failing.drain()
+        assert failing.stats()["failed"] == 1
+        assert await redis.lrange("s1", 0, -1) == turns and not await redis.exists(lock_key("s1"))
+
+        # Summarizing outlives the lock and another worker takes it over:
+        # the stale result is not applied and the new owner's lock survives
+        async def lose_lock():
+            await redis.set(lock_key("s1"), "new-owner", ex=300)
+
+        slow = SessionCompactor(gateway=FakeGateway(on_call=lose_lock), redis=redis, keep_recent=4, enabled=True)
+        assert await slow.compact("s1") == 0
+        return await redis.lrange("s1", 0, -1), turns, await redis.get(lock_key("s1")), \
+            await redis.exists(summary_key("s1"))
+
+    remaining, turns, lock, has_summary = asyncio.run(run())
+    assert remaining == turns and not has_summary
+    assert lock == "new-owner"
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.brain.core.base import CodexTool
+from app.brain.llm_gateway import LLMGateway
+from app.brain.tool_executor import ToolExecutor
+
+
+class SleepTool(CodexTool):
+    """Sleeps for the given number of seconds."""
+
+    def __init__(self, name):
+        self.name = name
+
+    async def run(self, prompt: str, session_id: str) -> str:
+        await asyncio.sleep(float(prompt))
+        return f"{self.name} slept {prompt}"
+
+
+class BrokenTool(CodexTool):
+    name = "broken"
+
+    async def run(self, prompt: str, session_id: str) -> str:
+        raise RuntimeError("boom")
+
+
+def call(name, prompt, call_id):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps({"prompt": prompt})}}
+
+
+def test_tool_calls_run_concurrently_and_failures_are_reported():
+    executor = ToolExecutor([SleepTool("a"), SleepTool("b"), BrokenTool()], timeout=0.5, slots=asyncio.Semaphore(8))
+    calls = [call("a", "0.2", "1"), call("b", "0.2", "2"), call("broken", "", "3"),
+             call("a", "5", "4"), call("missing", "", "5")]
+
+    started = time.perf_counter()
+    records = asyncio.run(executor.run_calls(calls, "s"))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.9  # max(0.2, 0.2, timeout 0.5), not the sum
+    assert [r["ok"] for r in records] == [True, True, False, False, False]
+    assert records[0]["output"] == "a slept 0.2"
+    assert "boom" in records[2]["output"]
+    assert "timed out" in records[3]["output"]
+    assert "unknown tool" in records[4]["output"]
+    assert all(r["latency_ms"] >= 0 for r in records)
+    assert executor.specs()[0]["function"]["description"] == "Sleeps for the given number of seconds."
+
+
+def test_gateway_normalizes_ollama_tool_calls():
+    message = {"role": "assistant", "content": "", "tool_calls": [
+        {"function": {"name": "a", "arguments": {"prompt": "1"}}},
+    ]}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"message": message}))
+    gateway = LLMGateway(transport=transport)
+
+    async def run():
+        reply = await gateway.chat_message([{"role": "user", "content": "hi"}], tools=[], provider="ollama")
+        await gateway.aclose()
+        return reply
+
+    reply = asyncio.run(run())
+    assert reply["tool_calls"] == [
+        {"id": "call_0", "type": "function", "function": {"name": "a", "arguments": '{"prompt": "1"}'}}
+    ]
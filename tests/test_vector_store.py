@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.memory.short_term_memory import ShortTermMemory
+from app.memory.vector_store import VectorStore
+from app.services.embedding_cache import EmbeddingService, HashEmbeddingBackend
+
+
+def test_top_k_matches_brute_force():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 32)).astype(np.float32)
+    store = VectorStore(dim=32, capacity=8)
+    store.add_many([f"v{i}" for i in range(500)], vectors)
+
+    query = rng.normal(size=32).astype(np.float32)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert [doc_id for doc_id, _, _ in store.search(query, 5)] == [f"v{i}" for i in expected]
+
+    half = VectorStore(dim=32, dtype="float16")
+    half.add_many([f"v{i}" for i in range(500)], vectors)
+    assert half.search(query, 1)[0][0] == f"v{expected[0]}"
+
+
+def test_memory_mapped_store_is_shared_and_persistent(tmp_path):
+    path = str(tmp_path / "short_term")
+    embedder = EmbeddingService(HashEmbeddingBackend(64), path=None)
+    writer = ShortTermMemory(path=path, embedder=embedder)
+    reader = ShortTermMemory(path=path, embedder=embedder)  # a second worker on the same files
+
+    writer.add_documents([f"d{i}" for i in range(2000)], [f"note number {i}" for i in range(2000)])
+    writer.add_document("redis", "redis keeps the session list")
+    writer.add_document("redis", "redis stores the rolling summary")  # overwrite
+
+    result = reader.query_memory("where is the rolling summary stored", top_k=2)
+    assert result["ids"][0][0] == "redis"
+    assert result["documents"][0][0] == "redis stores the rolling summary"
+
+    restarted = ShortTermMemory(path=path, embedder=embedder)
+    assert len(restarted.store) == 2001
+    assert restarted.query_memory("note number 1234", top_k=1)["ids"] == [["d1234"]]
+
+
+def test_store_written_by_another_embedding_backend_is_rejected_or_reset(tmp_path):
+    path = str(tmp_path / "short_term")
+    hashed = ShortTermMemory(path=path, embedder=EmbeddingService(HashEmbeddingBackend(64), path=None))
+    hashed.add_document("a", "alpha")
+    assert hashed.store.model == "hash:64"
+
+    with pytest.raises(ValueError, match="hash:64"):
+        VectorStore(dim=64, path=path, model="local:all-MiniLM-L6-v2")
+
+    class OtherBackend(HashEmbeddingBackend):
+        def __init__(self):
+            super().__init__(64)
+            self.name = "local:other-model"
+
+    # Same dim, different model: the old vectors are not comparable, so the store starts over
+    switched = ShortTermMemory(path=path, embedder=EmbeddingService(OtherBackend(), path=None))
+    assert len(switched.store) == 0
+    switched.add_document("b", "beta")
+    assert ShortTermMemory(path=path, embedder=EmbeddingService(OtherBackend(), path=None)).store.ids == ["b"]
+
+
+def test_store_keeps_the_most_recent_writes_and_compacts_its_id_log(tmp_path):
+    path = str(tmp_path / "short_term")
+    rng = np.random.default_rng(1)
+    store = VectorStore(dim=16, path=path, capacity=8, max_items=100)
+    reader = VectorStore(dim=16, path=path, max_items=100)  # another worker mapping the same files
+    vectors = rng.normal(size=(150, 16)).astype(np.float32)
+    for start in range(0, 140, 10):
+        store.add_many([f"v{i}" for i in range(start, start + 10)], vectors[start:start + 10])
+    store.add_many(["v0"], vectors[:1])  # v0 was trimmed; written again, it is the newest entry
+    store.add_many([f"v{i}" for i in range(140, 150)], vectors[140:])
+
+    # Each time it passes 100 items the store is trimmed to its newest 90 writes
+    expected = ["v0"] + [f"v{i}" for i in range(51, 150)]
+    assert sorted(store.ids) == sorted(expected) and len(store) == 100
+    assert reader.search(vectors[149], 1)[0][0] == "v149" and sorted(reader.ids) == sorted(expected)
+    assert reader.search(vectors[5], 1)[0][0] != "v5"
+
+    for _ in range(30):
+        store.add_many([f"v{i}" for i in range(61, 150)], vectors[61:150])
+    # Overwrites only: the id log is rewritten instead of growing without bound
+    assert store._writes <= 2 * store.count + 1024
+    assert len(os.listdir(path)) == 4  # .lock, meta.json and one epoch's vectors and ids
+    assert len(VectorStore(dim=16, path=path, max_items=100)) == 100
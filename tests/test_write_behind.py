@@ -0,0 +1,34 @@
+import asyncio
+from app.memory.write_behind import MessageWriter
+
+
+def test_rows_are_batched_and_drained_on_stop():
+    batches = []
+
+    async def sink(rows):
+        batches.append(len(rows))
+
+    writer = MessageWriter(sink=sink, batch_size=4, flush_interval=0.05)
+
+    async def run():
+        await writer.start()
+        for i in range(10):
+            await writer.enqueue({"session_id": "s", "role": "user", "content": str(i)})
+        assert writer.stats()["queue_depth"] > 0
+        await writer.stop()
+
+    asyncio.run(run())
+    assert sum(batches) == 10
+    assert max(batches) == 4
+    assert writer.stats()["written"] == 10
+    assert not writer.running
+
+
+def test_writes_synchronously_when_not_started():
+    rows = []
+
+    async def sink(batch):
+        rows.extend(batch)
+
+    asyncio.run(MessageWriter(sink=sink).enqueue({"content": "x"}))
+    assert rows == [{"content": "x"}]